@@ -1,15 +1,18 @@
 
-from PyQt6.QtCore import QUrl, QTimer, Qt
+from PyQt6.QtCore import QUrl, Qt
 from PyQt6.QtGui import QPixmap
 
 from PyQt6.QtMultimedia import QMediaPlayer, QMediaMetaData
 from PyQt6.QtMultimediaWidgets import QVideoWidget
 
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtNetwork import QNetworkRequest
 from PyQt6.QtWidgets import QLabel
 
 from loguru import logger as logging
 
+from Utils.NetworkService import NetworkService
+from Utils.TaskScheduler import TaskScheduler
+
 
 class WebcamWindow(QLabel):
 
@@ -42,14 +45,13 @@ class WebcamWindow(QLabel):
             self.media_player.metaDataChanged.connect(self.metadata_updated)
 
             self.current_thumbnail_data = None
-            self.thumbnail_grabber = QNetworkAccessManager()
-            self.thumbnail_grabber.finished.connect(self.handle_thumbnail_response)
+            self.thumbnail_url = thumbnail_url
             if thumbnail_url is not None:
                 self.video_widget.hide()
-                self.thumbnail_grabber.get(QNetworkRequest(QUrl(thumbnail_url)))
+                self.request_thumbnail()
 
-            self.thumbnail_update_timer = QTimer(self)
-            self.thumbnail_update_timer.timeout.connect(lambda: self.thumbnail_grabber.get(QNetworkRequest(QUrl(thumbnail_url))))
+            self.thumbnail_update_timer = TaskScheduler.instance().timer_for(self)
+            self.thumbnail_update_timer.timeout.connect(self.request_thumbnail)
             self.thumbnail_update_timer.start(60000)  # Update the thumbnail every minute
 
             self.is_playing = False
@@ -59,6 +61,11 @@ class WebcamWindow(QLabel):
             logging.error(f"Failed to initialize webcam window: {e}")
             logging.exception(e)
 
+    def request_thumbnail(self):
+        if self.thumbnail_url is None:
+            return
+        NetworkService.instance().get(QNetworkRequest(QUrl(self.thumbnail_url)), self.handle_thumbnail_response)
+
     def handle_thumbnail_response(self, reply):
         try:
             if str(reply.error()) != "NetworkError.NoError":
@@ -85,7 +92,6 @@ class WebcamWindow(QLabel):
     def release_resources(self):
         self.media_player.stop()
         self.media_player.deleteLater()
-        self.thumbnail_grabber.deleteLater()
         self.thumbnail_update_timer.deleteLater()
 
     def hideEvent(self, event):
@@ -1,14 +1,16 @@
 import datetime
 import time
 
-from PyQt6.QtCore import QUrl, Qt, QTimer
+from PyQt6.QtCore import QUrl, Qt
 from PyQt6.QtGui import QPixmap, QPainter, QRegion, QColor
 from PyQt6.QtWidgets import QLabel
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
 from loguru import logger as logging
 
 import json
 
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
+from Utils.TaskScheduler import TaskScheduler
 from Utils.UtilMethods import load_no_image, has_internet, get_host, network_error_to_string, \
     clean_error_type
 from Utils.WeatherHelpers import wind_direction_arrow, kelvin_to_fahrenheit, visibility_to_text, mps_to_mph
@@ -67,14 +69,14 @@ class CurrentWeather(QLabel):
         self.setFixedSize(690, 200)
 
         # Create the network manager
-        self.weather_manager = QNetworkAccessManager()
-        self.icon_manager = QNetworkAccessManager()
+        self.weather_manager = InstrumentedNetworkAccessManager()
+        self.icon_manager = InstrumentedNetworkAccessManager()
         self.weather_manager.finished.connect(self.handle_weather_response)
         self.icon_manager.finished.connect(self.handle_icon_response)
         self.make_request()
 
         # Setup the timer to refresh the weather every 30 seconds
-        self.refresh_timer = QTimer(self)
+        self.refresh_timer = TaskScheduler.instance().timer_for(self)
         self.refresh_timer.timeout.connect(self.make_request)
         self.refresh_timer.start(30000)
 
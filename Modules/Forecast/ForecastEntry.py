@@ -4,10 +4,11 @@ import random
 import time
 from PyQt6.QtCore import QUrl, QDateTime, Qt
 from PyQt6.QtWidgets import QLabel
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtNetwork import QNetworkRequest
 from loguru import logger as logging
 
 from Modules.Forecast.WeatherCodeEnum import WeatherCodes
+from Utils.NetworkService import NetworkService
 from Utils.UtilMethods import load_no_image, get_host
 from Utils.WeatherHelpers import wind_direction_arrow, celcius_to_fahrenheit, kph_to_mph
 
@@ -110,9 +111,6 @@ class ForecastEntry(QLabel):
         self.feels_like_label = ForecastValue(self, "N/A", "Feels", font)
         self.feels_like_label.move(0, self.wind_speed_label.y() + self.wind_speed_label.height())
 
-        self.network_manager = QNetworkAccessManager()
-        self.network_manager.finished.connect(self.handle_forecast_response)
-
         self.icon_manager = self.parent.icon_manager
 
     def load(self):
@@ -124,7 +122,7 @@ class ForecastEntry(QLabel):
     def make_request(self, reference_time):
         request = QNetworkRequest(QUrl(f"{get_host()}/weather/forecast/{reference_time}"))
         # request.setRawHeader("User-Agent", "RoomController/1.0 (+https:moldy.mug.loafclan.org, contact: ajsweene@mtu.edu)")
-        self.network_manager.get(request)
+        NetworkService.instance().get(request, self.handle_forecast_response)
 
     def handle_icon_response(self, pixmap):
         try:
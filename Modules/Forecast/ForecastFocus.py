@@ -4,12 +4,13 @@ import time
 
 from PyQt6.QtCore import QUrl, Qt, QTimer
 from PyQt6.QtGui import QPixmap
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtNetwork import QNetworkRequest
 from PyQt6.QtWidgets import QLabel
 
 from loguru import logger as logging
 
 from Modules.Forecast.WeatherCodeEnum import WeatherCodes
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
 from Utils.UtilMethods import load_no_image, get_host
 from Utils.WeatherHelpers import kelvin_to_fahrenheit, mps_to_mph, wind_direction_arrow, convert_relative_humidity, \
     visibility_to_text, mm_to_inches, celcius_to_fahrenheit, kph_to_mph
@@ -74,10 +75,10 @@ class ForecastFocus(QLabel):
         self.acquisition_time_label.move(self.width() - self.acquisition_time_label.width() - 10,
                                          self.height() - self.acquisition_time_label.height() - 10)
 
-        self.network_manager = QNetworkAccessManager()
+        self.network_manager = InstrumentedNetworkAccessManager()
         self.network_manager.finished.connect(self.handle_forecast_response)
 
-        self.icon_manager = QNetworkAccessManager()
+        self.icon_manager = InstrumentedNetworkAccessManager()
         self.icon_manager.finished.connect(self.handle_icon_response)
 
         self.show_timer = QTimer(self)
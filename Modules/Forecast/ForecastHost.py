@@ -2,18 +2,20 @@ import datetime
 import json
 import time
 
-from PyQt6.QtCore import QUrl, QTimer, Qt
+from PyQt6.QtCore import QUrl, Qt
 from PyQt6.QtGui import QPixmap
 from PyQt6.QtWidgets import QLabel
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
 from loguru import logger as logging
 
 from Modules.Forecast.ForecastEntry import ForecastEntry
 from Modules.Forecast.ForecastFocus import ForecastFocus
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
+from Utils.TaskScheduler import TaskScheduler
 from Utils.UtilMethods import get_host, network_error_to_string, has_internet, clean_error_type
 
 
-class IconManager(QNetworkAccessManager):
+class IconManager(InstrumentedNetworkAccessManager):
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -92,17 +94,17 @@ class ForecastHost(QLabel):
         self.forecast_focus.hide()
         self.forecast_focus.raise_()
 
-        self.forecast_manager = QNetworkAccessManager()
+        self.forecast_manager = InstrumentedNetworkAccessManager()
         self.forecast_manager.finished.connect(self.handle_forecast_response)
 
         # Setup timer to refresh the forecast every 15 minutes
         self.refresh_forecast()
-        self.refresh_timer = QTimer(self)
+        self.refresh_timer = TaskScheduler.instance().timer_for(self)
         self.refresh_timer.timeout.connect(self.refresh_forecast)
         self.refresh_timer.setSingleShot(True)
         self.refresh_timer.start(300000)
 
-        self.scroll_reset_timer = QTimer(self)
+        self.scroll_reset_timer = TaskScheduler.instance().timer_for(self)
         self.scroll_reset_timer.timeout.connect(self.reset_scroll)
         self.scroll_reset_timer.start(500)
 
@@ -1,5 +1,5 @@
 from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtWidgets import QLabel, QPushButton
+from PyQt6.QtWidgets import QLabel, QPushButton, QWidget
 from loguru import logger as logging
 
 
@@ -17,7 +17,13 @@ class FlyoutButton(QPushButton):
                            "border: none; border-radius: 10px")
         self.setFont(parent.font)
         self.clicked.connect(self.fly_out)
-        self.flyout = flyout
+        # The flyout is either an already built widget or a factory that builds it the first time it is opened
+        if isinstance(flyout, QWidget):
+            self.flyout = flyout
+            self.flyout_factory = None
+        else:
+            self.flyout = None
+            self.flyout_factory = flyout
 
     def fly_out(self):
         try:
@@ -26,6 +32,9 @@ class FlyoutButton(QPushButton):
             self.parent.collapse_not_focused()
             if self.expanded:
                 self.setText(f"↑{self.button_text}↑")
+                if self.flyout is None:
+                    logging.info(f"Building {self.button_text} flyout on first open")
+                    self.flyout = self.flyout_factory()
                 self.flyout.set_focus(True)
                 self.parent.start_focus_timer()
             else:
@@ -37,6 +46,9 @@ class FlyoutButton(QPushButton):
             logging.exception(e)
 
     def collapse(self, idle_timeout=False):
+        if self.flyout is None:
+            self.expanded = False
+            return None
         if hasattr(self.flyout, "focus_lock"):
             if self.flyout.focus_lock and idle_timeout:
                 logging.info("Focus lock was active on idle timeout, keeping focus")
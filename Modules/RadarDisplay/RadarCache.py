@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import time
+
+from loguru import logger as logging
+
+from Utils.Singleton import Singleton
+
+
+@Singleton
+class RadarCache:
+    """
+    Persistent disk cache for radar overlay tiles, frames for a past timestamp never change so once downloaded they
+    can be served locally every time the radar is reopened.
+    Tiles are stored content addressed (many tiles are identical empty frames) under Cache/Radar/blobs and an index
+    maps each timestamp/x/y/zoom key to its blob. The cache is capped at MAX_BYTES, least recently used blobs are
+    evicted first, and keys for timestamps the server no longer lists are dropped.
+    """
+
+    CACHE_DIR = "Cache/Radar"
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self):
+        self.blob_dir = os.path.join(self.CACHE_DIR, "blobs")
+        self.index_path = os.path.join(self.CACHE_DIR, "index.json")
+        self.entries = {}  # {key: {"hash": str, "size": int, "last_used": float}}
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.dirty = False
+        try:
+            os.makedirs(self.blob_dir, exist_ok=True)
+            if os.path.exists(self.index_path):
+                with open(self.index_path, "r") as f:
+                    self.entries = json.load(f)
+        except Exception as e:
+            logging.error(f"Failed to load radar cache index: {e}")
+            self.entries = {}
+
+    @staticmethod
+    def key(timestamp, x, y, zoom):
+        return f"{timestamp}/{x}/{y}/{zoom}"
+
+    def blob_path(self, digest):
+        return os.path.join(self.blob_dir, f"{digest}.png")
+
+    def get(self, timestamp, x, y, zoom):
+        entry = self.entries.get(self.key(timestamp, x, y, zoom))
+        if entry is None:
+            self.misses += 1
+            return None
+        try:
+            with open(self.blob_path(entry["hash"]), "rb") as f:
+                data = f.read()
+        except OSError:
+            self.entries.pop(self.key(timestamp, x, y, zoom))
+            self.dirty = True
+            self.misses += 1
+            return None
+        entry["last_used"] = time.time()
+        self.dirty = True
+        self.hits += 1
+        self.bytes_read += len(data)
+        return data
+
+    def put(self, timestamp, x, y, zoom, data):
+        digest = hashlib.sha1(data).hexdigest()
+        path = self.blob_path(digest)
+        try:
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(data)
+                self.bytes_written += len(data)
+        except OSError as e:
+            logging.error(f"Failed to write radar tile to cache: {e}")
+            return
+        self.entries[self.key(timestamp, x, y, zoom)] = {"hash": digest, "size": len(data), "last_used": time.time()}
+        self.dirty = True
+
+    def discard(self, timestamp, x, y, zoom):
+        """
+        Forget a tile that turned out not to be a valid frame so it is downloaded again, the blob is collected once
+        nothing references it
+        """
+        if self.entries.pop(self.key(timestamp, x, y, zoom), None) is not None:
+            self.dirty = True
+
+    def stored_bytes(self):
+        blobs = {}
+        for entry in self.entries.values():
+            blobs[entry["hash"]] = entry["size"]
+        return sum(blobs.values())
+
+    def retain_timestamps(self, timestamps):
+        """
+        Drop every key for a timestamp that is no longer in the server's list of available radar frames
+        """
+        timestamps = {str(timestamp) for timestamp in timestamps}
+        expired = [key for key in self.entries if key.split("/")[0] not in timestamps]
+        for key in expired:
+            self.entries.pop(key)
+        if expired:
+            logging.info(f"Expired {len(expired)} radar tiles from the cache")
+            self.dirty = True
+            self.collect_garbage()
+
+    def enforce_size_limit(self):
+        # Group keys by blob, a blob is only evicted once every key referencing it has been evicted
+        blobs = {}
+        for key, entry in self.entries.items():
+            blob = blobs.setdefault(entry["hash"], {"size": entry["size"], "last_used": 0, "keys": []})
+            blob["last_used"] = max(blob["last_used"], entry["last_used"])
+            blob["keys"].append(key)
+        total = sum(blob["size"] for blob in blobs.values())
+        for digest, blob in sorted(blobs.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.MAX_BYTES:
+                break
+            for key in blob["keys"]:
+                self.entries.pop(key)
+            total -= blob["size"]
+            self.dirty = True
+
+    def collect_garbage(self):
+        referenced = {entry["hash"] for entry in self.entries.values()}
+        try:
+            for file in os.listdir(self.blob_dir):
+                if file[:-4] not in referenced:
+                    os.remove(os.path.join(self.blob_dir, file))
+        except OSError as e:
+            logging.error(f"Failed to clean radar cache: {e}")
+
+    def flush(self):
+        if not self.dirty:
+            return
+        self.enforce_size_limit()
+        self.collect_garbage()
+        try:
+            with open(self.index_path + ".tmp", "w") as f:
+                json.dump(self.entries, f)
+            os.replace(self.index_path + ".tmp", self.index_path)
+            self.dirty = False
+        except OSError as e:
+            logging.error(f"Failed to save radar cache index: {e}")
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "stored_bytes": self.stored_bytes(),
+            "entries": len(self.entries),
+        }
@@ -0,0 +1,251 @@
+import sys
+import time
+
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QPainter, QPixmap, QColor
+from PyQt6.QtWidgets import QWidget
+from loguru import logger as logging
+
+
+class RadarCanvas(QWidget):
+    """
+    Single custom painted view of the radar map, replacing a QLabel and an overlay QLabel per map tile.
+    The base map is stitched into one pixmap once and each paint draws the visible part of it followed by the current
+    frame of every radar tile that intersects the viewport, so advancing a frame is a single update().
+    Panning and fractional zoom only change the view transform, both the base map and the radar frames are kept as a
+    pyramid of pre-scaled levels so each paint draws from the level closest to the zoom with only a small residual
+    scale rather than smooth scaling the full resolution images.
+    """
+
+    TILE_SIZE = 256
+    MIN_SCALE = 0.5
+    MAX_SCALE = 4
+    # Pyramid levels of the base map and radar frames, neither is scaled above its native resolution as that would
+    # only be interpolation, zooming in past 1x is left to the paint transform
+    LEVELS = (0.5, 1)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.base_map = None
+        self.base_levels = {}  # {level: QPixmap} built once on first use
+        self.min_x = self.min_y = 0
+        self.range_x = self.range_y = 0
+        self.tiles = []
+        self.timestamp = None
+
+        # Screen position of the top left corner of the map and the current zoom factor
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.scale = 1.0
+        self.smooth = True
+
+        self.frames_painted = 0
+        self.paint_time = 0.0
+        self.zoom_started = None
+
+    def load_base_map(self, min_x, max_x, min_y, max_y):
+        if self.base_map is not None:
+            return
+        self.min_x, self.min_y = min_x, min_y
+        self.range_x, self.range_y = max_x - min_x + 1, max_y - min_y + 1
+        self.base_map = QPixmap(self.range_x * self.TILE_SIZE, self.range_y * self.TILE_SIZE)
+        self.base_map.fill(QColor("white"))
+        painter = QPainter(self.base_map)
+        for y in range(min_y, max_y + 1):
+            for x in range(min_x, max_x + 1):
+                painter.drawPixmap((x - min_x) * self.TILE_SIZE, (y - min_y) * self.TILE_SIZE,
+                                   QPixmap(f"Assets/MapTiles/{x}-{y}.png"))
+        painter.end()
+        self.base_levels[1] = self.base_map
+
+    def level_for(self, scale):
+        for level in self.LEVELS:
+            if level >= scale:
+                return level
+        return self.LEVELS[-1]
+
+    def base_level(self, level):
+        if level not in self.base_levels:
+            build_start = time.perf_counter()
+            self.base_levels[level] = self.base_map.scaled(
+                round(self.base_map.width() * level), round(self.base_map.height() * level),
+                Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            logging.info(f"Built {level}x radar base map level in {(time.perf_counter() - build_start) * 1000:.1f}ms")
+        return self.base_levels[level]
+
+    def set_tiles(self, tiles):
+        self.tiles = tiles
+        self.update()
+
+    def set_timestamp(self, timestamp):
+        self.timestamp = timestamp
+        self.update()
+
+    def tile_updated(self, tile, timestamp):
+        if timestamp == self.timestamp and self.tile_visible(tile):
+            self.update()
+
+    def tile_rect(self, tile):
+        size = self.TILE_SIZE * self.scale
+        return QRectF(self.offset_x + (tile.tile_x - self.min_x) * size,
+                      self.offset_y + (tile.tile_y - self.min_y) * size, size, size)
+
+    def tile_visible(self, tile):
+        return self.tile_rect(tile).intersects(QRectF(self.rect()))
+
+    def center_on(self, tile_x, tile_y, screen_x, screen_y):
+        """
+        Place the top left corner of the given map tile at the given position on screen
+        """
+        self.offset_x = screen_x - (tile_x - self.min_x) * self.TILE_SIZE * self.scale
+        self.offset_y = screen_y - (tile_y - self.min_y) * self.TILE_SIZE * self.scale
+        self.update()
+
+    def pan(self, dx, dy):
+        self.offset_x += dx
+        self.offset_y += dy
+        self.update()
+
+    def zoom(self, factor, anchor):
+        """
+        Scale the view by factor keeping the map point under anchor (a QPointF in widget coordinates) fixed
+        """
+        scale = min(self.MAX_SCALE, max(self.MIN_SCALE, self.scale * factor))
+        factor = scale / self.scale
+        if factor == 1:
+            return
+        if self.zoom_started is None:
+            self.zoom_started = time.perf_counter()
+        self.offset_x = anchor.x() - (anchor.x() - self.offset_x) * factor
+        self.offset_y = anchor.y() - (anchor.y() - self.offset_y) * factor
+        self.scale = scale
+        self.update()
+
+    def paintEvent(self, event):
+        paint_start = time.perf_counter()
+        painter = QPainter(self)
+        try:
+            painter.fillRect(self.rect(), QColor("black"))
+            if self.base_map is None:
+                return
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, self.smooth)
+            level = self.level_for(self.scale)
+            base_map = self.base_level(level)
+            # Only the part of the base map that is inside the viewport is drawn
+            view = QRectF(self.rect())
+            map_rect = QRectF(self.offset_x, self.offset_y,
+                              self.base_map.width() * self.scale, self.base_map.height() * self.scale)
+            visible = view.intersected(map_rect)
+            if not visible.isEmpty():
+                ratio = level / self.scale  # Screen pixels to pyramid level pixels
+                source = QRectF((visible.x() - self.offset_x) * ratio, (visible.y() - self.offset_y) * ratio,
+                                visible.width() * ratio, visible.height() * ratio)
+                painter.drawPixmap(visible, base_map, source)
+            if self.timestamp is None:
+                return
+            for tile in self.tiles:
+                rect = self.tile_rect(tile)
+                if not rect.intersects(view):
+                    continue
+                pixmap = tile.pixmap_for(self.timestamp, level)
+                if pixmap is not None:
+                    painter.drawPixmap(rect, pixmap, QRectF(pixmap.rect()))
+        except Exception as e:
+            logging.error(f"Failed to paint radar canvas: {e}")
+            logging.exception(e)
+        finally:
+            painter.end()
+            self.frames_painted += 1
+            self.paint_time += time.perf_counter() - paint_start
+            if self.zoom_started is not None:
+                logging.debug(f"Radar zoom to {self.scale:.2f}x (level {self.level_for(self.scale)}) painted in "
+                             f"{(time.perf_counter() - self.zoom_started) * 1000:.1f}ms")
+                self.zoom_started = None
+
+    def paint_stats(self):
+        return {
+            "frames_painted": self.frames_painted,
+            "average_paint_ms": self.paint_time / self.frames_painted * 1000 if self.frames_painted else 0,
+        }
+
+
+def benchmark():
+    """
+    Frames per second of stepping through radar frames with the RadarCanvas compared to the previous layout of a
+    QLabel and an overlay QLabel per map tile that each had setPixmap called on every frame.
+    Run with `python -m Modules.RadarDisplay.RadarCanvas --frames 200`
+    """
+    import argparse
+    import os
+    from PyQt6.QtGui import QImage
+    from PyQt6.QtWidgets import QApplication, QLabel
+
+    parser = argparse.ArgumentParser(description="Benchmark radar frame painting")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--timestamps", type=int, default=50)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    tiles = [tuple(map(int, file.split('.')[0].split('-'))) for file in os.listdir("Assets/MapTiles")]
+    min_x, max_x = min(x for x, _ in tiles), max(x for x, _ in tiles)
+    min_y, max_y = min(y for _, y in tiles), max(y for _, y in tiles)
+
+    # Synthetic radar frames, a translucent wash whose colour changes with the timestamp
+    frames = []
+    for i in range(args.timestamps):
+        image = QImage(256, 256, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(QColor.fromHsv((i * 7) % 360, 200, 200, 120))
+        frames.append(image)
+
+    class FakeTile:
+        def __init__(self, x, y):
+            self.tile_x, self.tile_y = x, y
+            self.pixmaps = {i: QPixmap.fromImage(image) for i, image in enumerate(frames)}
+
+        def pixmap_for(self, timestamp, level):
+            return self.pixmaps[timestamp]
+
+    canvas = RadarCanvas()
+    canvas.resize(800, 390)
+    canvas.load_base_map(min_x, max_x, min_y, max_y)
+    canvas.set_tiles([FakeTile(x, y) for x, y in tiles])
+    canvas.center_on(16, 22, 350, 67)
+    canvas.show()
+    app.processEvents()
+    start = time.perf_counter()
+    for i in range(args.frames):
+        canvas.set_timestamp(i % args.timestamps)
+        canvas.repaint()
+    elapsed = time.perf_counter() - start
+    print(f"RadarCanvas: {args.frames / elapsed:.1f} fps ({elapsed / args.frames * 1000:.2f}ms per frame)")
+    canvas.hide()
+
+    host = QWidget()
+    host.resize(800, 390)
+    surface = QLabel(host)
+    surface.setFixedSize(256 * (max_x - min_x + 1), 256 * (max_y - min_y + 1))
+    overlays = []
+    for x, y in tiles:
+        tile = QLabel(surface)
+        tile.setFixedSize(256, 256)
+        tile.move((x - min_x) * 256, (y - min_y) * 256)
+        tile.setPixmap(QPixmap(f"Assets/MapTiles/{x}-{y}.png"))
+        overlay = QLabel(tile)
+        overlay.setFixedSize(256, 256)
+        overlay.setStyleSheet('background-color: transparent;')
+        overlays.append(overlay)
+    surface.move(350 - (16 - min_x) * 256, 67 - (22 - min_y) * 256)
+    host.show()
+    app.processEvents()
+    start = time.perf_counter()
+    for i in range(args.frames):
+        for overlay in overlays:
+            overlay.setPixmap(QPixmap.fromImage(frames[i % args.timestamps]))
+        host.repaint()
+    elapsed = time.perf_counter() - start
+    print(f"Tile widgets: {args.frames / elapsed:.1f} fps ({elapsed / args.frames * 1000:.2f}ms per frame)")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,135 @@
+import argparse
+import os
+import sys
+import time
+
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtGui import QImage
+from loguru import logger as logging
+
+from Utils.Singleton import Singleton
+
+
+def decode_image(data, width, height):
+    image = QImage.fromData(data)
+    if image.isNull():
+        return image
+    # Convert to the premultiplied format the raster paint engine blits directly so QPixmap.fromImage is a cheap copy
+    image = image.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    return image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+
+
+class DecodeTask(QRunnable):
+
+    def __init__(self, decoder, job_id, data, width, height):
+        super().__init__()
+        self.decoder = decoder
+        self.job_id = job_id
+        self.data = data
+        self.width = width
+        self.height = height
+
+    def run(self):
+        try:
+            image = decode_image(self.data, self.width, self.height)
+        except Exception as e:
+            logging.error(f"Failed to decode radar frame: {e}")
+            image = QImage()
+        # Emitted from the pool thread, the decoder lives on the GUI thread so this is delivered as a queued signal
+        self.decoder.decoded.emit(self.job_id, image)
+
+
+@Singleton
+class RadarDecoder(QObject):
+    """
+    Decodes and scales radar frame PNGs on a QThreadPool so the GUI thread only has to do QPixmap.fromImage for the
+    frame that is actually on screen. Finished images are handed back to the callback on the GUI thread.
+    """
+
+    decoded = pyqtSignal(int, QImage)
+
+    def __init__(self):
+        super().__init__()
+        self.pool = QThreadPool()
+        # Leave a core free for the GUI thread
+        self.pool.setMaxThreadCount(max(1, QThreadPool.globalInstance().maxThreadCount() - 1))
+        self.jobs = {}  # {job_id: callback}
+        self.next_job_id = 0
+        self.decoded.connect(self.dispatch)
+
+    def decode(self, data, width, height, callback):
+        """
+        Queue data for decoding, callback(image) is called on the GUI thread with a null QImage if decoding failed
+        """
+        self.next_job_id += 1
+        self.jobs[self.next_job_id] = callback
+        self.pool.start(DecodeTask(self, self.next_job_id, data, width, height))
+
+    def dispatch(self, job_id, image):
+        callback = self.jobs.pop(job_id, None)
+        if callback is None:
+            return
+        owner = getattr(callback, "__self__", None)
+        if isinstance(owner, QObject) and sip.isdeleted(owner):
+            return
+        try:
+            callback(image)
+        except Exception as e:
+            logging.error(f"Error dispatching decoded radar frame: {e}")
+            logging.exception(e)
+
+    def pending(self):
+        return len(self.jobs)
+
+
+def benchmark():
+    """
+    Time-to-all-frames-parsed for the radar tiles in the on-disk cache, decoded serially on one thread the way
+    parse_responses used to and then through the RadarDecoder pool.
+    Run with `python -m Modules.RadarDisplay.RadarDecoder --frames 1600`
+    """
+    from PyQt6.QtGui import QGuiApplication
+    from Modules.RadarDisplay.RadarCache import RadarCache
+
+    parser = argparse.ArgumentParser(description="Benchmark radar frame decoding")
+    parser.add_argument("--frames", type=int, default=1600)
+    parser.add_argument("--size", type=int, default=256)
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    blob_dir = RadarCache.instance().blob_dir
+    blobs = []
+    for file in sorted(os.listdir(blob_dir)):
+        with open(os.path.join(blob_dir, file), "rb") as f:
+            blobs.append(f.read())
+    if len(blobs) == 0:
+        print(f"No radar tiles in {blob_dir}, open the radar once to populate the cache")
+        return
+    frames = [blobs[i % len(blobs)] for i in range(args.frames)]
+
+    start = time.perf_counter()
+    for data in frames:
+        decode_image(data, args.size, args.size)
+    serial = time.perf_counter() - start
+    print(f"Serial: {len(frames)} frames in {serial:.2f}s ({len(frames) / serial:.0f} frames/s)")
+
+    decoder = RadarDecoder.instance()
+    remaining = [len(frames)]
+    start = time.perf_counter()
+
+    def done(image):
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            pooled = time.perf_counter() - start
+            print(f"Pool ({decoder.pool.maxThreadCount()} threads): {len(frames)} frames in {pooled:.2f}s "
+                  f"({len(frames) / pooled:.0f} frames/s, {serial / pooled:.1f}x)")
+            app.quit()
+
+    for data in frames:
+        decoder.decode(data, args.size, args.size, done)
+    app.exec()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,97 @@
+import heapq
+import math
+
+from PyQt6.QtCore import QTimer
+from loguru import logger as logging
+
+
+class RadarFetchScheduler:
+    """
+    Central queue of radar frames waiting to be fetched for every RadarTile.
+    Frames are fetched at most MAX_CONCURRENT at a time in priority order: frames of tiles in the viewport first,
+    nearest the current frame then nearest the viewport centre, followed by tiles outside the viewport ordered by
+    their distance from it. Priorities are recomputed when the view is panned or zoomed or the current frame changes.
+    Frames found in the disk cache don't take a request slot, at most MAX_CACHE_READS of them are read per dispatch so
+    a warm cache doesn't block the event loop reading every frame at once.
+    """
+
+    MAX_CONCURRENT = 6
+    MAX_CACHE_READS = 16
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.pending = []  # heap of (priority, sequence, tile, timestamp)
+        self.sequence = 0
+        self.in_flight = set()  # {(tile, timestamp)}
+        self.frame_order = {}  # {timestamp: index}
+        self.current_timestamp = None
+        self.dirty = False
+        self.dispatch_queued = False
+
+    def set_frames(self, timestamps, current_timestamp):
+        self.frame_order = {timestamp: i for i, timestamp in enumerate(timestamps)}
+        self.current_timestamp = current_timestamp
+
+    def set_current(self, timestamp):
+        self.current_timestamp = timestamp
+        self.reprioritise()
+
+    def enqueue(self, tile, timestamp):
+        self.sequence += 1
+        heapq.heappush(self.pending, (self.priority(tile, timestamp), self.sequence, tile, timestamp))
+        self.queue_dispatch()
+
+    def clear(self):
+        self.pending.clear()
+        self.in_flight.clear()
+
+    def reprioritise(self):
+        # The heap is rebuilt on the next dispatch so a burst of drag events only costs one rebuild
+        self.dirty = True
+        self.queue_dispatch()
+
+    def priority(self, tile, timestamp):
+        rect = self.canvas.tile_rect(tile)
+        view = self.canvas.rect()
+        distance = math.hypot(rect.center().x() - view.center().x(),
+                              rect.center().y() - view.center().y()) / max(rect.width(), 1)
+        current = self.frame_order.get(self.current_timestamp, 0)
+        frame_distance = abs(self.frame_order.get(timestamp, 0) - current)
+        if self.canvas.tile_visible(tile):
+            return 0, frame_distance, distance
+        return 1, distance, frame_distance
+
+    def queue_dispatch(self):
+        if self.dispatch_queued:
+            return
+        self.dispatch_queued = True
+        QTimer.singleShot(0, self.dispatch)
+
+    def dispatch(self):
+        self.dispatch_queued = False
+        try:
+            if self.dirty:
+                self.pending = [(self.priority(tile, timestamp), sequence, tile, timestamp)
+                                for _, sequence, tile, timestamp in self.pending]
+                heapq.heapify(self.pending)
+                self.dirty = False
+            cache_reads = 0
+            while self.pending and len(self.in_flight) < self.MAX_CONCURRENT:
+                if cache_reads >= self.MAX_CACHE_READS:
+                    self.queue_dispatch()  # Continue after the event loop has had a turn
+                    break
+                _, _, tile, timestamp = heapq.heappop(self.pending)
+                # Frames already in the disk cache are loaded straight away without taking up a request slot
+                if tile.fetch_frame(timestamp):
+                    self.in_flight.add((tile, timestamp))
+                else:
+                    cache_reads += 1
+        except Exception as e:
+            logging.error(f"Failed to dispatch radar fetches: {e}")
+            logging.exception(e)
+
+    def request_finished(self, tile, timestamp):
+        if (tile, timestamp) not in self.in_flight:
+            return  # The scheduler was cleared while the request was outstanding
+        self.in_flight.discard((tile, timestamp))
+        self.queue_dispatch()
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+
+from loguru import logger as logging
+
+from Utils.Singleton import Singleton
+
+
+@Singleton
+class RadarFrameBudget:
+    """
+    Memory budget shared by the frame stores of every RadarTile.
+    Frames are held as ready to paint QPixmaps up to PIXMAP_BUDGET, the least recently painted pixmaps beyond that
+    are demoted back to QImages and once IMAGE_BUDGET is also exceeded the oldest images are dropped entirely, to be
+    decoded again from the on-disk RadarCache if they are ever painted again.
+    """
+
+    PIXMAP_BUDGET = 128 * 1024 * 1024
+    IMAGE_BUDGET = 64 * 1024 * 1024
+
+    def __init__(self):
+        self.pixmaps = OrderedDict()  # {(tile, timestamp): bytes} least recently used first
+        self.images = OrderedDict()
+        self.pixmap_bytes = 0
+        self.image_bytes = 0
+        self.evicted = 0
+        self.demoted = 0
+
+    def add_pixmap(self, tile, timestamp, size):
+        self.remove(tile, timestamp)
+        self.pixmaps[(tile, timestamp)] = size
+        self.pixmap_bytes += size
+        self.enforce()
+
+    def touch(self, tile, timestamp):
+        if (tile, timestamp) in self.pixmaps:
+            self.pixmaps.move_to_end((tile, timestamp))
+
+    def remove(self, tile, timestamp):
+        if (tile, timestamp) in self.pixmaps:
+            self.pixmap_bytes -= self.pixmaps.pop((tile, timestamp))
+        if (tile, timestamp) in self.images:
+            self.image_bytes -= self.images.pop((tile, timestamp))
+
+    def clear(self):
+        self.pixmaps.clear()
+        self.images.clear()
+        self.pixmap_bytes = 0
+        self.image_bytes = 0
+
+    def enforce(self):
+        while self.pixmap_bytes > self.PIXMAP_BUDGET and len(self.pixmaps) > 1:
+            (tile, timestamp), size = self.pixmaps.popitem(last=False)
+            self.pixmap_bytes -= size
+            self.demoted += 1
+            self.images[(tile, timestamp)] = tile.demote_frame(timestamp)
+            self.image_bytes += self.images[(tile, timestamp)]
+        while self.image_bytes > self.IMAGE_BUDGET and len(self.images) > 0:
+            (tile, timestamp), size = self.images.popitem(last=False)
+            self.image_bytes -= size
+            self.evicted += 1
+            tile.evict_frame(timestamp)
+
+    def stats(self):
+        return {
+            "pixmaps": len(self.pixmaps),
+            "pixmap_bytes": self.pixmap_bytes,
+            "images": len(self.images),
+            "image_bytes": self.image_bytes,
+            "demoted": self.demoted,
+            "evicted": self.evicted,
+        }
+
+    def report(self, tiles):
+        stats = self.stats()
+        frames = sum(len(tile.frames) for tile in tiles)
+        on_disk = frames - stats["pixmaps"] - stats["images"]
+        logging.info(f"Radar frame memory for {len(tiles)} tiles, {frames} frames: "
+                     f"{stats['pixmaps']} pixmaps ({stats['pixmap_bytes'] / 1024 / 1024:.1f}MB), "
+                     f"{stats['images']} images ({stats['image_bytes'] / 1024 / 1024:.1f}MB), {on_disk} on disk, "
+                     f"{stats['demoted']} demoted and {stats['evicted']} evicted so far")
@@ -8,10 +8,15 @@ import time
 from PyQt6.QtCore import QUrl, QTimer, Qt
 from PyQt6.QtGui import QPixmap, QImage
 from PyQt6.QtWidgets import QLabel, QPushButton
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtNetwork import QNetworkRequest
 from loguru import logger as logging
 
+from Modules.RadarDisplay.RadarCache import RadarCache
+from Modules.RadarDisplay.RadarCanvas import RadarCanvas
+from Modules.RadarDisplay.RadarFetchScheduler import RadarFetchScheduler
+from Modules.RadarDisplay.RadarFrameBudget import RadarFrameBudget
 from Modules.RadarDisplay.RadarTile import RadarTile
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
 from Utils.UtilMethods import get_host
 
 
@@ -22,7 +27,9 @@ class RadarHost(QLabel):
         super().__init__(parent)
         self.parent = parent
         self.setFixedSize(parent.width(), parent.height() - self.y())
-        self.maptile_surface = QLabel(self)
+        self.canvas = RadarCanvas(self)
+        self.canvas.setFixedSize(self.width(), self.height())
+        self.scheduler = RadarFetchScheduler(self.canvas)
 
         # Look into the MapTiles folder and determine the range of available map tiles
         self.min_x, self.max_x, self.min_y, self.max_y = self.determine_map_size()
@@ -30,7 +37,6 @@ class RadarHost(QLabel):
         self.range_y = self.max_y - self.min_y + 1
         logging.info(f"Map Tile Range: {self.min_x}-{self.max_x}, {self.min_y}-{self.max_y} : {self.range_x}x{self.range_y}")
         self.map_tiles = []
-        self.maptile_surface.setFixedSize(256 * self.range_x, 256 * self.range_y)
 
         self.focused = False
         self.playing = False
@@ -39,7 +45,7 @@ class RadarHost(QLabel):
         self.dragging = False
         self.drag_start = (0, 0)
 
-        self.network_manager = QNetworkAccessManager()
+        self.network_manager = InstrumentedNetworkAccessManager()
         self.network_manager.finished.connect(self.handle_response)
 
         self.timestamp_label = QLabel(self)
@@ -94,11 +100,13 @@ class RadarHost(QLabel):
 
         self.timestamp_list = []
         self.current_frame = 0
-        self.zoom_level = 1
 
         self.playback_timer = QTimer(self)
         self.playback_timer.timeout.connect(self.next_frame)
 
+        self.playback_started = None  # (perf_counter, frames_painted) when playback was started
+        self.load_started = None  # When the current frame list was requested, for timing how long loading takes
+
         self.loading_check_timer = QTimer(self)
         self.loading_check_timer.timeout.connect(self.check_loading)
 
@@ -129,9 +137,18 @@ class RadarHost(QLabel):
             self.loading_label.show()
         total_tiles = sum([map_tile.total_frames for map_tile in self.map_tiles])
         downloaded_frames = total_tiles - sum([map_tile.outstanding_requests for map_tile in self.map_tiles])
-        loaded_frames = sum([len(map_tile.radar_images) for map_tile in self.map_tiles])
+        # Frames of off-screen tiles are left on disk as None placeholders until they are painted
+        loaded_frames = sum([len([frame for frame in map_tile.frames.values() if isinstance(frame, (QPixmap, QImage))])
+                             for map_tile in self.map_tiles])
+        deferred_frames = sum([len(map_tile.frames) for map_tile in self.map_tiles]) - loaded_frames
+        if self.load_started is not None and total_tiles > 0 and loaded_frames + deferred_frames >= total_tiles and \
+                all([map_tile.outstanding_parses == 0 for map_tile in self.map_tiles]):
+            logging.info(f"Parsed all {loaded_frames} radar frames in {time.time() - self.load_started:.2f}s, "
+                         f"{deferred_frames} off-screen frames left on disk until painted")
+            RadarFrameBudget.instance().report(self.map_tiles)
+            self.load_started = None
         self.loading_label.setText(f"Loading Radar Data [{downloaded_frames}/{total_tiles}]\n"
-                                   f"Parsing Radar Data [{loaded_frames}/{total_tiles}]")
+                                   f"Parsing Radar Data [{loaded_frames}/{total_tiles - deferred_frames}]")
 
     def last_frame(self):
         self.current_frame -= 2
@@ -150,10 +167,12 @@ class RadarHost(QLabel):
         self.playing = not self.playing
         if self.playing:
             self.play_pause_button.setText("Pause")
+            self.playback_started = (time.perf_counter(), self.canvas.frames_painted)
             self.playback_timer.start(500)
         else:
             self.play_pause_button.setText("Play")
             self.playback_timer.stop()
+            self.log_playback_rate()
 
     def set_focus(self, focus) -> None:
         self.focused = focus
@@ -167,44 +186,46 @@ class RadarHost(QLabel):
             self.playback_timer.stop()
             self.hide()
 
+    def log_playback_rate(self):
+        if self.playback_started is None:
+            return
+        started, frames_painted = self.playback_started
+        self.playback_started = None
+        elapsed = time.perf_counter() - started
+        stats = self.canvas.paint_stats()
+        if elapsed > 0:
+            logging.info(f"Radar playback: {(self.canvas.frames_painted - frames_painted) / elapsed:.1f} fps, "
+                         f"{stats['average_paint_ms']:.2f}ms average paint")
+
     def unload_maptiles(self):
+        if self.playing:
+            self.log_playback_rate()
+        RadarFrameBudget.instance().report(self.map_tiles)
+        self.scheduler.clear()
         for map_tile in self.map_tiles:
             map_tile.deleteLater()
         self.map_tiles.clear()
+        self.canvas.set_tiles([])
+        RadarFrameBudget.instance().clear()
+        cache = RadarCache.instance()
+        cache.flush()
+        stats = cache.stats()
+        logging.info(f"Radar cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+                     f"{stats['bytes_read']} bytes read, {stats['bytes_written']} bytes written, "
+                     f"{stats['stored_bytes']} bytes stored in {stats['entries']} entries")
 
     def wheelEvent(self, a0) -> None:
-        # return
-        current_x, current_y = self.maptile_surface.x(), self.maptile_surface.y()
-        if a0.angleDelta().y() > 0 and self.zoom_level < 2:
-            self.zoom_level += 1
-            self.maptile_surface.setFixedSize(self.maptile_surface.width() * 2, self.maptile_surface.height() * 2)
-            for map_tile in self.map_tiles:
-                map_tile.change_size(2)
-            # Re layout the map tiles
-            for i, map_tile in enumerate(self.map_tiles):
-                map_tile.move((i % 4) * self.map_tiles[0].width(),
-                              (i // 4) * self.map_tiles[0].height())
-                map_tile.position((i % 4) * self.map_tiles[0].width(),
-                                  (i // 4) * self.map_tiles[0].height())
-            self.load_radartiles()
-            # Adjust the position of the map tiles to keep the same point in the center
-            self.maptile_surface.move(current_x * 2, current_y * 2)
-        elif a0.angleDelta().y() < 0 and self.zoom_level > 1:
-            self.zoom_level -= 1
-            self.maptile_surface.setFixedSize(self.maptile_surface.width() // 2, self.maptile_surface.height() // 2)
-            for map_tile in self.map_tiles:
-                map_tile.change_size(0.5)
-            # Re layout the map tiles
-            for i, map_tile in enumerate(self.map_tiles):
-                map_tile.move((i % 4) * self.map_tiles[0].width(),
-                              (i // 4) * self.map_tiles[0].height())
-            self.load_radartiles()
-            self.maptile_surface.move(current_x // 2, current_y // 2)
+        if self.activity_timer_callback is not None:
+            self.activity_timer_callback()
+        # Each notch of the wheel zooms by 25%, the point under the cursor stays put
+        self.canvas.zoom(1.25 ** (a0.angleDelta().y() / 120), a0.position())
+        self.scheduler.reprioritise()
 
     # Setup mouse events to allow the user to drag the radar map around
     def mousePressEvent(self, event):
         try:
             self.dragging = True
+            self.canvas.smooth = False  # Skip smooth scaling while dragging to keep panning responsive
             if self.activity_timer_callback is not None:
                 self.activity_timer_callback()
             self.drag_start = (event.pos().x(), event.pos().y())
@@ -218,7 +239,8 @@ class RadarHost(QLabel):
                 if self.activity_timer_callback is not None:
                     self.activity_timer_callback()
                 dx, dy = event.pos().x() - self.drag_start[0], event.pos().y() - self.drag_start[1]
-                self.maptile_surface.move(self.maptile_surface.x() + dx, self.maptile_surface.y() + dy)
+                self.canvas.pan(dx, dy)
+                self.scheduler.reprioritise()
                 self.drag_start = (event.pos().x(), event.pos().y())
         except Exception as e:
             logging.error(f"Failed to handle mouse move event: {e}")
@@ -226,6 +248,8 @@ class RadarHost(QLabel):
 
     def mouseReleaseEvent(self, event):
         self.dragging = False
+        self.canvas.smooth = True
+        self.canvas.update()
 
     def handle_response(self, reply):
         try:
@@ -236,6 +260,7 @@ class RadarHost(QLabel):
             data = reply.readAll()
             data = json.loads(str(data, 'utf-8'))
             self.timestamp_list = data['weather_radar_list'][-self.max_frames:]
+            RadarCache.instance().retain_timestamps(self.timestamp_list)
             # Find the last timestamp that is less than the current time
             self.current_frame = len(self.timestamp_list) - 2 - 3
             # for i, timestamp in enumerate(self.timestamp_list.__reversed__()):
@@ -243,6 +268,7 @@ class RadarHost(QLabel):
             #         self.current_frame = len(self.timestamp_list) - i - 2
             #         break
             # logging.info(f"Loaded {len(self.timestamp_list)} radar frames")
+            self.scheduler.set_frames(self.timestamp_list, self.timestamp_list[self.current_frame + 1])
             for map_tile in self.map_tiles:
                 map_tile.load_radar_overlays(self.timestamp_list.__reversed__())
             self.next_frame()
@@ -256,8 +282,8 @@ class RadarHost(QLabel):
         try:
             self.current_frame += 1
             self.current_frame %= len(self.timestamp_list)
-            for map_tile in self.map_tiles:
-                map_tile.set_radar_overlay(self.timestamp_list[self.current_frame])
+            self.canvas.set_timestamp(self.timestamp_list[self.current_frame])
+            self.scheduler.set_current(self.timestamp_list[self.current_frame])
 
             time_str = datetime.datetime.fromtimestamp(self.timestamp_list[self.current_frame]).strftime(
                 "%Y-%m-%d %I:%M%p")
@@ -271,25 +297,17 @@ class RadarHost(QLabel):
     def load_radartiles(self):
         self.loading_label.setText("Acquiring Radar Frame List")
         self.loading_label.show()
+        self.load_started = time.time()
         self.network_manager.get(QNetworkRequest(QUrl(f"{get_host()}/weather/available_radars")))
 
     def load_maptiles(self):
         # All map tiles are 256x256 pixels in size and are stored in 'Assets/MapTiles/{x}-{y}.png'
-        # The map is 4 tiles wide and 3 tiles tall (15-18, 22-24)
-        center_tile_x, center_tile_y = 0, 0
+        self.canvas.load_base_map(self.min_x, self.max_x, self.min_y, self.max_y)
         for y in range(self.min_y, self.max_y + 1):
             for x in range(self.min_x, self.max_x + 1):
-                self.map_tiles.append(RadarTile(get_host(), self.maptile_surface, x, y))
-        for i, map_tile in enumerate(self.map_tiles):
-            map_tile.move((i % self.range_x) * 256,
-                          (i // self.range_x) * 256)
-            if map_tile.tile_x == 16 and map_tile.tile_y == 22:
-                center_tile_x, center_tile_y = map_tile.x(), map_tile.y()
-            # Print where the tile was placed
-            # logging.info(f"Placed tile {map_tile.tile_x}-{map_tile.tile_y} at {map_tile.x()},{map_tile.y()}")
-        # Center the map tile surface so that tile 16-22 is in the center of the screen
-        print(f"Center Tile: {center_tile_x}, {center_tile_y}")
-        new_x, new_y = -center_tile_x + round(self.width() / 2) - 50, -center_tile_y + round(self.height() / 2) - 128
-        self.maptile_surface.move(new_x, new_y)
+                self.map_tiles.append(RadarTile(get_host(), self.canvas, x, y, self.scheduler))
+        self.canvas.set_tiles(self.map_tiles)
+        # Center the map so that tile 16-22 is in the center of the screen
+        self.canvas.center_on(16, 22, round(self.width() / 2) - 50, round(self.height() / 2) - 128)
 
         self.load_radartiles()
@@ -1,155 +1,163 @@
-import queue
-import random
-import time
-
-from PyQt6.QtCore import Qt, QTimer, QUrl
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QUrl, Qt
 from PyQt6.QtGui import QPixmap, QImage
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
-from PyQt6.QtWidgets import QLabel
+from PyQt6.QtNetwork import QNetworkRequest
 
 from loguru import logger as logging
 
+from Modules.RadarDisplay.RadarCache import RadarCache
+from Modules.RadarDisplay.RadarDecoder import RadarDecoder
+from Modules.RadarDisplay.RadarFrameBudget import RadarFrameBudget
+from Utils.NetworkService import NetworkService
 from Utils.UtilMethods import get_host
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
 
-class RadarTile(QLabel):
-    MAX_PARSE_TIME = 0.01  # Maximum time to spend parsing responses in milliseconds per parse event
+class RadarTile(QObject):
+    """
+    Fetches and stores the radar frames for one map tile, the frames are painted by the RadarCanvas
+    """
+    ZOOM = 4
+    SIZE = 256
 
-    def __init__(self, host, parent=None, x=0, y=0):
+    def __init__(self, host, parent=None, x=0, y=0, scheduler=None):
         super().__init__(parent)
-        self.parent = parent
+        self.parent = parent  # type: RadarCanvas
         self.host = host
-        self.setFixedSize(256, 256)
+        self.scheduler = scheduler  # type: RadarFetchScheduler
         self.tile_x = x
         self.tile_y = y
-        self.screen_x = 0
-        self.screen_y = 0
-        self.setPixmap(QPixmap(f"Assets/MapTiles/{self.tile_x}-{self.tile_y}.png").
-                       scaled(self.width(), self.height(), Qt.AspectRatioMode.KeepAspectRatio,
-                              Qt.TransformationMode.SmoothTransformation))
 
         self.timestamps = []
 
-        self.radar_images = []
-        self.displayed_radar_image = 0
-        self.setStyleSheet("background-color: white;")
-        self.radar_overlay = QLabel(self)
-        self.radar_overlay.setFixedSize(256, 256)
-        self.radar_overlay.setStyleSheet('background-color: transparent;')
-        self.radar_overlay.raise_()
-
-        self.network_manager = QNetworkAccessManager()
-        self.network_manager.finished.connect(self.handle_response)
-
-        self.response_queue = queue.Queue()
-        self.parse_timer = QTimer(self)
-        self.parse_timer.timeout.connect(self.parse_responses)
-        self.parse_timer.start(100 + int(random.random() * 50))
+        # {timestamp: QPixmap | QImage | None}, None means the frame was evicted (or never decoded) and is fetched
+        # again through the scheduler, from the disk cache if it's there, when it is next painted
+        self.frames = {}
+        self.levels = {}  # {(timestamp, level): QPixmap} downscaled copies of frames for zoomed out views
+        self.reloading = set()  # Timestamps of placeholders being fetched or decoded again
 
         self.total_frames = 0
         self.outstanding_requests = 0
         self.outstanding_parses = 0
-        self.loading = False
-
-        self.visibility_timer = QTimer(self)
-        self.visibility_timer.timeout.connect(self.start_loading)
-
-    def position(self, x, y):
-        self.screen_x = x
-        self.screen_y = y
 
     def load_radar_overlays(self, timestamps):
-        self.timestamps = timestamps
-        self.start_loading()
-        self.visibility_timer.start(100 + int(random.random() * 50))
-
-    def start_loading(self):
-        # self.debug_title.setText(f"{self.tile_x}-{self.tile_y} [{self.on_screen()}]")
-        # return
-        if not self.on_screen():
-            return
-        self.loading = True
-        self.visibility_timer.stop()
-        # logging.info(f"{self.tile_x}-{self.tile_y} is on screen")
+        self.timestamps = list(timestamps)
+        self.total_frames += len(self.timestamps)
+        self.outstanding_requests += len(self.timestamps)
         for timestamp in self.timestamps:
+            self.scheduler.enqueue(self, timestamp)
+
+    def fetch_frame(self, timestamp):
+        """
+        Called by the scheduler when this frame's turn comes up, returns True if a network request was sent
+        """
+        data = RadarCache.instance().get(timestamp, self.tile_x, self.tile_y, self.ZOOM)
+        if data is not None:
+            self.outstanding_requests -= 1
+            self.store(timestamp, data)
+            return False
+        NetworkService.instance().get(
+            QNetworkRequest(QUrl(f"{get_host()}/weather/radar/{timestamp}/{self.tile_x}/{self.tile_y}/{self.ZOOM}")),
+            self.handle_response)
+        return True
+
+    def store(self, timestamp, data):
+        # Frames of tiles outside the viewport are left on disk and decoded when they are first painted
+        if self.on_screen():
+            self.decode(timestamp, data)
+        else:
+            self.frames.setdefault(timestamp, None)
+            self.reloading.discard(timestamp)
+
+    def pixmap_for(self, timestamp, level=1):
+        frame = self.frames.get(timestamp)
+        if isinstance(frame, QPixmap):
+            RadarFrameBudget.instance().touch(self, timestamp)
+            if level == 1:
+                return frame
+            if (timestamp, level) not in self.levels:
+                scaled = frame.scaled(round(self.SIZE * level), round(self.SIZE * level),
+                                      Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+                self.levels[(timestamp, level)] = scaled
+                RadarFrameBudget.instance().add_pixmap(self, timestamp, self.frame_bytes(timestamp))
+            return self.levels[(timestamp, level)]
+        if isinstance(frame, QImage):
+            # Promote a frame that was demoted to save memory back to a pixmap now that it is being painted again
+            pixmap = QPixmap.fromImage(frame)
+            self.frames[timestamp] = pixmap
+            RadarFrameBudget.instance().add_pixmap(self, timestamp, frame.sizeInBytes())
+            return self.pixmap_for(timestamp, level)
+        if timestamp in self.frames and timestamp not in self.reloading:
+            # Goes back through the scheduler rather than straight to the disk cache, the write may have failed
+            self.reloading.add(timestamp)
             self.outstanding_requests += 1
-            self.total_frames += 1
-            self.network_manager.get(
-                QNetworkRequest(QUrl(f"{get_host()}/weather/radar/{timestamp}/{self.tile_x}/{self.tile_y}/4")))
-
-    def set_radar_overlay(self, timestamp):
-        self.displayed_radar_image = timestamp
-        for radar_image in self.radar_images:
-            if radar_image['timestamp'] == timestamp:
-                self.radar_overlay.setPixmap(QPixmap.fromImage(radar_image['image']))
-                return
-        self.radar_overlay.setPixmap(QPixmap())
+            self.scheduler.enqueue(self, timestamp)
+        return None
+
+    def frame_bytes(self, timestamp):
+        # The frame and every pyramid level made from it are accounted to the budget as one entry
+        pixmaps = [self.frames[timestamp]] + [pixmap for (level_timestamp, _), pixmap in self.levels.items()
+                                              if level_timestamp == timestamp]
+        return sum(pixmap.width() * pixmap.height() * pixmap.depth() // 8 for pixmap in pixmaps)
+
+    def drop_levels(self, timestamp):
+        for key in [key for key in self.levels if key[0] == timestamp]:
+            self.levels.pop(key)
+
+    def demote_frame(self, timestamp):
+        self.drop_levels(timestamp)
+        image = self.frames[timestamp].toImage()
+        self.frames[timestamp] = image
+        return image.sizeInBytes()
+
+    def evict_frame(self, timestamp):
+        self.drop_levels(timestamp)
+        self.frames[timestamp] = None
 
     def handle_response(self, reply):
-        # Defer the parsing of the response to a background loop that only runs once every 100ms to prevent
-        # holding up the refresh of the main UI
         try:
             timestamp = int(reply.url().toString().split('/')[-4])  # Extract the timestamp from the URL
             self.outstanding_requests -= 1
+            self.scheduler.request_finished(self, timestamp)
             if str(reply.error()) != "NetworkError.NoError":
                 logging.error(f"Failed to load map tile {self.tile_x}-{self.tile_y}@{timestamp}: {reply.error()}")
+                self.reloading.discard(timestamp)
+                return
+            data = reply.readAll().data()
+            if not data.startswith(PNG_SIGNATURE):
+                # An error or login page served with a success status, don't let it into the cache
+                logging.error(f"Map tile {self.tile_x}-{self.tile_y}@{timestamp} is not a PNG")
+                self.reloading.discard(timestamp)
                 return
-            self.response_queue.put(reply)
+            RadarCache.instance().put(timestamp, self.tile_x, self.tile_y, self.ZOOM, data)
+            self.store(timestamp, data)
         except Exception as e:
             logging.error(f"Failed to handle radar response: {e}")
             logging.exception(e)
+        finally:
             reply.deleteLater()
 
-    def parse_responses(self):
-        parse_start = time.time()
-        # starting_size = len(self.radar_images)
-        while not self.response_queue.empty() and time.time() - parse_start < self.MAX_PARSE_TIME:
-            reply = self.response_queue.get()
-            timestamp = int(reply.url().toString().split('/')[-4])  # Extract the timestamp from the URL
-            try:
-                data = reply.readAll()
-                image = QImage.fromData(data)
-                # Resize the image to 256x256 pixels
-                image = image.scaled(self.width(), self.height(),
-                                     Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                self.radar_images.append({"timestamp": timestamp, "image": image})
-                if timestamp == self.displayed_radar_image:
-                    self.radar_overlay.setPixmap(QPixmap.fromImage(image))
-            except Exception as e:
-                logging.error(f"Failed to load map tile {self.tile_x}-{self.tile_y}@{timestamp}: {e}")
-                logging.exception(e)
-            finally:
-                reply.deleteLater()  # Clean up the reply object
-        # print(f"Parsed {len(self.radar_images) - starting_size} images in {time.time() - parse_start:.2f}s")
-        if self.outstanding_requests == 0 and self.response_queue.empty() and self.loading:
-            # logging.info(f"Finished parsing {len(self.radar_images)} images for {self.tile_x}-{self.tile_y}")
-            self.parse_timer.stop()
-
-    def change_size(self, factor):
-        self.setFixedSize(round(self.width() * factor),
-                          round(self.height() * factor))
-        self.radar_overlay.setFixedSize(round(self.radar_overlay.width() * factor),
-                                        round(self.radar_overlay.height() * factor))
-        # Resize the map tile image to match the new size
-        self.setPixmap(QPixmap(f"Assets/MapTiles/{self.tile_x}-{self.tile_y}.png").
-                       scaled(self.width(), self.height(), Qt.AspectRatioMode.KeepAspectRatio,
-                              Qt.TransformationMode.SmoothTransformation))
-        self.radar_images.clear()
+    def decode(self, timestamp, data):
+        # Decoding happens on the RadarDecoder pool, the GUI thread only turns the finished image into a pixmap
+        self.outstanding_parses += 1
+        RadarDecoder.instance().decode(data, self.SIZE, self.SIZE,
+                                       lambda image: self.handle_decoded(timestamp, image))
+
+    def handle_decoded(self, timestamp, image):
+        if sip.isdeleted(self):
+            return  # The radar was closed while this frame was decoding
+        self.outstanding_parses -= 1
+        self.reloading.discard(timestamp)
+        if image.isNull():
+            logging.error(f"Failed to decode map tile {self.tile_x}-{self.tile_y}@{timestamp}")
+            RadarCache.instance().discard(timestamp, self.tile_x, self.tile_y, self.ZOOM)
+            self.frames.pop(timestamp, None)  # So painting doesn't keep fetching it again
+            return
+        self.drop_levels(timestamp)
+        self.frames[timestamp] = QPixmap.fromImage(image)
+        RadarFrameBudget.instance().add_pixmap(self, timestamp, image.sizeInBytes())
+        self.parent.tile_updated(self, timestamp)
 
     def on_screen(self):
-        # Check if the tile is visible on the main window (not just the parent widget)
-        # Get the parent surfaces X and Y coordinates
-        parent_x = self.parent.x()
-        parent_y = self.parent.y()
-        # Offset the parent's coordinates by the tile's coordinates
-        parent_x += self.x()
-        parent_y += self.y()
-        # If the value is negative, the tile is off the left or top of the screen
-        if parent_x < -256 or parent_y < -256:
-            return False
-        # If the value is greater than the parent's parent's width or height, the tile is off the right or bottom
-        if parent_x > self.parent.parent().width() or parent_y > self.parent.parent().height():
-            return False
-        return True
-
-
+        return self.parent.tile_visible(self)
@@ -11,6 +11,7 @@ from Utils.RoomDevice import RoomDevice
 
 class AutoLightController(RoomDevice):
     supported_types = ["light_controller"]
+    rendered_fields = ("state", "health")
 
     def __init__(self, parent=None, device=None, priority=0):
         super().__init__(parent, device, False, priority)
@@ -1,5 +1,3 @@
-import json
-
 from PyQt6.QtCore import Qt, QTimer, QUrl
 from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 from PyQt6.QtWidgets import QLabel, QPushButton, QSlider, QWidget
@@ -141,7 +139,7 @@ class LIFXDevice(RoomDevice):
         # Convert 0-100 to 0-255
         brightness = round(brightness / 100 * 255)
         logging.info(f"Setting brightness of light: {self.device} to {brightness}")
-        payload = json.dumps({"brightness": brightness})
+        payload = {"brightness": brightness}
         self.send_command(payload)
 
     def mousePressEvent(self, a0) -> None:
@@ -1,5 +1,3 @@
-import json
-
 from PyQt6.QtCore import Qt, QTimer, QUrl
 from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 from PyQt6.QtWidgets import QLabel, QPushButton, QSlider, QWidget
@@ -159,7 +157,7 @@ class LevitonDevice(RoomDevice):
 
     def set_brightness(self, brightness):
         logging.info(f"Setting brightness of light: {self.device} to {brightness}")
-        payload = json.dumps({"brightness": brightness})
+        payload = {"brightness": brightness}
         self.send_command(payload)
 
     def mousePressEvent(self, a0) -> None:
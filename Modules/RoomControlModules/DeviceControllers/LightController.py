@@ -1,5 +1,3 @@
-import json
-
 from PyQt6.QtCore import Qt, QUrl, QTimer, QIODevice
 from PyQt6.QtGui import QColor
 from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
@@ -14,6 +12,7 @@ from Utils.UtilMethods import has_internet, network_error_to_string, clean_error
 class LightController(RoomDevice):
 
     supported_types = ["abstract_rgb"]
+    rendered_fields = ("state", "health")
 
     def __init__(self, parent=None, device=None, priority=0):
         super().__init__(parent, device, True, priority)
@@ -83,11 +82,11 @@ class LightController(RoomDevice):
         # If R G and B are the same instead of setting the color we should set the white level
         if color.red() == color.green() == color.blue():
             logging.info(f"Setting white level of light: {self.device} to {color.red()}")
-            payload = json.dumps({"white": color.red()})
+            payload = {"white": color.red()}
             self.send_command(payload)
             return
         # self.color_picker_button.setStyleSheet(f"background: {color.name()}; font-size: 14px; font-weight: bold;")
-        payload = json.dumps({"color": [color.red(), color.green(), color.blue()]})
+        payload = {"color": [color.red(), color.green(), color.blue()]}
         self.send_command(payload)
 
     def open_color_picker(self):
@@ -10,6 +10,7 @@ from Utils.BaseWidgets import StandardButton, TargetSelector
 
 class MideaDevice(RoomDevice):
     supported_types = ["MideaDevice"]
+    rendered_fields = ("state",)
 
     class Modes(enum.IntEnum):
         AUTO = 1
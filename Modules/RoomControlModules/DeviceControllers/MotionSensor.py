@@ -3,7 +3,6 @@ import time
 
 from PyQt6.QtCore import Qt, QTimer, QUrl
 from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
-from PyQt6.QtWidgets import QLabel, QPushButton
 
 from loguru import logger as logging
 
@@ -13,6 +12,8 @@ from Utils.UtilMethods import has_internet, network_error_to_string
 
 class ToggleDevice(RoomDevice):
     supported_types = ["MotionDetector"]
+    rendered_fields = ("state",)
+    paintable = True
 
     def __init__(self, parent=None, device=None, priority=0):
         super().__init__(parent, device, False, priority)
@@ -20,7 +21,7 @@ class ToggleDevice(RoomDevice):
         self.device_label.setStyleSheet("color: black; font-size: 14px; font-weight: bold; border: none;")
         self.device_label.setText(f"[{device}]")
 
-        self.device_text = QLabel(self)
+        self.device_text = self.make_label()
         self.device_text.setFont(parent.font)
         self.device_text.setFixedSize(135, 50)
         self.device_text.setAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignBottom)
@@ -1,6 +1,6 @@
 from Modules.RoomControlModules.DeviceControllers.ToggleDevice import ToggleDevice
 from Utils.RoomDevice import RoomDevice
-from PyQt6.QtCore import QTimer
+from Utils.TaskScheduler import TaskScheduler
 
 
 class RadiatorDevice(ToggleDevice, RoomDevice):
@@ -9,7 +9,7 @@ class RadiatorDevice(ToggleDevice, RoomDevice):
     def __init__(self, parent=None, device=None, priority=0):
         super().__init__(parent, device, priority)
         self.spinner_phase = 0
-        self.text_update_timer = QTimer()
+        self.text_update_timer = TaskScheduler.instance().timer_for(self)
         self.text_update_timer.timeout.connect(self.update_status)
         # self.text_update_timer.start(500)
         self.text_update_timer.setSingleShot(True)
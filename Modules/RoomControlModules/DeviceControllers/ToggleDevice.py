@@ -1,7 +1,6 @@
 import time
 
 from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QLabel, QPushButton
 
 from loguru import logger as logging
 
@@ -11,6 +10,7 @@ from Utils.UtilMethods import has_internet, network_error_to_string
 
 class ToggleDevice(RoomDevice):
     supported_types = ["VoiceMonkeyDevice", "abstract_toggle_device", "Relay"]
+    paintable = True
 
     def __init__(self, parent=None, device=None, priority=0):
         super().__init__(parent, device, False, priority)
@@ -18,7 +18,7 @@ class ToggleDevice(RoomDevice):
         self.device_label.setStyleSheet("color: black; font-size: 14px; font-weight: bold; border: none;")
         self.device_label.setText(f"[{device}]")
 
-        self.toggle_button = QPushButton(self)
+        self.toggle_button = self.make_button()
         self.toggle_button.setFont(parent.font)
         self.toggle_button.setFixedSize(135, 30)
         self.toggle_button.setStyleSheet("color: black; font-size: 14px; font-weight: bold; background-color: grey")
@@ -27,7 +27,7 @@ class ToggleDevice(RoomDevice):
         self.toggle_button.clicked.connect(self.toggle_device)
         self.toggle_button.move(5, 40)
 
-        self.device_text = QLabel(self)
+        self.device_text = self.make_label()
         self.device_text.setFont(parent.font)
         self.device_text.setFixedSize(135, 20)
         self.device_text.setAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignBottom)
@@ -16,6 +16,7 @@ from Utils.UtilMethods import has_internet, network_error_to_string
 class UPSDevice(RoomDevice):
 
     supported_types = ["UPSDevice"]
+    rendered_fields = ("state", "health")
 
     def __init__(self, parent=None, device=None, priority=0):
         super().__init__(parent, device, True, priority)
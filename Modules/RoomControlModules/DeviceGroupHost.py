@@ -1,22 +1,18 @@
 import json
+from PyQt6 import sip
 from PyQt6.QtCore import QUrl, Qt, QTimer
-from PyQt6.QtNetwork import QNetworkRequest, QNetworkAccessManager, QNetworkReply
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
 from PyQt6.QtWidgets import QLabel, QMenu, QDialog, QLineEdit, QDialogButtonBox, QFormLayout
 
 from loguru import logger as logging
 
 from Modules.RoomControlModules.DeviceControllers.NotInitializedDevice import NotInitializedDevice
-from Utils.RoomDevice import RoomDevice
-
-import os
+from Modules.RoomControlModules import SkylineLayout
+from Modules.RoomControlModules.DeviceRegistry import DeviceRegistry
+from Utils.NetworkService import NetworkService
 
 from Utils.UtilMethods import get_host, get_auth
 
-if os.path.exists("Modules/RoomControlModules/DeviceControllers"):
-    for file in os.listdir("Modules/RoomControlModules/DeviceControllers"):
-        if file.endswith(".py") and not file.startswith("__"):
-            __import__(f"Modules.RoomControlModules.DeviceControllers.{file[:-3]}")
-
 
 class DeviceGroupHost(QLabel):
 
@@ -35,6 +31,7 @@ class DeviceGroupHost(QLabel):
         self.lines = []
         self.font = self.parent.font
         self.pending_parent_layout = False
+        self.pending_layout = False
 
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_group_menu)
@@ -67,47 +64,7 @@ class DeviceGroupHost(QLabel):
         self.device_names = []
         self.delete_on_rebuild = False
 
-        self.type_manager = QNetworkAccessManager()
-        self.type_manager.finished.connect(self.create_widget)
-
-        self.name_manager = QNetworkAccessManager()
-        self.name_manager.finished.connect(self.handle_name_response)
-
-        self.group_schema_manager = QNetworkAccessManager()
-        self.group_schema_manager.finished.connect(self.handle_group_schema_response)
-
-    def make_name_request(self, device):
-        request = QNetworkRequest(QUrl(f"{get_host()}/name/{device}"))
-        request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
-        self.name_manager.get(request)
-
-    def handle_name_response(self, reply):
-        try:
-            original_query = reply.request().url().toString()
-            device = original_query.split("/")[-1]
-            match reply.error():
-                case QNetworkReply.NetworkError.NoError:
-                    pass  # No error
-                case QNetworkReply.NetworkError.ContentNotFoundError:
-                    logging.warning(f"Device name not found for: {device}")
-                    reply.deleteLater()
-                    return
-                case _:
-                    logging.error(f"Network error getting device name for {device}: {reply.errorString()}")
-                    reply.deleteLater()
-                    return
-            # Get the data from the reply
-            data = reply.readAll()
-            for widget in self.device_widgets:
-                if widget.device == device:
-                    widget.update_human_name(str(data, 'utf-8'))
-        except Exception as e:
-            logging.error(f"Error handling network response: {e}")
-            logging.exception(e)
-        finally:
-            reply.deleteLater()
-
-    def widget_add(self, widget):
+    def widget_add(self, widget, layout=True):
         # Make a widget of the same device name isn't already in the list
         for w in self.device_widgets:
             if w.device == widget.device:
@@ -115,7 +72,8 @@ class DeviceGroupHost(QLabel):
                 widget.deleteLater()
                 return
         self.device_widgets.append(widget)
-        self.layout_widgets()
+        if layout:
+            self.request_layout()
 
     def widgets_delete(self):
         logging.warning(f"Deleting widgets for {self.group_name}")
@@ -125,6 +83,32 @@ class DeviceGroupHost(QLabel):
         self.device_widgets.clear()
         self.layout_widgets()
 
+    def detach_widget(self, widget):
+        """
+        Remove a widget from this host without destroying it so it can be adopted by another host
+        """
+        if widget in self.device_widgets:
+            self.device_widgets.remove(widget)
+        if widget.device in self.device_names:
+            self.device_names.remove(widget.device)
+
+    def adopt_widget(self, widget, priority):
+        widget.setParent(self)
+        widget.parent = self
+        widget.priority = str(priority)
+        self.device_widgets.append(widget)
+        self.device_names.append(widget.device)
+
+    def remove_widget(self, widget):
+        self.detach_widget(widget)
+        widget.hide()
+        widget.deleteLater()
+
+    def rename(self, group_name):
+        self.group_name = group_name
+        self.group_label.setText(f"{group_name}")
+        self.no_devices_label.setText(f"No Devices Found For {group_name}")
+
     def widgets_rebuild(self):
         """
         Called by a widget when it determines that it's type does not match the server's type.
@@ -152,37 +136,58 @@ class DeviceGroupHost(QLabel):
             device = original_query.split("/")[-1]
             data = response.readAll()
             device_type = data.data().decode("utf-8")
-            found = False
-            for widget_class in RoomDevice.__subclasses__():
-                # Find a widget class that supports the device type
-                if widget_class.supports_type(device_type):
-                    widget = widget_class(self, device, priority)
-                    self.widget_add(widget)
-                    found = True
-                    break
-            if not found:
-                widget = NotInitializedDevice(self, device, priority)
-                self.widget_add(widget)
-                logging.warning(f"Device ({device}) of type [{device_type}] not supported")
-            self.layout_widgets()
+            self.create_device_widget(device, priority, device_type)
+            self.request_layout()
+            self.parent.check_tiles_created()
         except Exception as e:
             logging.error(f"Error handling network response: {e}")
             logging.exception(e)
         finally:
             response.deleteLater()
 
+    def create_device_widget(self, device, priority, device_type):
+        """
+        Create the widget for a device whose type is already known, the caller is responsible for laying out the host
+        """
+        if device not in self.device_names:
+            return  # The device was moved or removed by a schema reload while its type was being requested
+        widget_class = DeviceRegistry.instance().widget_class(device_type)
+        if widget_class is not None:
+            self.widget_add(widget_class(self, device, str(priority)), layout=False)
+            return
+        self.widget_add(NotInitializedDevice(self, device, str(priority)), layout=False)
+        logging.warning(f"Device ({device}) of type [{device_type}] not supported")
+
+    def has_pending_devices(self):
+        return len(set(self.device_names) - {widget.device for widget in self.device_widgets}) > 0
+
     def add_device(self, device: str, priority: int = 0, refresh: bool = False):
         request = QNetworkRequest(QUrl(f"{get_host()}/get_type/{device}"))
         request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
         request.setRawHeader(b"Priority", bytes(str(priority), 'utf-8'))
         if not refresh:  # Prevents getting stuck in an infinite loop if we are rebuilding widgets
             self.device_names.append(device)
-        self.type_manager.get(request)
+        NetworkService.instance().get(request, self.create_widget)
 
     def sort_widgets(self):
         # Sort devices first by size, then type, then name (so the order is consistent independent of the load order)
         self.device_widgets.sort(key=lambda x: (x.width(), x.priority, x.__class__.__name__, x.device), reverse=True)
 
+    def request_layout(self):
+        """
+        Lay the widgets out once the current event loop pass is done, so a burst of widgets being added only costs one
+        layout
+        """
+        if self.pending_layout:
+            return
+        self.pending_layout = True
+
+        def _run():
+            self.pending_layout = False
+            if not sip.isdeleted(self):  # The host may have been removed by a schema reload in the meantime
+                self.layout_widgets()
+        QTimer.singleShot(0, _run)
+
     def layout_widgets(self):
         if len(self.device_widgets) == 0:
             self.no_devices_label.show()
@@ -194,129 +199,27 @@ class DeviceGroupHost(QLabel):
         else:
             self.no_devices_label.hide()
 
-        H_GAP = 5
-        V_GAP = 10
-        LEFT_PAD = 10
-        TOP_PAD = 20
         container_w = self.width()
 
         self.sort_widgets()
 
-        placed = []  # (x, y, w, h) per widget, indexed parallel to self.device_widgets
-
-        def can_place(x, y, w, h):
-            """Check position validity against all placed rects with gap constraints."""
-            if x + w > container_w:
-                return False
-            for px, py, pw, ph in placed:
-                sep_x = (x >= px + pw + H_GAP) or (x + w + H_GAP <= px)
-                sep_y = (y >= py + ph + V_GAP) or (y + h + V_GAP <= py)
-                if not (sep_x or sep_y):
-                    return False
-            return True
-
-        def find_position(w, h):
-            """Topmost-then-leftmost valid position from candidate edges."""
-            y_cands = sorted(set(
-                [TOP_PAD] + [py + ph + V_GAP for _, py, _, ph in placed]
-            ))
-            x_cands = sorted(set(
-                [LEFT_PAD] + [px + pw + H_GAP for px, _, pw, _ in placed]
-            ))
-            for y in y_cands:
-                for x in x_cands:
-                    if can_place(x, y, w, h):
-                        return x, y
-            # Fallback: below everything
-            max_y = max((py + ph + V_GAP for _, py, _, ph in placed), default=TOP_PAD)
-            return LEFT_PAD, max_y
-
-        for widget in self.device_widgets:
-            x, y = find_position(widget.width(), widget.height())
+        positions, rows, max_bottom = SkylineLayout.layout(
+            [(widget.width(), widget.height()) for widget in self.device_widgets], container_w, self.center)
+        for widget, (x, y), row_num in zip(self.device_widgets, positions, rows):
             widget.move(x, y)
             widget.show()
-            placed.append((x, y, widget.width(), widget.height()))
-
-        # Derive row numbers from distinct y positions
-        y_positions = sorted(set(y for _, y, _, _ in placed))
-        y_to_row = {y: i for i, y in enumerate(y_positions)}
-        for i, widget in enumerate(self.device_widgets):
-            widget.row_num = y_to_row[placed[i][1]]
-
-        if self.center:
-            # Group widget indices by row, compute per-row centering offset
-            rows = {}
-            for i, widget in enumerate(self.device_widgets):
-                rows.setdefault(widget.row_num, []).append(i)
-
-            # Build row bands so tall widgets influence rows they overlap.
-            y_positions = sorted(set(y for _, y, _, _ in placed))
-            max_bottom = max(y + h for _, y, _, h in placed)
-            row_bands = []
-            for i, y in enumerate(y_positions):
-                bottom = y_positions[i + 1] if i + 1 < len(y_positions) else max_bottom + V_GAP
-                row_bands.append((y, bottom))
-
-            for row_num, row_indices in rows.items():
-                # Use all widgets overlapping the row band to compute the row's visual bounds.
-                row_top, row_bottom = row_bands[row_num]
-                overlap_indices = [
-                    i for i, (_, y, _, h) in enumerate(placed)
-                    if y < row_bottom and (y + h) > row_top
-                ]
-                if not overlap_indices:
-                    continue
-                row_left = min(placed[i][0] for i in row_indices)
-                row_right = max(placed[i][0] + placed[i][2] for i in row_indices)
-
-                # Center within the padded content area, clamping to avoid crossing padding.
-                target_left = LEFT_PAD
-                target_right = container_w - LEFT_PAD
-                content_w = target_right - target_left
-                row_w = row_right - row_left
-                if row_w >= content_w:
-                    offset = target_left - row_left
-                else:
-                    # Clamp further to avoid overlapping widgets from other rows that share this band.
-                    row_center = (row_left + row_right) / 2
-                    min_left = target_left
-                    max_right = target_right
-                    for i in overlap_indices:
-                        if i in row_indices:
-                            continue
-                        b_left = placed[i][0]
-                        b_right = placed[i][0] + placed[i][2]
-                        blocker_center = (b_left + b_right) / 2
-                        if row_center >= blocker_center:
-                            min_left = max(min_left, b_right + H_GAP)
-                        else:
-                            max_right = min(max_right, b_left - H_GAP)
-
-                    desired_offset = round((target_left + target_right - (row_left + row_right)) / 2)
-                    new_left = row_left + desired_offset
-                    new_right = row_right + desired_offset
-                    if new_left < min_left:
-                        desired_offset += min_left - new_left
-                    if new_right > max_right:
-                        desired_offset -= new_right - max_right
-                    offset = desired_offset
-                for i in row_indices:
-                    w = self.device_widgets[i]
-                    w.move(w.x() + offset, w.y())
-                    px, py, pw, ph = placed[i]
-                    placed[i] = (px + offset, py, pw, ph)
+            widget.row_num = row_num
 
         self.group_label.setFixedSize(container_w - 10, 20)
         self.group_label.move(round((container_w - self.group_label.width()) / 2), 0)
 
-        if placed:
-            max_bottom = max(y + h for _, y, _, h in placed)
-            new_height = max_bottom + 5
-            height_changed = self.height() != new_height
-            self.setFixedSize(container_w, new_height)
-            self.parent.update()
-            if height_changed:
-                self._request_parent_layout()
+        new_height = max_bottom + 5
+        height_changed = self.height() != new_height
+        self.setFixedSize(container_w, new_height)
+        self.parent.update()
+        self.parent.queue_viewport_update()
+        if height_changed:
+            self._request_parent_layout()
 
     def _is_special_group(self):
         return self.group_name in ("Starred Devices", "Ungrouped Devices")
@@ -427,7 +330,8 @@ class DeviceGroupHost(QLabel):
         request = QNetworkRequest(QUrl(f"{get_host()}/update_group_schema?interface_name=testing"))
         request.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/json")
         request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
-        self.group_schema_manager.post(request, json.dumps(payload).encode("utf-8"))
+        NetworkService.instance().post(request, json.dumps(payload).encode("utf-8"),
+                                       self.handle_group_schema_response)
         self._trigger_reload()
 
     def change_group_priority(self):
@@ -446,7 +350,8 @@ class DeviceGroupHost(QLabel):
         request = QNetworkRequest(QUrl(f"{get_host()}/update_group_schema?interface_name=testing"))
         request.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/json")
         request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
-        self.group_schema_manager.post(request, json.dumps(payload).encode("utf-8"))
+        NetworkService.instance().post(request, json.dumps(payload).encode("utf-8"),
+                                       self.handle_group_schema_response)
         self._trigger_reload()
 
     def delete_group(self):
@@ -456,7 +361,8 @@ class DeviceGroupHost(QLabel):
         request = QNetworkRequest(QUrl(f"{get_host()}/delete_group_schema?interface_name=testing"))
         request.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/json")
         request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
-        self.group_schema_manager.sendCustomRequest(request, b"DELETE", json.dumps(payload).encode("utf-8"))
+        NetworkService.instance().send_custom_request(request, b"DELETE", json.dumps(payload).encode("utf-8"),
+                                                      self.handle_group_schema_response)
         self._trigger_reload()
 
     def handle_group_schema_response(self, reply):
@@ -0,0 +1,113 @@
+import ast
+import importlib
+import os
+import time
+
+from loguru import logger as logging
+
+from Utils.Singleton import Singleton
+
+CONTROLLER_DIR = "Modules/RoomControlModules/DeviceControllers"
+CONTROLLER_PACKAGE = "Modules.RoomControlModules.DeviceControllers"
+
+
+def build_manifest(directory=CONTROLLER_DIR):
+    """
+    Map every device type to the module and class of the controller that supports it by reading the class level
+    supported_types lists out of the controller sources, without importing (and so constructing PyQt classes for) any
+    of them
+    """
+    manifest = {}  # {device_type: (module, class name)}
+    if not os.path.exists(directory):
+        return manifest
+    for file in sorted(os.listdir(directory)):
+        if not file.endswith(".py") or file.startswith("__"):
+            continue
+        try:
+            with open(os.path.join(directory, file), "r", encoding="utf-8") as source:
+                tree = ast.parse(source.read(), filename=file)
+        except (OSError, SyntaxError) as e:
+            logging.error(f"Unable to read device controller {file}: {e}")
+            continue
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            for statement in node.body:
+                if not isinstance(statement, ast.Assign) or not any(
+                        isinstance(target, ast.Name) and target.id == "supported_types" for target in statement.targets):
+                    continue
+                try:
+                    supported_types = ast.literal_eval(statement.value)
+                except ValueError:
+                    logging.warning(f"{file}:{node.name} supported_types is not a literal, it can't be registered")
+                    continue
+                for device_type in supported_types:
+                    if device_type in manifest:
+                        logging.warning(f"Device type [{device_type}] is supported by both "
+                                        f"{manifest[device_type][1]} and {node.name}, using the first")
+                        continue
+                    manifest[device_type] = (f"{CONTROLLER_PACKAGE}.{file[:-3]}", node.name)
+    return manifest
+
+
+@Singleton
+class DeviceRegistry:
+    """
+    Looks up the RoomDevice class for a device type, importing each controller module only when a device of one of
+    its types first appears instead of importing every controller when the room control modules are loaded
+    """
+
+    def __init__(self):
+        self.manifest = None
+        self.classes = {}  # {device_type: class} for every type resolved so far
+        self.scan_time = 0.0
+
+    def load_manifest(self):
+        scan_start = time.perf_counter()
+        self.manifest = build_manifest()
+        self.scan_time = time.perf_counter() - scan_start
+        logging.info(f"Device controller manifest of {len(self.manifest)} types built in "
+                     f"{self.scan_time * 1000:.1f}ms")
+
+    def widget_class(self, device_type):
+        """
+        The controller class for a device type, or None if no controller supports it
+        """
+        if device_type in self.classes:
+            return self.classes[device_type]
+        if self.manifest is None:
+            self.load_manifest()
+        widget_class = None
+        if device_type in self.manifest:
+            module_name, class_name = self.manifest[device_type]
+            try:
+                import_start = time.perf_counter()
+                widget_class = getattr(importlib.import_module(module_name), class_name)
+                logging.debug(f"Resolved [{device_type}] to {class_name} "
+                              f"({(time.perf_counter() - import_start) * 1000:.1f}ms)")
+                if not widget_class.supports_type(device_type):
+                    logging.warning(f"{class_name} no longer supports [{device_type}] at runtime")
+                    widget_class = None
+            except Exception as e:
+                logging.error(f"Failed to load device controller {module_name}.{class_name}: {e}")
+                logging.exception(e)
+                widget_class = None
+        self.classes[device_type] = widget_class
+        return widget_class
+
+
+if __name__ == "__main__":
+    # Compare the cost of the manifest against eagerly importing every controller as DeviceGroupHost used to.
+    # Run with `python -m Modules.RoomControlModules.DeviceRegistry` from the repository root
+    start = time.perf_counter()
+    manifest = build_manifest()
+    scanned = time.perf_counter() - start
+    for device_type, (module, class_name) in sorted(manifest.items()):
+        print(f"{device_type:32} {module}.{class_name}")
+    import Utils.RoomDevice  # Shared by every controller, imported by the interface before any of them
+    start = time.perf_counter()
+    for file in sorted(os.listdir(CONTROLLER_DIR)):
+        if file.endswith(".py") and not file.startswith("__"):
+            importlib.import_module(f"{CONTROLLER_PACKAGE}.{file[:-3]}")
+    imported = time.perf_counter() - start
+    print(f"Manifest scan: {scanned * 1000:.1f}ms, importing every controller: {imported * 1000:.1f}ms")
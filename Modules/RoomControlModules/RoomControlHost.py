@@ -1,24 +1,40 @@
 import json
+import time
 
-from PyQt6.QtCore import QUrl, QTimer, Qt
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+from PyQt6 import sip
+from PyQt6.QtCore import QUrl, QUrlQuery, QTimer, Qt
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
 from PyQt6.QtWidgets import QLabel
 
 from Modules.RoomControlModules.DeviceGroupHost import DeviceGroupHost
 from loguru import logger as logging
 
+from Utils.CommandQueue import CommandQueue
+from Utils.DevicePoller import DevicePoller
+from Utils.DeviceStateStream import DeviceStateStream
+from Utils.HostHealth import HostHealth
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
+from Utils.NetworkService import NetworkService
 from Utils.ScrollableMenu import ScrollableMenu
-from Utils.UtilMethods import get_auth, clean_error_type, get_schema_url
+from Utils.TaskScheduler import TaskScheduler
+from Utils.UtilMethods import get_auth, clean_error_type, get_schema_url, is_using_push_mode, get_host
 
 
 class RoomControlHost(ScrollableMenu):
 
+    VIEWPORT_MARGIN = 150  # Tiles this close to the edge of the view keep polling so they are current as they scroll in
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedSize(parent.width(), parent.height() - self.y())
         self.internet_connected = False
 
         self.schema_data = {}
+        self.schema_host = None  # The server the current widgets were built from
+        self.bulk_types_supported = True
+        self.schema_requested = None  # When the schema was requested, for timing how long until every tile exists
+        self.viewport_update_queued = False
+        self.tiles_polling = (0, 0)  # (tiles polling, tiles shown or scrolled out of view)
         self.loading_label = QLabel(self)
         self.loading_label.setFont(self.font)
         self.loading_label.setFixedSize(600, 60)
@@ -35,18 +51,104 @@ class RoomControlHost(ScrollableMenu):
         self.device_group_hosts = []
         self.ungrouped_device_host = DeviceGroupHost(self, "Ungrouped Devices")
 
-        self.network_manager = QNetworkAccessManager()
+        self.network_manager = InstrumentedNetworkAccessManager()
         self.network_manager.finished.connect(self.handle_network_response)
 
-        self.retry_timer = QTimer(self)
+        self.retry_timer = TaskScheduler.instance().timer_for(self)
         self.retry_timer.timeout.connect(self.make_request)
         self.retry_timer.start(5000)  # Retry every 5 seconds
         self.retry_time = 5
 
+        self.render_report_timer = TaskScheduler.instance().timer_for(self)
+        self.render_report_timer.timeout.connect(self.report_render_skips)
+        self.render_report_timer.start(300000)
+
+        # Optional server push of device state, polling is used whenever the stream isn't connected
+        self.state_stream = DeviceStateStream(self.handle_push, self.handle_stream_connection)
+        self.set_push_mode(is_using_push_mode())
+
         self.make_request()
 
+    def set_push_mode(self, enabled):
+        if enabled:
+            self.state_stream.start()
+        else:
+            self.state_stream.stop()
+
+    def handle_stream_connection(self, connected):
+        logging.info(f"Device state stream {'connected' if connected else 'disconnected, resuming polling'}")
+        DevicePoller.instance().set_push_active(connected)
+
+    def handle_push(self, device, delta):
+        for host in [self.starred_device_host, self.ungrouped_device_host] + self.device_group_hosts:
+            for widget in host.device_widgets:
+                if widget.device == device:
+                    widget.apply_delta(delta)
+
+    def push_stats(self):
+        return self.state_stream.pushes_received, DevicePoller.instance().polls_avoided
+
+    def report_render_skips(self):
+        renders = skips = 0
+        for host in [self.starred_device_host, self.ungrouped_device_host] + self.device_group_hosts:
+            for widget in host.device_widgets:
+                renders += widget.renders
+                skips += widget.render_skips
+                total = widget.renders + widget.render_skips
+                if total:
+                    logging.debug(f"  {widget.device}: skipped {widget.render_skips} of {total} renders "
+                                  f"({widget.render_skips / total:.0%})")
+        if renders + skips:
+            logging.info(f"Skipped rendering {skips} of {renders + skips} unchanged device payloads "
+                         f"({skips / (renders + skips):.0%})")
+        commands = CommandQueue.stats()
+        if commands["commands"]:
+            confirm = commands["median_confirm_ms"]
+            logging.info(f"Sent {commands['commands']} device commands in {commands['requests']} requests, "
+                         f"median time to confirmation {'N/A' if confirm is None else f'{confirm:.0f}ms'}")
+
+    def queue_viewport_update(self):
+        if self.viewport_update_queued:
+            return
+        self.viewport_update_queued = True
+        QTimer.singleShot(0, self.update_viewport)
+
+    def update_viewport(self):
+        """
+        Suspend polling for every device tile outside the visible part of this menu (plus VIEWPORT_MARGIN)
+        """
+        self.viewport_update_queued = False
+        try:
+            view = self.rect().adjusted(0, -self.VIEWPORT_MARGIN, 0, self.VIEWPORT_MARGIN)
+            polling = total = 0
+            for host in [self.starred_device_host, self.ungrouped_device_host] + self.device_group_hosts:
+                for widget in host.device_widgets:
+                    widget.set_in_viewport(view.intersects(widget.geometry().translated(host.pos())))
+                    if host.isVisible():
+                        total += 1
+                        polling += widget.is_polling()
+            if (polling, total) != self.tiles_polling:
+                logging.debug(f"Polling {polling} of {total} device tiles")
+            self.tiles_polling = (polling, total)
+        except Exception as e:
+            logging.error(f"Error updating device tile viewport: {e}")
+            logging.exception(e)
+
     def reload_schema(self):
+        """
+        Fetch the schema again and reconcile the existing widgets against it, only when the server has been switched
+        are all the widgets torn down and rebuilt
+        """
+        if self.schema_host is None or self.schema_host == get_host():
+            DevicePoller.instance().request_poll()
+            self.make_request()
+            return
         self.loading_label.show()
+        DevicePoller.instance().reset()  # The different server may support batched polling
+        self.bulk_types_supported = True
+        if self.state_stream.enabled:  # Reconnect the stream to the new server
+            self.state_stream.stop()
+            self.state_stream.start()
         self.starred_device_host.deleteLater()
         self.ungrouped_device_host.deleteLater()
         for widget in self.device_group_hosts:
@@ -58,34 +160,195 @@ class RoomControlHost(ScrollableMenu):
         self.make_request()
 
     def make_request(self):
+        health = HostHealth.instance()
+        if not health.available():
+            # The controller is down, HostHealth makes the request once it's back
+            health.when_available(self.make_request)
+            return
+        if self.schema_requested is None:
+            self.schema_requested = time.time()
         request = QNetworkRequest(QUrl(get_schema_url("testing")))
         request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
         self.network_manager.get(request)
 
     def process_schema_response(self, data):
+        """
+        Reconcile the device widgets against the new schema: widgets that already exist are kept (with their state)
+        and moved between group hosts as needed, only added devices are created and only removed devices are deleted
+        """
         self.schema_data = data
+        self.schema_host = get_host()
+        moved = removed = 0
+
+        # Index what currently exists, widgets by device and devices whose widgets are still being created
+        grouped_widgets, starred_widgets = {}, {}
+        grouped_pending, starred_pending = {}, {}
+        for host in [self.ungrouped_device_host] + self.device_group_hosts:
+            for widget in host.device_widgets:
+                grouped_widgets[widget.device] = (host, widget)
+        for host in [self.ungrouped_device_host] + self.device_group_hosts:
+            for device in host.device_names:
+                if device not in grouped_widgets or grouped_widgets[device][0] is not host:
+                    grouped_pending[device] = host
+        for widget in self.starred_device_host.device_widgets:
+            starred_widgets[widget.device] = widget
+        for device in self.starred_device_host.device_names:
+            if device not in starred_widgets:
+                starred_pending[device] = self.starred_device_host
+
+        # Groups that no longer exist, a group with exactly the same devices as one of these was renamed
+        group_devices = {}
+        for device_name, values in data.items():
+            if values["group"] is not None:
+                group_devices.setdefault(values["group"], set()).add(device_name)
+        hosts_by_name = {host.group_name: host for host in self.device_group_hosts}
+        orphaned = [host for host in self.device_group_hosts if host.group_name not in group_devices]
+        for group_name, devices in group_devices.items():
+            if group_name in hosts_by_name:
+                continue
+            for host in orphaned:
+                if set(host.device_names) == devices:
+                    logging.info(f"Group {host.group_name} renamed to {group_name}")
+                    orphaned.remove(host)
+                    host.rename(group_name)
+                    hosts_by_name[group_name] = host
+                    break
+            else:
+                hosts_by_name[group_name] = DeviceGroupHost(self, group_name)
+
+        touched = set()
+        additions = []  # [(host, device, priority)]
         for device_name, values in data.items():
             priority = values.get("priority", 0)
             if priority is None:
                 priority = 0
-            # Check if the device is in a group
+            # Starred devices have a second widget in the starred host
             if values["starred"] is True:
-                self.starred_device_host.add_device(device_name, priority)
-            if values["group"] is not None:
-                found = False
-                for widget in self.device_group_hosts:
-                    if widget.group_name == values["group"]:
-                        widget.add_device(device_name, priority)
-                        found = True
-                        break
-                if not found:
-                    self.device_group_hosts.append(DeviceGroupHost(self, values["group"]))
-                    self.device_group_hosts[-1].add_device(device_name, priority)
+                if device_name in starred_widgets:
+                    starred_widgets.pop(device_name).priority = str(priority)
+                elif starred_pending.pop(device_name, None) is None:
+                    additions.append((self.starred_device_host, device_name, priority))
+                touched.add(self.starred_device_host)
+            target = hosts_by_name[values["group"]] if values["group"] is not None else self.ungrouped_device_host
+            touched.add(target)
+            if device_name in grouped_widgets:
+                host, widget = grouped_widgets.pop(device_name)
+                if host is not target:
+                    host.detach_widget(widget)
+                    target.adopt_widget(widget, priority)
+                    touched.add(host)
+                    moved += 1
+                else:
+                    widget.priority = str(priority)
+            elif grouped_pending.get(device_name) is target:
+                grouped_pending.pop(device_name)
+            else:
+                host = grouped_pending.pop(device_name, None)
+                if host is not None:
+                    host.device_names.remove(device_name)
+                additions.append((target, device_name, priority))
+
+        # Anything left over is no longer in the schema
+        for host, widget in grouped_widgets.values():
+            host.remove_widget(widget)
+            touched.add(host)
+            removed += 1
+        for widget in starred_widgets.values():
+            self.starred_device_host.remove_widget(widget)
+            touched.add(self.starred_device_host)
+            removed += 1
+        for device, host in list(grouped_pending.items()) + list(starred_pending.items()):
+            host.device_names.remove(device)
+        for host in orphaned:
+            host.deleteLater()
+
+        # Keep the groups in the order they appear in the schema, the same order a fresh build would give
+        self.device_group_hosts = [hosts_by_name[group_name] for group_name in group_devices]
+        self.add_devices(additions)
+        for host in touched:
+            if host in self.device_group_hosts or host in (self.starred_device_host, self.ungrouped_device_host):
+                host.layout_widgets()
+        logging.info(f"Schema reconciled: {len(additions)} devices added, {moved} moved, {removed} removed, "
+                     f"{len(orphaned)} groups removed")
+        self.check_tiles_created()
+
+    def add_devices(self, additions):
+        """
+        Create widgets for newly added devices. Types included in the schema are used directly, the rest are fetched
+        with a single /get_types request, falling back to a /get_type request per device on servers without it
+        """
+        unknown = []
+        for host, device, priority in additions:
+            host.device_names.append(device)
+            device_type = self.schema_data.get(device, {}).get("type")
+            if device_type is not None:
+                host.create_device_widget(device, priority, device_type)
             else:
-                self.ungrouped_device_host.add_device(device_name, priority)
+                unknown.append((host, device, priority))
+        if len(unknown) == 0:
+            return
+        if not self.bulk_types_supported:
+            self.add_devices_individually(unknown)
+            return
+        query = QUrlQuery()
+        query.addQueryItem("devices", ",".join(sorted({device for _, device, _ in unknown})))
+        url = QUrl(f"{get_host()}/get_types")
+        url.setQuery(query)
+        request = QNetworkRequest(url)
+        request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
+        NetworkService.instance().get(request, lambda reply: self.handle_types_response(reply, unknown))
+
+    @staticmethod
+    def add_devices_individually(additions):
+        for host, device, priority in additions:
+            host.device_names.remove(device)  # add_device records the name itself
+            host.add_device(device, priority)
+
+    def handle_types_response(self, reply, additions):
+        try:
+            match reply.error():
+                case QNetworkReply.NetworkError.NoError:
+                    pass
+                case QNetworkReply.NetworkError.ContentNotFoundError | \
+                     QNetworkReply.NetworkError.ContentOperationNotPermittedError:
+                    logging.warning("Server does not support bulk device types, requesting each type individually")
+                    self.bulk_types_supported = False
+                    self.add_devices_individually(additions)
+                    return
+                case _:
+                    logging.error(f"Bulk device type request error: {reply.error()}")
+                    self.add_devices_individually(additions)
+                    return
+            types = json.loads(str(reply.readAll(), 'utf-8'))
+            hosts = set()
+            for host, device, priority in additions:
+                if sip.isdeleted(host):
+                    continue
+                host.create_device_widget(device, priority, types.get(device) or "")
+                hosts.add(host)
+            for host in hosts:
+                host.layout_widgets()
+            self.check_tiles_created()
+        except Exception as e:
+            logging.error(f"Error handling bulk device types: {e}")
+            logging.exception(e)
+        finally:
+            reply.deleteLater()
+
+    def check_tiles_created(self):
+        if self.schema_requested is None:
+            return
+        hosts = [self.starred_device_host, self.ungrouped_device_host] + self.device_group_hosts
+        if any(host.has_pending_devices() for host in hosts):
+            return
+        tiles = sum(len(host.device_widgets) for host in hosts)
+        logging.info(f"All {tiles} device tiles created {time.time() - self.schema_requested:.2f}s "
+                     f"after the schema was requested")
+        self.schema_requested = None
 
     def handle_network_response(self, reply):  # Schema response handler
         try:
+            HostHealth.instance().record(reply)
             data = reply.readAll()
             if reply.error() != QNetworkReply.NetworkError.NoError:
                 logging.error(f"Error: {reply.error()}")
@@ -157,6 +420,7 @@ class RoomControlHost(ScrollableMenu):
             widget.move(20, y)
             y += widget.height() + 10
         self.ungrouped_device_host.move(20, y)
+        self.queue_viewport_update()
 
     def layout_widgets(self, no_resize=False):
         width = self.width() - 40
@@ -179,6 +443,7 @@ class RoomControlHost(ScrollableMenu):
             for widget in self.device_group_hosts:
                 widget.hide()
             self.ungrouped_device_host.hide()
+            self.queue_viewport_update()
             return
         else:
             # Layout each device group host out in a vertical line
@@ -195,4 +460,5 @@ class RoomControlHost(ScrollableMenu):
                 y += widget.height() + 10
             self.ungrouped_device_host.show()
             self.ungrouped_device_host.move(20, y)
+            self.queue_viewport_update()
 
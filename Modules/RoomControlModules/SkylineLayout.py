@@ -0,0 +1,232 @@
+import bisect
+import time
+
+H_GAP = 5
+V_GAP = 10
+LEFT_PAD = 10
+TOP_PAD = 20
+
+
+def place(sizes, container_w):
+    """
+    Place each (width, height) in order at its topmost then leftmost free position, keeping H_GAP / V_GAP between
+    tiles, using a skyline of the lowest free y across the width of the container.
+    Every tile's footprint is widened by H_GAP on its right so the horizontal gap is just footprints not overlapping,
+    each tile only has to be checked against the few skyline segments under it rather than every tile already placed.
+    Returns a list of (x, y) parallel to sizes.
+    """
+    right = container_w + H_GAP
+    skyline = [[LEFT_PAD, right, TOP_PAD]]  # [start, end, free y] segments covering [LEFT_PAD, right) in order
+    positions = []
+    for w, h in sizes:
+        span = w + H_GAP
+        best_x, best_y, best_i = None, None, None
+        for i, (x, _, _) in enumerate(skyline):
+            if x + span > right:
+                break  # Segments are in order so no later segment can fit the tile either
+            y = skyline[i][2]
+            j = i + 1
+            while j < len(skyline) and skyline[j][0] < x + span:
+                y = max(y, skyline[j][2])
+                j += 1
+            if best_y is None or y < best_y:
+                best_x, best_y, best_i = x, y, i
+        if best_x is None:
+            # Wider than the container, put it on its own below everything
+            best_x, best_y = LEFT_PAD, max(segment[2] for segment in skyline)
+            skyline = [[LEFT_PAD, right, best_y + h + V_GAP]]
+        else:
+            raise_skyline(skyline, best_i, best_x, best_x + span, best_y + h + V_GAP)
+        positions.append((best_x, best_y))
+    return positions
+
+
+def raise_skyline(skyline, first, start, end, y):
+    last = first
+    while last < len(skyline) and skyline[last][0] < end:
+        last += 1
+    replaced = [[start, end, y]]
+    tail = skyline[last - 1]
+    if tail[1] > end:  # The last covered segment continues past the tile
+        replaced.append([end, tail[1], tail[2]])
+    skyline[first:last] = replaced
+    # Merge with neighbours of the same height so the number of segments stays bounded by the number of columns
+    for i in (first + len(replaced) - 1, first):
+        if 0 < i < len(skyline) and skyline[i - 1][2] == skyline[i][2]:
+            skyline[i - 1][1] = skyline[i][1]
+            del skyline[i]
+
+
+def center_rows(sizes, positions, container_w):
+    """
+    Shift each row of tiles to the middle of the container, without moving it into a taller tile from an earlier row
+    that reaches down into it. Rows are the distinct y positions, returns the row number of every tile.
+    """
+    y_positions = sorted(set(y for _, y in positions))
+    row_of = {y: i for i, y in enumerate(y_positions)}
+    rows = {}
+    for i, (_, y) in enumerate(positions):
+        rows.setdefault(row_of[y], []).append(i)
+
+    # Every tile is listed under each row band it overlaps, a band runs from its row's y to the next row's y
+    bands = [[] for _ in y_positions]
+    for i, ((_, h), (_, y)) in enumerate(zip(sizes, positions)):
+        for band in range(row_of[y], max(bisect.bisect_left(y_positions, y + h), row_of[y] + 1)):
+            bands[band].append(i)
+
+    target_left = LEFT_PAD
+    target_right = container_w - LEFT_PAD
+    for row_num, row_indices in rows.items():
+        row_left = min(positions[i][0] for i in row_indices)
+        row_right = max(positions[i][0] + sizes[i][0] for i in row_indices)
+        if row_right - row_left >= target_right - target_left:
+            offset = target_left - row_left
+        else:
+            row_center = (row_left + row_right) / 2
+            min_left = target_left
+            max_right = target_right
+            members = set(row_indices)
+            for i in bands[row_num]:
+                if i in members:
+                    continue
+                b_left = positions[i][0]
+                b_right = positions[i][0] + sizes[i][0]
+                if row_center >= (b_left + b_right) / 2:
+                    min_left = max(min_left, b_right + H_GAP)
+                else:
+                    max_right = min(max_right, b_left - H_GAP)
+            offset = round((target_left + target_right - (row_left + row_right)) / 2)
+            if row_left + offset < min_left:
+                offset += min_left - (row_left + offset)
+            if row_right + offset > max_right:
+                offset -= row_right + offset - max_right
+        for i in row_indices:
+            positions[i] = (positions[i][0] + offset, positions[i][1])
+    return [row_of[y] for _, y in positions]
+
+
+def layout(sizes, container_w, center=False):
+    """
+    Lay out tiles of the given sizes in a container of the given width.
+    Returns the (x, y) of each tile, its row number and the bottom of the lowest tile.
+    """
+    if len(sizes) == 0:
+        return [], [], 0
+    positions = place(sizes, container_w)
+    if center:
+        rows = center_rows(sizes, positions, container_w)
+    else:
+        y_positions = sorted(set(y for _, y in positions))
+        row_of = {y: i for i, y in enumerate(y_positions)}
+        rows = [row_of[y] for _, y in positions]
+    bottom = max(y + h for (_, h), (_, y) in zip(sizes, positions))
+    return positions, rows, bottom
+
+
+def legacy_layout(sizes, container_w, center=False):
+    """
+    The candidate edge search DeviceGroupHost.layout_widgets used before the skyline, kept to check the skyline
+    against and to time it in the benchmark
+    """
+    placed = []
+
+    def can_place(x, y, w, h):
+        if x + w > container_w:
+            return False
+        for px, py, pw, ph in placed:
+            sep_x = (x >= px + pw + H_GAP) or (x + w + H_GAP <= px)
+            sep_y = (y >= py + ph + V_GAP) or (y + h + V_GAP <= py)
+            if not (sep_x or sep_y):
+                return False
+        return True
+
+    def find_position(w, h):
+        y_cands = sorted(set([TOP_PAD] + [py + ph + V_GAP for _, py, _, ph in placed]))
+        x_cands = sorted(set([LEFT_PAD] + [px + pw + H_GAP for px, _, pw, _ in placed]))
+        for y in y_cands:
+            for x in x_cands:
+                if can_place(x, y, w, h):
+                    return x, y
+        return LEFT_PAD, max((py + ph + V_GAP for _, py, _, ph in placed), default=TOP_PAD)
+
+    for w, h in sizes:
+        x, y = find_position(w, h)
+        placed.append((x, y, w, h))
+    y_positions = sorted(set(y for _, y, _, _ in placed))
+    y_to_row = {y: i for i, y in enumerate(y_positions)}
+    row_nums = [y_to_row[y] for _, y, _, _ in placed]
+    if center:
+        rows = {}
+        for i, row_num in enumerate(row_nums):
+            rows.setdefault(row_num, []).append(i)
+        max_bottom = max(y + h for _, y, _, h in placed)
+        row_bands = []
+        for i, y in enumerate(y_positions):
+            bottom = y_positions[i + 1] if i + 1 < len(y_positions) else max_bottom + V_GAP
+            row_bands.append((y, bottom))
+        for row_num, row_indices in rows.items():
+            row_top, row_bottom = row_bands[row_num]
+            overlap_indices = [i for i, (_, y, _, h) in enumerate(placed) if y < row_bottom and (y + h) > row_top]
+            row_left = min(placed[i][0] for i in row_indices)
+            row_right = max(placed[i][0] + placed[i][2] for i in row_indices)
+            target_left = LEFT_PAD
+            target_right = container_w - LEFT_PAD
+            if row_right - row_left >= target_right - target_left:
+                offset = target_left - row_left
+            else:
+                row_center = (row_left + row_right) / 2
+                min_left = target_left
+                max_right = target_right
+                for i in overlap_indices:
+                    if i in row_indices:
+                        continue
+                    b_left = placed[i][0]
+                    b_right = placed[i][0] + placed[i][2]
+                    if row_center >= (b_left + b_right) / 2:
+                        min_left = max(min_left, b_right + H_GAP)
+                    else:
+                        max_right = min(max_right, b_left - H_GAP)
+                offset = round((target_left + target_right - (row_left + row_right)) / 2)
+                if row_left + offset < min_left:
+                    offset += min_left - (row_left + offset)
+                if row_right + offset > max_right:
+                    offset -= row_right + offset - max_right
+            for i in row_indices:
+                px, py, pw, ph = placed[i]
+                placed[i] = (px + offset, py, pw, ph)
+    return [(x, y) for x, y, _, _ in placed], row_nums, max(y + h for _, y, _, h in placed)
+
+
+def benchmark():
+    """
+    Time the skyline against the previous layout for groups of 10 to 500 device tiles of the sizes RoomDevice uses,
+    checking both produce the same positions.
+    Run with `python -m Modules.RoomControlModules.SkylineLayout`
+    """
+    import argparse
+    import random
+
+    parser = argparse.ArgumentParser(description="Benchmark the device group layout")
+    parser.add_argument("--width", type=int, default=920)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 50, 100, 250, 500])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tile_sizes = [(145, 75), (295, 75), (295, 160)]  # Small, large and tall RoomDevices
+    for count in args.counts:
+        sizes = [rng.choices(tile_sizes, weights=(6, 3, 1))[0] for _ in range(count)]
+        sizes.sort(reverse=True)  # DeviceGroupHost lays tiles out widest first
+        for center in (False, True):
+            start = time.perf_counter()
+            skyline = layout(sizes, args.width, center)
+            skyline_time = time.perf_counter() - start
+            start = time.perf_counter()
+            legacy = legacy_layout(sizes, args.width, center)
+            legacy_time = time.perf_counter() - start
+            print(f"{count:4} tiles{' centred' if center else '        '}: skyline {skyline_time * 1000:8.2f}ms, "
+                  f"previous {legacy_time * 1000:9.2f}ms, {'identical' if skyline == legacy else 'DIFFERENT'}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,13 +1,16 @@
 import json
 import os
 
-from PyQt6.QtCore import Qt, QTimer, QUrl
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+from PyQt6.QtCore import Qt, QUrl
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
 from PyQt6.QtWidgets import QLabel, QMenu, QInputDialog
 
 from Modules.RoomSceneModules.SceneEditor.SceneEditorFlyout import SceneEditorFlyout
 from Modules.RoomSceneModules.SceneWidget import SceneWidget
+from Utils.HostHealth import HostHealth
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
 from Utils.ScrollableMenu import ScrollableMenu
+from Utils.TaskScheduler import TaskScheduler
 from loguru import logger as logging
 
 from Utils.UtilMethods import get_host, get_auth
@@ -35,7 +38,7 @@ class RoomSceneHost(ScrollableMenu):
         self.scene_data = None
         self.scene_widgets = []
 
-        self.network_manager = QNetworkAccessManager()
+        self.network_manager = InstrumentedNetworkAccessManager()
         self.network_manager.finished.connect(self.handle_network_response)
 
         self.folder_level_label = QLabel(self)
@@ -50,16 +53,21 @@ class RoomSceneHost(ScrollableMenu):
 
         self.hide()
 
-        self.retry_timer = QTimer(self)
+        self.retry_timer = TaskScheduler.instance().timer_for(self)
         self.retry_timer.timeout.connect(self.make_request)
         self.retry_timer.start(5000)
 
-        self.refresh_timer = QTimer(self)
+        self.refresh_timer = TaskScheduler.instance().timer_for(self)
         self.refresh_timer.timeout.connect(self.make_request)
 
         self.make_request()
 
     def make_request(self):
+        health = HostHealth.instance()
+        if not health.available():
+            # The controller is down, HostHealth makes the request once it's back
+            health.when_available(self.make_request)
+            return
         logging.info("Requesting routine data")
         request = QNetworkRequest(QUrl(f"{get_host()}/scene_get/scenes/null"))
         request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
@@ -67,6 +75,7 @@ class RoomSceneHost(ScrollableMenu):
 
     def handle_network_response(self, reply):
         try:
+            HostHealth.instance().record(reply)
             if reply.error() != QNetworkReply.NetworkError.NoError:
                 logging.error(f"Error: {reply.error()}")
                 self.retry_timer.start(5000)
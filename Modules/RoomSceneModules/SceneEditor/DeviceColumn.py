@@ -1,11 +1,9 @@
-from PyQt6.QtCore import Qt, QUrl
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QLabel
 from loguru import logger as logging
 
 from Modules.RoomSceneModules.SceneEditor.DeviceTile import DeviceTile
 from Utils.ScrollableMenu import ScrollableMenu
-from Utils.UtilMethods import get_host, get_auth
 
 
 class DeviceColumn(ScrollableMenu):
@@ -41,9 +39,6 @@ class DeviceColumn(ScrollableMenu):
             self.column_name.setText(f"{column_name} [?]")
         self.column_name.move(0, 2)
 
-        self.name_manager = QNetworkAccessManager()
-        self.name_manager.finished.connect(self.handle_name_response)
-
         self.placeholder_label = QLabel(self)
         self.placeholder_label.setFont(self.font)
         self.placeholder_label.setFixedSize(280, 100)
@@ -61,28 +56,6 @@ class DeviceColumn(ScrollableMenu):
 
         self.layout_widgets()
 
-    def make_name_request(self, device):
-        request = QNetworkRequest(QUrl(f"{get_host()}/name/{device}"))
-        request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
-        self.name_manager.get(request)
-
-    def handle_name_response(self, reply):
-        try:
-            # Get the original query
-            original_query = reply.request().url().toString()
-            # Get the device name from the query
-            device = original_query.split("/")[-1]
-            # Get the data from the reply
-            data = reply.readAll()
-            for widget in self.device_labels:
-                if widget.device == device:
-                    widget.update_human_name(str(data, 'utf-8'))
-        except Exception as e:
-            logging.error(f"Error handling network response: {e}")
-            logging.exception(e)
-        finally:
-            reply.deleteLater()
-
     def has_device(self, device):
         for label in self.device_labels:
             if label.device == device:
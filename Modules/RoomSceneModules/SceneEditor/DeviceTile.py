@@ -1,11 +1,13 @@
 import json
 
 from PyQt6.QtCore import Qt, QUrl, QTimer
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtNetwork import QNetworkRequest
 from PyQt6.QtWidgets import QLabel, QInputDialog
 from loguru import logger as logging
 
 from Modules.RoomSceneModules.SceneEditor.SceneActionEditor import SceneActionEditor
+from Utils.NameRegistry import NameRegistry
+from Utils.NetworkService import NetworkService
 from Utils.UtilMethods import get_host, get_auth
 
 
@@ -59,10 +61,7 @@ class DeviceTile(QLabel):
         self.action_text.setText("Actions: Not Set")
         self.action_text.move(2, 17)
 
-        self.parent.make_name_request(device)
-
-        self.info_getter = QNetworkAccessManager()
-        self.info_getter.finished.connect(self.handle_info_response)
+        NameRegistry.instance().subscribe(device, self.update_human_name)
 
         self.single_click_timer = QTimer(self)
         self.single_click_timer.setSingleShot(True)
@@ -172,7 +171,7 @@ class DeviceTile(QLabel):
     def get_data(self):
         request = QNetworkRequest(QUrl(f"{get_host()}/get/{self.device}"))
         request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
-        self.info_getter.get(request)
+        NetworkService.instance().get(request, self.handle_info_response, coalesce=True)
 
     def update_human_name(self, name):
         if name == "Device Not Found":
@@ -2,8 +2,9 @@ from logging import logProcesses
 
 from PyQt6.QtCore import QUrl
 from PyQt6.QtWidgets import QComboBox, QLineEdit, QPushButton, QLabel
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
 from Modules.RoomSceneModules.SceneEditor.SceneActionTiles.BaseAction import BaseAction
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
 from Utils.UtilMethods import get_auth, get_host
 
 from loguru import logger as logging
@@ -36,7 +37,7 @@ class RoutineControlAction(BaseAction):
         self.action_type = action[0]
         self.total_actions = len(action[1])
         self.routines = []
-        self.network_manager = QNetworkAccessManager()
+        self.network_manager = InstrumentedNetworkAccessManager()
         self.network_manager.finished.connect(self.handle_routine_response)
         self.add_routine_button = None
 
@@ -1,13 +1,14 @@
 import json
 
 from PyQt6.QtCore import Qt, QUrl
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtNetwork import QNetworkRequest
 from PyQt6.QtWidgets import QLabel, QPushButton, QDialog, QMessageBox, QProgressDialog, QApplication, QInputDialog
 from loguru import logger as logging
 
 from Modules.RoomSceneModules.SceneEditor.DeviceActionEditor import DeviceActionEditor
 from Modules.RoomSceneModules.SceneEditor.DeviceColumn import DeviceColumn
 from Modules.RoomSceneModules.SceneEditor.TriggerColumn import TriggerColumn
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
 from Utils.UtilMethods import get_auth, get_schema_url
 
 
@@ -90,10 +91,10 @@ class SceneEditorFlyout(QDialog):
 
         # self.action_editor = DeviceActionEditor(self)
 
-        self.schema_getter = QNetworkAccessManager()
+        self.schema_getter = InstrumentedNetworkAccessManager()
         self.schema_getter.finished.connect(self.handle_schema_response)
 
-        self.scene_request = QNetworkAccessManager()
+        self.scene_request = InstrumentedNetworkAccessManager()
         self.scene_request.finished.connect(self.handle_scene_response)
 
         self.save_button = QPushButton(self)
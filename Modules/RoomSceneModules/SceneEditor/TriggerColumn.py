@@ -2,11 +2,12 @@ import copy
 import json
 
 from PyQt6.QtCore import Qt, QUrl
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtNetwork import QNetworkRequest
 from PyQt6.QtWidgets import QLabel
 from loguru import logger as logging
 
 from Modules.RoomSceneModules.SceneEditor.TriggerTile import TriggerTile
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
 from Utils.ScrollableMenu import ScrollableMenu
 from Utils.UtilMethods import get_host, get_auth
 
@@ -40,7 +41,7 @@ class TriggerColumn(ScrollableMenu):
                                     round(self.height() / 2 - self.place_holder_text.height() / 2))
 
         self.trigger_labels = []
-        self.default_trigger_network_manager = QNetworkAccessManager()
+        self.default_trigger_network_manager = InstrumentedNetworkAccessManager()
         self.default_trigger_network_manager.finished.connect(self.handle_default_trigger_response)
 
         self.layout_widgets()
@@ -2,10 +2,11 @@ import json
 import re
 
 from PyQt6.QtCore import Qt, QUrl, QTimer
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtNetwork import QNetworkRequest
 from PyQt6.QtWidgets import QLabel, QPushButton, QMenu, QApplication
 from loguru import logger as logging
 from Modules.RoomSceneModules.SceneEditor.SceneEditorFlyout import SceneEditorFlyout
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
 from Utils.UtilMethods import get_host, get_auth
 
 
@@ -121,7 +122,7 @@ class SceneWidget(QLabel):
         self.double_click_timer.setSingleShot(True)
         self.double_click_primed = None
 
-        self.scene_caller = QNetworkAccessManager()
+        self.scene_caller = InstrumentedNetworkAccessManager()
         self.scene_caller.finished.connect(self.handle_scene_response)
 
         self.menu = QMenu(self)
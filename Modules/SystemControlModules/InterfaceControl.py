@@ -2,12 +2,14 @@ import os
 import subprocess
 import time
 
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QLabel, QPushButton, QDialog, QMessageBox, QStyleFactory
 import psutil
 import humanize
 from loguru import logger as logging
 
+from Utils.TaskScheduler import TaskScheduler
+
 
 class InterfaceControl(QLabel):
 
@@ -34,7 +36,7 @@ class InterfaceControl(QLabel):
         self.interface_stats.setStyleSheet("color: black; font-size: 15px; font-weight: bold; border: none; background-color: transparent")
         self.interface_stats.move(5, 20)
 
-        self.interface_stats_update_timer = QTimer(self)
+        self.interface_stats_update_timer = TaskScheduler.instance().timer_for(self)
         self.interface_stats_update_timer.timeout.connect(self.update_interface_stats)
         # self.interface_stats_update_timer.start(1000)
         self.last_network_bytes = 0
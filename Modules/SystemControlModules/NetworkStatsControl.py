@@ -0,0 +1,102 @@
+from PyQt6.QtCore import Qt, QUrl
+from PyQt6.QtWidgets import QLabel, QPushButton
+from loguru import logger as logging
+
+from Utils.NetworkMetrics import NetworkMetrics, endpoint_template
+from Utils.TaskScheduler import TaskScheduler
+from Utils.UtilMethods import get_host
+
+
+class NetworkStatsControl(QLabel):
+    """
+    Card showing the requests each endpoint has made since startup (or the last reset), slowest total first
+    """
+
+    ROWS = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.font = self.parent.font
+        self.setStyleSheet("background-color: #ffcd00; border: 2px solid #ffcd00; border-radius: 10px")
+        self.setFixedSize(430, 130)
+        self.page = 0
+
+        self.title_label = QLabel(self)
+        self.title_label.setFont(self.font)
+        self.title_label.setFixedSize(430, 20)
+        self.title_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignCenter)
+        self.title_label.setStyleSheet("color: black; font-size: 15px; font-weight: bold; border: none; background-color: transparent")
+        self.title_label.setText("Network Requests")
+
+        self.endpoint_stats = QLabel(self)
+        self.endpoint_stats.setFont(self.font)
+        self.endpoint_stats.setFixedSize(420, 70)
+        self.endpoint_stats.setText("<pre>No requests yet</pre>")
+        self.endpoint_stats.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+        self.endpoint_stats.setStyleSheet("color: black; font-size: 11px; border: none; background-color: transparent")
+        self.endpoint_stats.move(5, 20)
+
+        self.stats_update_timer = TaskScheduler.instance().timer_for(self)
+        self.stats_update_timer.timeout.connect(self.update_endpoint_stats)
+
+        self.next_button = self.make_button("Next", 5, self.next_page)
+        self.dump_button = self.make_button("Dump", 110, self.dump)
+        self.reset_button = self.make_button("Reset", 215, self.reset)
+
+    def make_button(self, text, x, callback):
+        button = QPushButton(self)
+        button.setFont(self.font)
+        button.setFixedSize(100, 30)
+        button.setText(text)
+        button.setStyleSheet("color: white; font-size: 14px; font-weight: bold; background-color: grey;"
+                             "border: none; border-radius: 10px")
+        button.move(x, 90)
+        button.clicked.connect(callback)
+        return button
+
+    def showEvent(self, a0):
+        super().showEvent(a0)
+        self.update_endpoint_stats()
+        self.stats_update_timer.start(1000)
+
+    def hideEvent(self, a0):
+        super().hideEvent(a0)
+        self.stats_update_timer.stop()
+
+    def update_endpoint_stats(self):
+        try:
+            endpoints = NetworkMetrics.instance().busiest()
+            if not endpoints:
+                self.endpoint_stats.setText("<pre>No requests yet</pre>")
+                return
+            pages = (len(endpoints) + self.ROWS - 1) // self.ROWS
+            self.page %= pages
+            # The controller's endpoints are shown without its host, other hosts are shown in full
+            controller = endpoint_template(QUrl(get_host()))  # host:port/
+            lines = [f"{'Endpoint':<25}{'Reqs':>6}{'p50':>6}{'p95':>6}{'p99':>6}{'KB':>6}{'Err':>5}"]
+            for template, stats in endpoints[self.page * self.ROWS:(self.page + 1) * self.ROWS]:
+                if template.startswith(controller):
+                    template = template[len(controller) - 1:]
+                lines.append(f"{template[-25:]:<25}{stats.count:>6}{stats.percentile(0.5):>6}"
+                             f"{stats.percentile(0.95):>6}{stats.percentile(0.99):>6}"
+                             f"{round(stats.bytes_in / 1024):>6}{sum(stats.errors.values()):>5}")
+            self.title_label.setText(f"Network Requests ({self.page + 1}/{pages})")
+            self.endpoint_stats.setText("<pre>" + "\n".join(lines) + "</pre>")
+        except Exception as e:
+            logging.error(f"Error updating network stats: {e}")
+            logging.exception(e)
+
+    def next_page(self):
+        self.page += 1
+        self.update_endpoint_stats()
+
+    def dump(self):
+        path = NetworkMetrics.instance().dump()
+        self.dump_button.setText("Dumped" if path is not None else "Failed")
+
+    def reset(self):
+        NetworkMetrics.instance().reset()
+        self.page = 0
+        self.dump_button.setText("Dump")
+        self.update_endpoint_stats()
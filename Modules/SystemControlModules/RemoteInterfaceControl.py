@@ -4,12 +4,13 @@ import subprocess
 import time
 
 from PyQt6.QtCore import Qt, QTimer, QUrl
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtNetwork import QNetworkRequest
 from PyQt6.QtWidgets import QLabel, QPushButton, QDialog, QMessageBox, QStyleFactory
 import humanize
 from loguru import logger as logging
 
 from Modules.SystemControlModules.InterfaceControl import InterfaceControl
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
 from Utils.UtilMethods import get_host, get_auth
 
 
@@ -25,7 +26,7 @@ class RemoteInterfaceControl(InterfaceControl):
 
         self.title_label.setText(f"{self.name} Interface Info")
 
-        self.network_manager = QNetworkAccessManager()
+        self.network_manager = InstrumentedNetworkAccessManager()
         self.network_manager.finished.connect(self.handle_network_response)
 
     def send_command(self, command):
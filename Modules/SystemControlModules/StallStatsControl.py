@@ -0,0 +1,94 @@
+import time
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QLabel, QPushButton
+from loguru import logger as logging
+
+from Utils.StallWatchdog import StallWatchdog
+from Utils.TaskScheduler import TaskScheduler
+
+
+class StallStatsControl(QLabel):
+    """
+    Card showing how often the event loop has stalled since startup (or the last reset) and what was running when it did
+    """
+
+    ROWS = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.font = self.parent.font
+        self.setStyleSheet("background-color: #ffcd00; border: 2px solid #ffcd00; border-radius: 10px")
+        self.setFixedSize(430, 130)
+
+        self.title_label = QLabel(self)
+        self.title_label.setFont(self.font)
+        self.title_label.setFixedSize(430, 20)
+        self.title_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignCenter)
+        self.title_label.setStyleSheet("color: black; font-size: 15px; font-weight: bold; border: none; background-color: transparent")
+        self.title_label.setText("Event Loop Stalls")
+
+        self.stall_stats = QLabel(self)
+        self.stall_stats.setFont(self.font)
+        self.stall_stats.setFixedSize(420, 70)
+        self.stall_stats.setText("<pre>No stalls yet</pre>")
+        self.stall_stats.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+        self.stall_stats.setStyleSheet("color: black; font-size: 11px; border: none; background-color: transparent")
+        self.stall_stats.move(5, 20)
+
+        self.stats_update_timer = TaskScheduler.instance().timer_for(self)
+        self.stats_update_timer.timeout.connect(self.update_stall_stats)
+
+        self.dump_button = self.make_button("Dump", 5, self.dump)
+        self.reset_button = self.make_button("Reset", 110, self.reset)
+
+    def make_button(self, text, x, callback):
+        button = QPushButton(self)
+        button.setFont(self.font)
+        button.setFixedSize(100, 30)
+        button.setText(text)
+        button.setStyleSheet("color: white; font-size: 14px; font-weight: bold; background-color: grey;"
+                             "border: none; border-radius: 10px")
+        button.move(x, 90)
+        button.clicked.connect(callback)
+        return button
+
+    @staticmethod
+    def format_bound(bound):
+        return f"{bound}ms" if bound < 1000 else f"{bound / 1000:g}s"
+
+    def showEvent(self, a0):
+        super().showEvent(a0)
+        self.update_stall_stats()
+        self.stats_update_timer.start(1000)
+
+    def hideEvent(self, a0):
+        super().hideEvent(a0)
+        self.stats_update_timer.stop()
+
+    def update_stall_stats(self):
+        try:
+            watchdog = StallWatchdog.instance()
+            minutes = max(1, round((time.time() - watchdog.since) / 60))
+            self.title_label.setText(f"Event Loop Stalls ({len(watchdog.stalls)} in {minutes}m)")
+            if len(watchdog.stalls) == 0:
+                self.stall_stats.setText("<pre>No stalls yet</pre>")
+                return
+            histogram = " ".join(f"{self.format_bound(bound)}+:{count}" for bound, count in watchdog.histogram())
+            lines = [histogram, f"{'Culprit':<40}{'#':>4}{'ms':>7}"]
+            for culprit, count, total in watchdog.culprits()[:self.ROWS]:
+                lines.append(f"{culprit[-40:]:<40}{count:>4}{round(total):>7}")
+            self.stall_stats.setText("<pre>" + "\n".join(lines) + "</pre>")
+        except Exception as e:
+            logging.error(f"Error updating stall stats: {e}")
+            logging.exception(e)
+
+    def dump(self):
+        path = StallWatchdog.instance().dump()
+        self.dump_button.setText("Dumped" if path is not None else "Failed")
+
+    def reset(self):
+        StallWatchdog.instance().reset()
+        self.dump_button.setText("Dump")
+        self.update_stall_stats()
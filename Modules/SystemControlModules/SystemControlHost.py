@@ -1,14 +1,19 @@
 import json
 import os
 
-from PyQt6.QtCore import QTimer, QUrl, Qt
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtCore import QUrl, Qt
+from PyQt6.QtNetwork import QNetworkRequest
 from PyQt6.QtWidgets import QLabel
 from loguru import logger as logging
 
 from Modules.SystemControlModules.LocalInterfaceControl import LocalInterfaceControl
+from Modules.SystemControlModules.NetworkStatsControl import NetworkStatsControl
 from Modules.SystemControlModules.RemoteInterfaceControl import RemoteInterfaceControl
+from Modules.SystemControlModules.StallStatsControl import StallStatsControl
+from Utils.HostHealth import HostHealth
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
 from Utils.ScrollableMenu import ScrollableMenu
+from Utils.TaskScheduler import TaskScheduler
 from Utils.UtilMethods import get_host, get_auth
 
 
@@ -22,8 +27,10 @@ class SystemControlHost(ScrollableMenu):
 
         self.system_widgets = []
         self.system_widgets.append(LocalInterfaceControl(self))
+        self.system_widgets.append(NetworkStatsControl(self))
+        self.system_widgets.append(StallStatsControl(self))
 
-        self.network_manager = QNetworkAccessManager()
+        self.network_manager = InstrumentedNetworkAccessManager()
         self.network_manager.finished.connect(self.handle_network_response)
 
         self.hide()
@@ -36,11 +43,11 @@ class SystemControlHost(ScrollableMenu):
         self.title_label.move(round((self.width() - self.title_label.width()) / 2), 5)
         self.title_label.setFont(parent.get_font("JetBrainsMono-Regular"))
 
-        self.retry_timer = QTimer(self)
+        self.retry_timer = TaskScheduler.instance().timer_for(self)
         self.retry_timer.timeout.connect(self.make_request)
         self.retry_timer.start(5000)
 
-        self.refresh_timer = QTimer(self)
+        self.refresh_timer = TaskScheduler.instance().timer_for(self)
         self.refresh_timer.timeout.connect(self.refresh_interfaces)
         self.refresh_timer.start(300000)  # Refresh every 5 minutes
         self.make_request()
@@ -51,6 +58,11 @@ class SystemControlHost(ScrollableMenu):
             self.make_request()
 
     def make_request(self):
+        health = HostHealth.instance()
+        if not health.available():
+            # The controller is down, HostHealth makes the request once it's back
+            health.when_available(self.make_request)
+            return
         try:
             request = QNetworkRequest(QUrl(f"{get_host()}/get_system_monitors"))
             request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
@@ -67,6 +79,7 @@ class SystemControlHost(ScrollableMenu):
 
     def handle_network_response(self, reply):
         try:
+            HostHealth.instance().record(reply)
             if str(reply.error()) != "NetworkError.NoError":
                 logging.error(f"Error: {reply.error()}")
                 self.retry_timer.start(5000)
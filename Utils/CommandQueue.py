@@ -0,0 +1,148 @@
+import json
+import time
+from collections import deque
+
+from PyQt6 import sip
+from PyQt6.QtCore import QUrl, QTimer
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
+from loguru import logger as logging
+
+from Utils.NetworkService import NetworkService
+from Utils.UtilMethods import get_host, get_auth
+
+
+class CommandQueue:
+    """
+    Commands for one RoomDevice, successive commands within COALESCE_WINDOW of each other are merged (later values of
+    a field replace earlier ones) and sent as a single /set request at most MAX_DELAY after the first of them.
+    The values sent are shown on the tile straight away by overlaying them on the last state received from the
+    server, until a poll reports the same values, CONFIRM_TIMEOUT passes without one, or the request fails in which
+    case the tile goes back to the server's state.
+    Only fields of the device's state are merged, a command with any other field (an action such as the UPS's
+    preform_action) sends whatever is pending first so consecutive actions aren't collapsed into the last one.
+    """
+
+    COALESCE_WINDOW = 300
+    MAX_DELAY = 1000
+    CONFIRM_TIMEOUT = 10
+
+    # Totals across every device, for measuring how many requests coalescing saves
+    commands_submitted = 0
+    requests_sent = 0
+    confirm_latencies = deque(maxlen=100)  # Seconds from the first command of a request to the poll confirming it
+
+    def __init__(self, device):
+        self.device = device
+        self.pending = {}  # Merged command waiting to be sent
+        self.first_submitted = None
+        self.expected = {}  # {field: (value, time of the first command of its request)} until confirmed
+        self.send_timer = QTimer()
+        self.send_timer.setSingleShot(True)
+        self.send_timer.timeout.connect(self.flush)
+
+    def submit(self, command):
+        CommandQueue.commands_submitted += 1
+        if not self.coalescable(command):
+            self.flush()
+        now = time.time()
+        if self.first_submitted is None:
+            self.first_submitted = now
+        self.pending.update(command)
+        for field, value in command.items():
+            self.expected[field] = (value, self.first_submitted)
+        delay = min(self.COALESCE_WINDOW, max(0, round(self.MAX_DELAY - (now - self.first_submitted) * 1000)))
+        self.send_timer.start(delay)
+
+    def coalescable(self, command):
+        server_data = self.device.server_data
+        state = server_data.get("state") if isinstance(server_data, dict) else None
+        return isinstance(state, dict) and all(field in state for field in command)
+
+    def flush(self):
+        if not self.pending:
+            return
+        payload = self.pending
+        submitted = self.first_submitted
+        self.pending = {}
+        self.first_submitted = None
+        CommandQueue.requests_sent += 1
+        request = QNetworkRequest(QUrl(f"{get_host()}/set/{self.device.device}"))
+        request.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/json")
+        request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
+        NetworkService.instance().post(request, json.dumps(payload).encode("utf-8"),
+                                       lambda reply: self.handle_reply(reply, payload, submitted))
+
+    def handle_reply(self, reply, payload, submitted):
+        try:
+            if sip.isdeleted(self.device):
+                return
+            response_code = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+            if reply.error() == QNetworkReply.NetworkError.NoError and response_code in (200, 302):
+                self.device.request_refresh(0)
+                # A command that didn't change anything produces no push or changed poll to confirm it with
+                QTimer.singleShot((self.CONFIRM_TIMEOUT + 1) * 1000, self.expire)
+                return
+            logging.error(f"Command {payload} to {self.device.device} failed: {reply.error()}: {response_code}, "
+                          f"rolling back")
+            for field, value in payload.items():
+                # Leave the field alone if a newer command for it has been submitted since this one was sent
+                if self.expected.get(field) == (value, submitted):
+                    del self.expected[field]
+            self.device.render_expected()
+        except Exception as e:
+            logging.error(f"Error handling command response: {e}")
+            logging.exception(e)
+        finally:
+            reply.deleteLater()
+
+    def expire(self):
+        if sip.isdeleted(self.device) or self.device.server_data is None:
+            return
+        expected = len(self.expected)
+        self.reconcile(self.device.server_data)
+        if len(self.expected) != expected:
+            self.device.render_expected()
+
+    def overlay(self, data):
+        """
+        The payload with the values of any unconfirmed commands in place of the server's state
+        """
+        if not self.expected or data is None or not isinstance(data.get("state"), dict):
+            return data
+        state = dict(data["state"])
+        for field, (value, _) in self.expected.items():
+            if field in state:
+                state[field] = value
+        return {**data, "state": state}
+
+    def reconcile(self, data):
+        """
+        Drop the expected values a fresh payload from the server confirms (or that have waited too long to be) and
+        return the payload with the rest overlaid
+        """
+        if not self.expected or not isinstance(data.get("state"), dict):
+            return data
+        now = time.time()
+        for field, (value, submitted) in list(self.expected.items()):
+            if field in self.pending:
+                continue  # Not sent yet
+            if data["state"].get(field) == value:
+                del self.expected[field]
+                CommandQueue.confirm_latencies.append(now - submitted)
+                logging.info(f"{self.device.device} confirmed {field}={value} {(now - submitted) * 1000:.0f}ms "
+                             f"after it was set")
+            elif now - submitted > self.CONFIRM_TIMEOUT:
+                del self.expected[field]
+                if field in data["state"]:
+                    logging.warning(f"{self.device.device} never reported {field}={value}, "
+                                    f"showing the server's {data['state'][field]}")
+        return self.overlay(data)
+
+    @staticmethod
+    def stats():
+        latencies = sorted(CommandQueue.confirm_latencies)
+        return {
+            "commands": CommandQueue.commands_submitted,
+            "requests": CommandQueue.requests_sent,
+            "median_confirm_ms": latencies[len(latencies) // 2] * 1000 if latencies else None,
+        }
@@ -0,0 +1,207 @@
+import json
+
+from PyQt6 import sip
+from PyQt6.QtCore import QUrl, QUrlQuery, QTimer
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
+from loguru import logger as logging
+
+from Utils.HostHealth import HostHealth
+from Utils.NetworkService import NetworkService
+from Utils.Singleton import Singleton
+from Utils.TaskScheduler import TaskScheduler
+from Utils.UtilMethods import get_host, get_auth
+
+
+@Singleton
+class DevicePoller:
+    """
+    Polls the state of every visible RoomDevice with one batched /get_many request per tick instead of every widget
+    sending its own /get/{device} request, and fans the parsed state out to each widget.
+    If the server doesn't have the batch endpoint the poller disables itself and the widgets fall back to polling
+    themselves through RoomDevice.get_data.
+    While a push stream is active only devices that have never received any data are polled.
+    Each device is polled every few ticks depending on how often its state has been changing, a device that
+    changed since its last poll is polled twice as often and one that didn't a tick less often, between MIN_TICKS
+    and MAX_TICKS. Devices due on the same tick share a request.
+    """
+
+    TICK = 2500
+    MIN_TICKS = 1
+    START_TICKS = 2  # The fixed 5 second interval used before polling adapted
+    MAX_TICKS = 8
+
+    def __init__(self):
+        self.subscribers = {}  # {device_name: [RoomDevice]}
+        self.batch_supported = True
+        self.poll_in_flight = False
+        self.poll_queued = False
+        self.push_active = False
+        self.polls_avoided = 0
+        self.intervals = {}  # {device_name: ticks between polls}
+        self.countdown = {}  # {device_name: ticks until the next poll}, missing until the device is first polled
+        self.last_state = {}  # {device_name: (state, health)} from the last poll, to tell if it changed
+        self.polled = set()  # Devices in the request in flight
+
+        self.poll_timer = TaskScheduler.instance().timer_for()
+        self.poll_timer.timeout.connect(self.tick)
+        self.poll_timer.start(self.TICK)
+
+    def subscribe(self, widget):
+        widgets = self.subscribers.setdefault(widget.device, [])
+        if widget not in widgets:
+            widgets.append(widget)
+
+    def unsubscribe(self, widget):
+        widgets = self.subscribers.get(widget.device, [])
+        if widget in widgets:
+            widgets.remove(widget)
+        if len(widgets) == 0:
+            self.subscribers.pop(widget.device, None)
+            # Poll it straight away if it's shown again, its interval is kept
+            self.countdown.pop(widget.device, None)
+
+    def reset(self):
+        """
+        Called when the schema is reloaded or the server is switched, the new server may support batching again
+        """
+        self.batch_supported = True
+
+    def set_push_active(self, active):
+        self.push_active = active
+        if active:
+            return
+        # The push stream dropped, refresh everything now in case deltas were missed
+        if self.batch_supported:
+            self.request_poll()
+        else:
+            for _, widget in self.live_widgets():
+                widget.get_data()
+
+    def request_poll(self):
+        """
+        Queue a poll for the next event loop iteration so that every widget shown in the same pass shares one request
+        """
+        if self.poll_queued:
+            return
+        self.poll_queued = True
+        QTimer.singleShot(0, self.poll)
+
+    def tick(self):
+        for device in self.countdown:
+            self.countdown[device] -= 1
+        self.poll()
+
+    def poll(self):
+        """
+        Fetch every device that is due or hasn't been polled since it was shown
+        """
+        self.poll_queued = False
+        if not self.batch_supported or self.poll_in_flight:
+            return
+        health = HostHealth.instance()
+        if not health.available():
+            health.when_available(self.request_poll)
+            return
+        devices = [device for device in self.subscribers if self.countdown.get(device, 0) <= 0]
+        if self.push_active:
+            pushed = [device for device in devices
+                      if all(widget.data is not None and not widget.stale for widget in self.subscribers[device])]
+            self.polls_avoided += len(pushed)
+            devices = [device for device in devices if device not in pushed]
+        if len(devices) == 0:
+            return
+        query = QUrlQuery()
+        query.addQueryItem("devices", ",".join(devices))
+        url = QUrl(f"{get_host()}/get_many")
+        url.setQuery(query)
+        request = QNetworkRequest(url)
+        request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
+        request.setTransferTimeout(5000)
+        self.poll_in_flight = True
+        self.polled = set(devices)
+        NetworkService.instance().get(request, self.handle_response)
+
+    def live_widgets(self):
+        for device, widgets in list(self.subscribers.items()):
+            for widget in list(widgets):
+                if sip.isdeleted(widget):
+                    widgets.remove(widget)
+                    continue
+                yield device, widget
+            if len(widgets) == 0:
+                self.subscribers.pop(device, None)
+
+    def fall_back(self):
+        logging.warning("Server does not support batched device polling, falling back to per device polling")
+        self.batch_supported = False
+        for _, widget in self.live_widgets():
+            widget.get_data()
+
+    def adapt_interval(self, device, data):
+        if device in self.countdown and self.countdown[device] > 0:
+            return  # Already adapted for this poll, the device has more than one widget
+        state = (data.get("state"), data.get("health"))
+        ticks = self.intervals.get(device, self.START_TICKS)
+        if device in self.last_state:
+            if state != self.last_state[device]:
+                ticks = max(self.MIN_TICKS, ticks // 2)
+            else:
+                ticks = min(self.MAX_TICKS, ticks + 1)
+        self.last_state[device] = state
+        self.intervals[device] = ticks
+        self.countdown[device] = ticks
+
+    def average_interval(self):
+        """
+        Mean seconds between polls of the devices currently shown
+        """
+        intervals = [self.intervals.get(device, self.START_TICKS) for device in self.subscribers]
+        if len(intervals) == 0:
+            return None
+        return sum(intervals) / len(intervals) * self.TICK / 1000
+
+    def polled_widgets(self):
+        # Devices not due this tick or kept up to date by the push stream weren't in the batch
+        return [(device, widget) for device, widget in self.live_widgets() if device in self.polled]
+
+    def handle_response(self, reply):
+        try:
+            self.poll_in_flight = False
+            match reply.error():
+                case QNetworkReply.NetworkError.NoError:
+                    pass
+                case QNetworkReply.NetworkError.ContentNotFoundError | \
+                     QNetworkReply.NetworkError.ContentOperationNotPermittedError:
+                    self.fall_back()
+                    return
+                case _:
+                    logging.error(f"Batched device poll error: {reply.error()}")
+                    for _, widget in self.polled_widgets():
+                        widget.show_failure(reply)
+                    return
+            data = reply.readAll()
+            if 'WOPR Login' in str(data):
+                logging.error("Authentication error: WOPR Login found in response")
+                for _, widget in self.polled_widgets():
+                    widget.show_failure(reply)
+                return
+            data = json.loads(str(data, 'utf-8'))
+            for device, widget in self.polled_widgets():
+                try:
+                    device_data = data.get(device)
+                    if device_data is None:
+                        # Checked again at the slowest rate in case it is added to the server
+                        self.intervals[device] = self.MAX_TICKS
+                        self.countdown[device] = self.MAX_TICKS
+                        widget.handle_not_found()
+                    else:
+                        self.adapt_interval(device, device_data)
+                        widget.handle_data(device_data, reply.property("generation"))
+                except Exception as e:
+                    logging.error(f"Error handling batched data for {device}: {e}")
+                    logging.exception(e)
+        except Exception as e:
+            logging.error(f"Error handling batched device poll: {e}")
+            logging.exception(e)
+        finally:
+            reply.deleteLater()
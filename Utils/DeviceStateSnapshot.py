@@ -0,0 +1,125 @@
+import json
+import os
+import time
+from collections import OrderedDict
+
+from PyQt6.QtCore import QRunnable, QThreadPool
+from loguru import logger as logging
+
+from Utils.Singleton import Singleton
+from Utils.TaskScheduler import TaskScheduler
+from Utils.UtilMethods import get_host
+
+
+class SnapshotWriteTask(QRunnable):
+
+    def __init__(self, snapshot, path, body):
+        super().__init__()
+        self.snapshot = snapshot
+        self.path = path
+        self.body = body
+
+    def run(self):
+        try:
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(self.body)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            logging.error(f"Failed to save device state snapshot: {e}")
+        finally:
+            self.snapshot.writing = False
+
+
+@Singleton
+class DeviceStateSnapshot:
+    """
+    The last state payload received for each device, kept on disk so tiles can show the last known state as soon as
+    they are created after a restart or schema reload instead of placeholders until the controller answers.
+    Payloads are serialised as they are recorded and written out together at most once every WRITE_DELAY on a pool
+    thread, and only after a device's data has actually changed so a steady poll doesn't keep rewriting the file.
+    The snapshot holds at most MAX_DEVICES devices and skips any payload larger than MAX_ENTRY_BYTES.
+    """
+
+    PATH = "Cache/device_state.json"
+    WRITE_DELAY = 10000
+    MAX_DEVICES = 512
+    MAX_ENTRY_BYTES = 16 * 1024
+
+    def __init__(self):
+        self.host = get_host()
+        self.entries = OrderedDict()  # {device: serialised {"saved": float, "data": dict}}, least recently saved first
+        self.restored = {}  # {device: (data, saved)} loaded from disk for tiles that haven't had live data yet
+        self.states = {}  # {device: serialised data} to tell a changed state from a repeated poll
+        self.writing = False
+        self.writes = 0
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.write_timer = TaskScheduler.instance().timer_for()
+        self.write_timer.setSingleShot(True)
+        self.write_timer.timeout.connect(self.flush)
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.PATH):
+            return
+        try:
+            with open(self.PATH, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if snapshot.get("host") != self.host:
+                logging.info("Device state snapshot is from a different server, ignoring it")
+                return
+            for device, entry in snapshot["devices"].items():
+                self.restored[device] = (entry["data"], entry["saved"])
+                self.entries[device] = json.dumps(entry, separators=(",", ":"))
+                self.states[device] = json.dumps(entry["data"], separators=(",", ":"))
+            logging.info(f"Loaded last known state of {len(self.restored)} devices")
+        except Exception as e:
+            logging.error(f"Failed to load device state snapshot: {e}")
+            self.restored.clear()
+            self.entries.clear()
+            self.states.clear()
+
+    def lookup(self, device):
+        """
+        The last known data for a device and the time it was saved, or None if there is nothing to show
+        """
+        return self.restored.get(device)
+
+    def record(self, device, data):
+        if get_host() != self.host:  # Switched server, the old states don't apply to it
+            self.host = get_host()
+            self.entries.clear()
+            self.restored.clear()
+            self.states.clear()
+        self.restored.pop(device, None)
+        try:
+            state = json.dumps(data, separators=(",", ":"))
+        except (TypeError, ValueError) as e:
+            logging.error(f"Unable to snapshot state of {device}: {e}")
+            return
+        entry = f'{{"saved":{json.dumps(time.time())},"data":{state}}}'
+        if len(entry) > self.MAX_ENTRY_BYTES:
+            return
+        changed = self.states.get(device) != state
+        # An unchanged state still refreshes its saved time, it's written out with the next change
+        self.entries[device] = entry
+        self.states[device] = state
+        self.entries.move_to_end(device)
+        while len(self.entries) > self.MAX_DEVICES:
+            evicted, _ = self.entries.popitem(last=False)
+            self.states.pop(evicted, None)
+        if changed and not self.write_timer.isActive():
+            self.write_timer.start(self.WRITE_DELAY)
+
+    def flush(self):
+        if self.writing:
+            self.write_timer.start(self.WRITE_DELAY)  # Try again once the previous write has finished
+            return
+        body = "".join([
+            '{"host":', json.dumps(self.host), ',"devices":{',
+            ",".join(f"{json.dumps(device)}:{entry}" for device, entry in self.entries.items()),
+            "}}"])
+        os.makedirs(os.path.dirname(self.PATH), exist_ok=True)
+        self.writing = True
+        self.writes += 1
+        self.pool.start(SnapshotWriteTask(self, self.PATH, body))
@@ -0,0 +1,107 @@
+import json
+
+from PyQt6.QtCore import QUrl, QTimer
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
+from loguru import logger as logging
+
+from Utils.HostHealth import HostHealth
+from Utils.NetworkService import NetworkService
+from Utils.UtilMethods import get_host, get_auth
+
+
+class DeviceStateStream:
+    """
+    Long-lived server-sent event stream of device state deltas from the controller (GET /stream/state).
+    Each event is a JSON object of the form {"device": name, "data": {partial /get payload}}.
+    While the stream is connected the device polling is suspended, when it drops polling resumes and the stream
+    is reconnected after RECONNECT_DELAY.
+    """
+
+    RECONNECT_DELAY = 5000
+
+    def __init__(self, delta_callback, connection_callback):
+        self.delta_callback = delta_callback  # (device, delta) -> None
+        self.connection_callback = connection_callback  # (connected) -> None
+        self.reply = None
+        self.buffer = b""
+        self.enabled = False
+        self.connected = False
+        self.pushes_received = 0
+
+        self.reconnect_timer = QTimer()
+        self.reconnect_timer.setSingleShot(True)
+        self.reconnect_timer.timeout.connect(self.open_stream)
+
+    def start(self):
+        self.enabled = True
+        self.open_stream()
+
+    def stop(self):
+        self.enabled = False
+        self.reconnect_timer.stop()
+        if self.reply is not None:
+            NetworkService.abort(self.reply)
+
+    def open_stream(self):
+        if not self.enabled or self.reply is not None:
+            return
+        health = HostHealth.instance()
+        if not health.available():
+            health.when_available(self.open_stream)
+            return
+        logging.info("Opening device state stream")
+        request = QNetworkRequest(QUrl(f"{get_host()}/stream/state"))
+        request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
+        request.setRawHeader(b"Accept", b"text/event-stream")
+        self.buffer = b""
+        self.reply = NetworkService.instance().get(request, self.handle_finished)
+        self.reply.readyRead.connect(self.handle_ready_read)
+
+    def set_connected(self, connected):
+        if self.connected == connected:
+            return
+        self.connected = connected
+        self.connection_callback(connected)
+
+    def handle_ready_read(self):
+        try:
+            if self.reply is None:
+                return
+            status = self.reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+            if status != 200:
+                return
+            self.set_connected(True)
+            self.buffer += self.reply.readAll().data()
+            # Events are separated by a blank line, anything after the last separator is still incomplete
+            *events, self.buffer = self.buffer.replace(b"\r\n", b"\n").split(b"\n\n")
+            for event in events:
+                self.parse_event(event)
+        except Exception as e:
+            logging.error(f"Error reading device state stream: {e}")
+            logging.exception(e)
+
+    def parse_event(self, event):
+        data = b"\n".join(line[5:].strip() for line in event.split(b"\n") if line.startswith(b"data:"))
+        if not data:
+            return  # Keep-alive comment
+        try:
+            payload = json.loads(str(data, 'utf-8'))
+            self.pushes_received += 1
+            self.delta_callback(payload["device"], payload["data"])
+        except Exception as e:
+            logging.error(f"Error parsing device state event: {e}")
+            logging.exception(e)
+
+    def handle_finished(self, reply):
+        try:
+            if reply.error() not in (QNetworkReply.NetworkError.NoError,
+                                     QNetworkReply.NetworkError.OperationCanceledError):
+                logging.error(f"Device state stream error: {reply.error()}")
+            else:
+                logging.warning("Device state stream closed")
+        finally:
+            self.reply = None
+            reply.deleteLater()
+            self.set_connected(False)
+            if self.enabled:
+                self.reconnect_timer.start(self.RECONNECT_DELAY)
@@ -0,0 +1,170 @@
+import random
+import time
+
+from PyQt6.QtCore import QUrl, QObject
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
+from loguru import logger as logging
+
+from Utils.Singleton import Singleton
+from Utils.TaskScheduler import TaskScheduler
+from Utils.UtilMethods import get_host
+
+# Errors that mean the host itself couldn't be reached, anything the server answered (even with an error) counts as
+# the host being up
+UNREACHABLE_ERRORS = {
+    QNetworkReply.NetworkError.ConnectionRefusedError,
+    QNetworkReply.NetworkError.RemoteHostClosedError,
+    QNetworkReply.NetworkError.HostNotFoundError,
+    QNetworkReply.NetworkError.TimeoutError,
+    QNetworkReply.NetworkError.OperationCanceledError,  # Also what a transfer timeout is reported as
+    QNetworkReply.NetworkError.TemporaryNetworkFailureError,
+    QNetworkReply.NetworkError.NetworkSessionFailedError,
+    QNetworkReply.NetworkError.UnknownNetworkError,
+}
+UNAVAILABLE_STATUSES = {502, 503, 504}
+
+
+class HostCircuit:
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.failures = 0  # Consecutive
+        self.open = False
+        self.opened_at = None
+        self.attempt = 0  # Probes that have failed since the circuit opened
+        self.probe_due = None
+        self.probe_timer = None
+        self.waiting = []  # Callbacks to release once the host is back
+
+
+@Singleton
+class HostHealth:
+    """
+    Circuit breaker for the hosts requests go to through the NetworkService.
+    After FAILURE_THRESHOLD requests in a row fail to reach a host its circuit opens and everything that polls it
+    should stop and wait with when_available. While open the host is probed with exponential backoff plus jitter, once
+    a probe (or any other request) gets an answer the circuit closes and the waiting callbacks are released in
+    batches of RAMP_BATCH every RAMP_STEP ms so the host isn't hit by every widget at once.
+    """
+
+    FAILURE_THRESHOLD = 3
+    PROBE_BASE = 2000
+    PROBE_MAX = 60000
+    PROBE_TIMEOUT = 3000
+    RAMP_BATCH = 5
+    RAMP_STEP = 250
+
+    def __init__(self):
+        self.circuits = {}  # {host_key: HostCircuit}
+
+    @staticmethod
+    def host_key(url):
+        return f"{url.scheme()}://{url.host()}:{url.port()}"
+
+    def circuit_for(self, url):
+        key = self.host_key(url)
+        if key not in self.circuits:
+            base_url = url.adjusted(QUrl.UrlFormattingOption.RemovePath | QUrl.UrlFormattingOption.RemoveQuery |
+                                    QUrl.UrlFormattingOption.RemoveFragment)
+            self.circuits[key] = HostCircuit(base_url)
+        return self.circuits[key]
+
+    def available(self, url=None):
+        """
+        False while the circuit of the host (the controller by default) is open
+        """
+        circuit = self.circuits.get(self.host_key(url if url is not None else QUrl(get_host())))
+        return circuit is None or not circuit.open
+
+    def when_available(self, callback, url=None):
+        """
+        Call callback once the host's circuit closes, each callback is only queued once
+        """
+        circuit = self.circuit_for(url if url is not None else QUrl(get_host()))
+        if not circuit.open:
+            callback()
+            return
+        if callback not in circuit.waiting:
+            circuit.waiting.append(callback)
+
+    def record(self, reply):
+        """
+        Called by the NetworkService with every finished reply
+        """
+        if reply.property("client_aborted"):
+            return  # Cancelled by us, says nothing about the host
+        circuit = self.circuit_for(reply.url())
+        status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        if reply.error() in UNREACHABLE_ERRORS or status in UNAVAILABLE_STATUSES:
+            circuit.failures += 1
+            if not circuit.open and circuit.failures >= self.FAILURE_THRESHOLD:
+                self.open_circuit(circuit)
+        elif status is not None or reply.error() == QNetworkReply.NetworkError.NoError:
+            circuit.failures = 0
+            if circuit.open:
+                self.close_circuit(circuit)
+
+    def open_circuit(self, circuit):
+        logging.warning(f"{circuit.base_url.toString()} is unreachable after {circuit.failures} failed requests, "
+                        f"suspending polling")
+        circuit.open = True
+        circuit.opened_at = time.time()
+        circuit.attempt = 0
+        self.schedule_probe(circuit)
+
+    def schedule_probe(self, circuit):
+        # Full jitter between half and all of the backoff so panels that lost the controller together drift apart
+        backoff = min(self.PROBE_MAX, self.PROBE_BASE * 2 ** circuit.attempt)
+        delay = random.randint(backoff // 2, backoff)
+        circuit.probe_due = time.time() + delay / 1000
+        if circuit.probe_timer is None:
+            circuit.probe_timer = TaskScheduler.instance().timer_for()
+            circuit.probe_timer.setSingleShot(True)
+            circuit.probe_timer.timeout.connect(lambda: self.probe(circuit))
+        circuit.probe_timer.start(delay)
+
+    def probe(self, circuit):
+        if not circuit.open:
+            return
+        from Utils.NetworkService import NetworkService  # The NetworkService reports every reply here
+        request = QNetworkRequest(circuit.base_url)
+        request.setTransferTimeout(self.PROBE_TIMEOUT)
+        NetworkService.instance().get(request, lambda reply: self.handle_probe(circuit, reply))
+
+    def handle_probe(self, circuit, reply):
+        try:
+            # record has already closed the circuit if the host answered
+            if circuit.open:
+                circuit.attempt += 1
+                logging.debug(f"Probe of {circuit.base_url.toString()} failed ({reply.error()}), next probe in "
+                              f"about {min(self.PROBE_MAX, self.PROBE_BASE * 2 ** circuit.attempt) / 1000:.0f}s")
+                self.schedule_probe(circuit)
+        except Exception as e:
+            logging.error(f"Error handling host probe: {e}")
+            logging.exception(e)
+        finally:
+            reply.deleteLater()
+
+    def close_circuit(self, circuit):
+        logging.info(f"{circuit.base_url.toString()} is reachable again after "
+                     f"{time.time() - circuit.opened_at:.0f}s, resuming {len(circuit.waiting)} waiting pollers")
+        circuit.open = False
+        circuit.probe_due = None
+        if circuit.probe_timer is not None:
+            circuit.probe_timer.stop()
+        waiting, circuit.waiting = circuit.waiting, []
+        for i, callback in enumerate(waiting):
+            owner = getattr(callback, "__self__", None)
+            task = TaskScheduler.instance().timer_for(owner if isinstance(owner, QObject) else None)
+            task.setSingleShot(True)
+            task.timeout.connect(callback)
+            task.start((i // self.RAMP_BATCH) * self.RAMP_STEP + random.randint(0, self.RAMP_STEP))
+
+    def status(self, url=None):
+        """
+        None while the host (the controller by default) is available, otherwise seconds until the next probe
+        """
+        circuit = self.circuits.get(self.host_key(url if url is not None else QUrl(get_host())))
+        if circuit is None or not circuit.open:
+            return None
+        return max(0, round(circuit.probe_due - time.time())) if circuit.probe_due is not None else 0
@@ -0,0 +1,174 @@
+import json
+import time
+
+from PyQt6 import sip
+from PyQt6.QtCore import QUrl, QUrlQuery, QTimer, QObject
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
+from loguru import logger as logging
+
+from Utils.NetworkService import NetworkService
+from Utils.Singleton import Singleton
+from Utils.TaskScheduler import TaskScheduler
+from Utils.UtilMethods import get_host, get_auth
+
+
+@Singleton
+class NameRegistry:
+    """
+    Process wide cache of device human names shared by every widget that shows one.
+    Widgets subscribe a callback for a device and are called with its name whenever it is fetched, every distinct
+    device is fetched at most once per TTL no matter how many groups or scene editor columns show it.
+    Lookups requested in the same event loop pass are sent as one /get_names request, falling back to a /name request
+    per device if the server doesn't have the batch endpoint.
+    """
+
+    TTL = 300  # Seconds before a cached name is fetched again
+    REFRESH_INTERVAL = 30000
+
+    def __init__(self):
+        self.names = {}  # {device: (name or None, fetched_at)}
+        self.subscribers = {}  # {device: [callback]}
+        self.pending = set()
+        self.in_flight = set()
+        self.flush_queued = False
+        self.batch_supported = True
+        self.host = None
+        self.fetches = 0
+
+        self.refresh_timer = TaskScheduler.instance().timer_for()
+        self.refresh_timer.timeout.connect(self.refresh_expired)
+        self.refresh_timer.start(self.REFRESH_INTERVAL)
+
+    def subscribe(self, device, callback):
+        callbacks = self.subscribers.setdefault(device, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+        name, fetched_at = self.names.get(device, (None, 0))
+        if name is not None:
+            callback(name)
+        if time.time() - fetched_at > self.TTL:
+            self.request(device)
+
+    def unsubscribe(self, device, callback):
+        callbacks = self.subscribers.get(device, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if len(callbacks) == 0:
+            self.subscribers.pop(device, None)
+
+    def invalidate(self, device):
+        """
+        Forget the cached name (e.g. after the device was renamed) and fetch it again for its subscribers
+        """
+        self.names.pop(device, None)
+        self.request(device)
+
+    def request(self, device):
+        if device in self.in_flight:
+            return
+        self.pending.add(device)
+        if self.flush_queued:
+            return
+        self.flush_queued = True
+        QTimer.singleShot(0, self.flush)
+
+    def refresh_expired(self):
+        now = time.time()
+        for device in list(self.subscribers.keys()):
+            if self.live_callbacks(device) and now - self.names.get(device, (None, 0))[1] > self.TTL:
+                self.request(device)
+
+    def live_callbacks(self, device):
+        callbacks = self.subscribers.get(device, [])
+        for callback in list(callbacks):
+            owner = getattr(callback, "__self__", None)
+            if isinstance(owner, QObject) and sip.isdeleted(owner):
+                callbacks.remove(callback)
+        if len(callbacks) == 0:
+            self.subscribers.pop(device, None)
+        return callbacks
+
+    def flush(self):
+        self.flush_queued = False
+        if get_host() != self.host:  # Names belong to a server, start over when it is switched
+            self.host = get_host()
+            self.names.clear()
+            self.batch_supported = True
+        devices = sorted(self.pending - self.in_flight)
+        self.pending.clear()
+        if len(devices) == 0:
+            return
+        self.in_flight.update(devices)
+        self.fetches += len(devices)
+        if not self.batch_supported:
+            for device in devices:
+                self.request_single(device)
+            return
+        query = QUrlQuery()
+        query.addQueryItem("devices", ",".join(devices))
+        url = QUrl(f"{get_host()}/get_names")
+        url.setQuery(query)
+        request = QNetworkRequest(url)
+        request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
+        NetworkService.instance().get(request, lambda reply: self.handle_batch_response(reply, devices))
+
+    def request_single(self, device):
+        request = QNetworkRequest(QUrl(f"{get_host()}/name/{device}"))
+        request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
+        NetworkService.instance().get(request, lambda reply: self.handle_single_response(reply, device))
+
+    def deliver(self, device, name):
+        self.in_flight.discard(device)
+        self.names[device] = (name, time.time())
+        if name is None:
+            return
+        for callback in list(self.live_callbacks(device)):
+            try:
+                callback(name)
+            except Exception as e:
+                logging.error(f"Error delivering name for {device}: {e}")
+                logging.exception(e)
+
+    def handle_batch_response(self, reply, devices):
+        try:
+            match reply.error():
+                case QNetworkReply.NetworkError.NoError:
+                    pass
+                case QNetworkReply.NetworkError.ContentNotFoundError | \
+                     QNetworkReply.NetworkError.ContentOperationNotPermittedError:
+                    logging.warning("Server does not support batched name lookups, requesting each name individually")
+                    self.batch_supported = False
+                    for device in devices:
+                        self.request_single(device)
+                    return
+                case _:
+                    logging.error(f"Network error getting device names: {reply.errorString()}")
+                    self.in_flight.difference_update(devices)
+                    return
+            names = json.loads(str(reply.readAll(), 'utf-8'))
+            for device in devices:
+                self.deliver(device, names.get(device))
+        except Exception as e:
+            logging.error(f"Error handling device names: {e}")
+            logging.exception(e)
+            self.in_flight.difference_update(devices)
+        finally:
+            reply.deleteLater()
+
+    def handle_single_response(self, reply, device):
+        try:
+            match reply.error():
+                case QNetworkReply.NetworkError.NoError:
+                    self.deliver(device, str(reply.readAll(), 'utf-8'))
+                case QNetworkReply.NetworkError.ContentNotFoundError:
+                    logging.warning(f"Device name not found for: {device}")
+                    self.deliver(device, None)
+                case _:
+                    logging.error(f"Network error getting device name for {device}: {reply.errorString()}")
+                    self.in_flight.discard(device)
+        except Exception as e:
+            logging.error(f"Error handling device name: {e}")
+            logging.exception(e)
+            self.in_flight.discard(device)
+        finally:
+            reply.deleteLater()
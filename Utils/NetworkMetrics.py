@@ -0,0 +1,156 @@
+import json
+import os
+import time
+
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+from loguru import logger as logging
+
+from Utils.Singleton import Singleton
+
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]  # Upper bounds, the last bucket is unbounded
+# Path segments after the first are request parameters except under these, where the second names the endpoint
+NAMESPACES = {"weather", "scene_action", "scene_get", "stream"}
+
+
+def endpoint_template(url):
+    """
+    host/path with the parameter segments replaced by {}, e.g. host:port/get/{} or host:port/weather/radar/{}/{}/{}/{}
+    """
+    segments = [segment for segment in url.path().split("/") if segment]
+    kept = 2 if segments and segments[0] in NAMESPACES else 1
+    path = "/".join(segments[:kept] + ["{}"] * (len(segments) - kept))
+    port = f":{url.port()}" if url.port() != -1 else ""
+    return f"{url.host()}{port}/{path}"
+
+
+class EndpointStats:
+
+    def __init__(self):
+        self.count = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.errors = {}  # {error class: count}
+
+    def add(self, elapsed_ms, bytes_in, bytes_out, error):
+        self.count += 1
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        bucket = 0
+        while bucket < len(BUCKETS_MS) and elapsed_ms > BUCKETS_MS[bucket]:
+            bucket += 1
+        self.histogram[bucket] += 1
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def percentile(self, fraction):
+        """
+        Upper bound of the bucket the percentile falls in, the slowest request if that's the unbounded bucket
+        """
+        if self.count == 0:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank and count:
+                return BUCKETS_MS[bucket] if bucket < len(BUCKETS_MS) else round(self.max_ms)
+        return round(self.max_ms)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 1),
+            "histogram": {f"<={bound}ms": count for bound, count in zip(BUCKETS_MS, self.histogram)} |
+                         {f">{BUCKETS_MS[-1]}ms": self.histogram[-1]},
+        }
+
+
+@Singleton
+class NetworkMetrics:
+    """
+    Count, bytes, error classes and latency histogram of every request made through an
+    InstrumentedNetworkAccessManager, grouped by endpoint template so the load each module puts on the network can be
+    told apart
+    """
+
+    DUMP_PATH = "Logs/network_metrics.json"
+
+    def __init__(self):
+        self.endpoints = {}  # {template: EndpointStats}
+        self.since = time.time()
+
+    def record(self, template, elapsed_ms, bytes_in, bytes_out, error):
+        if template not in self.endpoints:
+            self.endpoints[template] = EndpointStats()
+        self.endpoints[template].add(elapsed_ms, bytes_in, bytes_out, error)
+
+    def busiest(self):
+        """
+        (template, EndpointStats) pairs, the endpoint that has spent the most time waiting on the network first
+        """
+        return sorted(self.endpoints.items(), key=lambda item: item[1].total_ms, reverse=True)
+
+    def reset(self):
+        self.endpoints.clear()
+        self.since = time.time()
+
+    def dump(self, path=DUMP_PATH):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"since": self.since, "dumped": time.time(),
+                           "endpoints": {template: stats.to_dict() for template, stats in self.busiest()}},
+                          f, indent=2)
+            logging.info(f"Network metrics for {len(self.endpoints)} endpoints written to {path}")
+            return path
+        except OSError as e:
+            logging.error(f"Failed to write network metrics: {e}")
+            return None
+
+
+class InstrumentedNetworkAccessManager(QNetworkAccessManager):
+    """
+    QNetworkAccessManager that reports every request it makes to NetworkMetrics, a drop in replacement for the
+    managers the modules create for themselves
+    """
+
+    def createRequest(self, op, request, outgoing_data=None):
+        reply = super().createRequest(op, request, outgoing_data)
+        try:
+            started = time.perf_counter()
+            template = endpoint_template(request.url())
+            bytes_out = outgoing_data.size() if outgoing_data is not None else 0
+            received = [0]
+            reply.downloadProgress.connect(lambda done, _: received.__setitem__(0, done))
+            reply.finished.connect(lambda: self.report(reply, template, started, received[0], bytes_out))
+        except Exception as e:
+            logging.error(f"Unable to instrument request to {request.url().toString()}: {e}")
+        return reply
+
+    @staticmethod
+    def report(reply, template, started, bytes_in, bytes_out):
+        try:
+            error = None
+            status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+            if reply.property("client_aborted"):
+                error = "Aborted"
+            elif reply.error() != QNetworkReply.NetworkError.NoError:
+                error = reply.error().name
+            elif status is not None and status >= 400:
+                error = f"HTTP {status}"
+            NetworkMetrics.instance().record(template, (time.perf_counter() - started) * 1000, bytes_in, bytes_out,
+                                             error)
+        except Exception as e:
+            logging.error(f"Error recording network metrics: {e}")
@@ -0,0 +1,203 @@
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QByteArray
+from loguru import logger as logging
+
+from Utils.HostHealth import HostHealth
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
+from Utils.Singleton import Singleton
+
+
+class SharedReply:
+    """
+    One callback's view of a reply shared by coalesced requests, the body is read once and handed to every callback
+    and the underlying reply is deleted after the last of them so deleteLater here does nothing
+    """
+
+    def __init__(self, reply, body):
+        self.reply = reply
+        self.body = body
+
+    def readAll(self):
+        return QByteArray(self.body)
+
+    def deleteLater(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self.reply, name)
+
+
+class InFlightRequest:
+
+    def __init__(self, key, reply, generation, coalesce_key=None):
+        self.key = key
+        self.reply = reply
+        self.generation = generation
+        self.coalesce_key = coalesce_key
+        self.callbacks = []  # [(owner id or None, callback)]
+
+
+@Singleton
+class NetworkService:
+    """
+    Application wide pool of QNetworkAccessManagers, one per host, so that keep-alive connections and TLS sessions
+    to the same host are shared by every widget instead of each widget holding its own managers.
+    Replies are dispatched to the callback given with each request rather than through the manager's finished signal.
+    Every reply is reported to HostHealth so polling can be suspended while a host is down.
+    Every request is tagged with an increasing generation (the "generation" property of its reply) so callers can
+    tell a reply to an older request from a newer one.
+    Reads made with coalesce=True join an identical GET already in flight, unless a request that could have changed
+    what it returns was sent to the host since it started. Those a QObject is waiting on are cancelled with
+    cancel(owner) or when the owner is destroyed, other requests always run to completion.
+    """
+
+    MAX_CONNECTIONS_PER_HOST = 6  # Qt opens at most 6 parallel HTTP connections to a single host
+
+    def __init__(self):
+        self.managers = {}  # {host_key: QNetworkAccessManager}
+        self.in_flight = {}  # {host_key: outstanding request count}
+        self.total_requests = 0
+        self.generation = 0
+        self.last_write = {}  # {host_key: generation of the last request that wasn't a GET}
+        self.coalescable = {}  # {(url, cookie): InFlightRequest}
+        self.owned = {}  # {owner id: [InFlightRequest]}
+        self.watched = set()  # Owner ids whose destroyed signal is connected, once for the owner's lifetime
+        self.coalesced = 0
+        self.cancelled = 0
+        self.superseded = 0  # Replies a widget dropped because it had already applied a newer one
+
+    @staticmethod
+    def host_key(url):
+        return f"{url.scheme()}://{url.host()}:{url.port()}"
+
+    def manager_for(self, url):
+        key = self.host_key(url)
+        if key not in self.managers:
+            logging.info(f"Creating network manager for {key}")
+            self.managers[key] = InstrumentedNetworkAccessManager()
+            self.in_flight[key] = 0
+        return key, self.managers[key]
+
+    def get(self, request, callback, coalesce=False):
+        key, manager = self.manager_for(request.url())
+        coalesce_key = None
+        if coalesce:
+            coalesce_key = (request.url().toString(), bytes(request.rawHeader(b"Cookie")))
+            pending = self.coalescable.get(coalesce_key)
+            if pending is not None and pending.generation > self.last_write.get(key, 0):
+                self.coalesced += 1
+                self._attach(pending, callback)
+                return pending.reply
+        return self._track(key, manager.get(request), callback, coalesce_key)
+
+    def post(self, request, data, callback):
+        key, manager = self.manager_for(request.url())
+        reply = self._track(key, manager.post(request, data), callback)
+        self.last_write[key] = self.generation
+        return reply
+
+    def send_custom_request(self, request, verb, data, callback):
+        key, manager = self.manager_for(request.url())
+        reply = self._track(key, manager.sendCustomRequest(request, verb, data), callback)
+        self.last_write[key] = self.generation
+        return reply
+
+    @staticmethod
+    def abort(reply):
+        """
+        Abort a request without it counting against the health of its host
+        """
+        reply.setProperty("client_aborted", True)
+        reply.abort()
+
+    def cancel(self, owner):
+        """
+        Stop waiting on every request owner made, a request is aborted once nothing is waiting on it
+        """
+        self._cancel_id(id(owner))
+
+    def _cancel_id(self, owner_id):
+        for request in self.owned.pop(owner_id, []):
+            request.callbacks = [(callback_owner, callback) for callback_owner, callback in request.callbacks
+                                 if callback_owner != owner_id]
+            if len(request.callbacks) == 0 and not request.reply.isFinished():
+                self.cancelled += 1
+                self.abort(request.reply)
+
+    def _forget(self, owner_id):
+        self.watched.discard(owner_id)  # The id may be reused by a new object
+        self._cancel_id(owner_id)
+
+    def _track(self, key, reply, callback, coalesce_key=None):
+        self.in_flight[key] += 1
+        self.total_requests += 1
+        self.generation += 1
+        reply.setProperty("generation", self.generation)
+        request = InFlightRequest(key, reply, self.generation, coalesce_key)
+        if coalesce_key is not None:
+            self.coalescable[coalesce_key] = request
+        self._attach(request, callback)
+        reply.finished.connect(lambda: self._dispatch(request))
+        return reply
+
+    def _attach(self, request, callback):
+        owner = getattr(callback, "__self__", None)
+        if request.coalesce_key is None or not isinstance(owner, QObject):
+            request.callbacks.append((None, callback))
+            return
+        owner_id = id(owner)
+        if owner_id not in self.watched:
+            self.watched.add(owner_id)
+            owner.destroyed.connect(lambda _=None: self._forget(owner_id))
+        self.owned.setdefault(owner_id, []).append(request)
+        request.callbacks.append((owner_id, callback))
+
+    def _dispatch(self, request):
+        reply = request.reply
+        self.in_flight[request.key] -= 1
+        if request.coalesce_key is not None and self.coalescable.get(request.coalesce_key) is request:
+            del self.coalescable[request.coalesce_key]
+        for owner_id, _ in request.callbacks:
+            owned = self.owned.get(owner_id)
+            if owned is not None and request in owned:
+                owned.remove(request)
+        HostHealth.instance().record(reply)
+        # Drop the reply for any widget that asked for it and has since been destroyed
+        callbacks = [callback for _, callback in request.callbacks
+                     if not (isinstance(getattr(callback, "__self__", None), QObject) and
+                             sip.isdeleted(callback.__self__))]
+        if len(callbacks) == 0:
+            reply.deleteLater()
+            return
+        if request.coalesce_key is None:
+            self._call(callbacks[0], reply)  # The callback owns the reply
+            return
+        body = reply.readAll()
+        for callback in callbacks:
+            self._call(callback, SharedReply(reply, body))
+        reply.deleteLater()
+
+    @staticmethod
+    def _call(callback, reply):
+        try:
+            callback(reply)
+        except Exception as e:
+            logging.error(f"Error dispatching network reply for {reply.url().toString()}: {e}")
+            logging.exception(e)
+            reply.deleteLater()
+
+    def stats(self):
+        """
+        Counts of managers, active connections and in-flight requests per host.
+        Idle keep-alive connections are not exposed by Qt, so connections are counted while requests are active.
+        """
+        return {
+            "managers": len(self.managers),
+            "total_requests": self.total_requests,
+            "in_flight": sum(self.in_flight.values()),
+            "active_connections": sum(min(count, self.MAX_CONNECTIONS_PER_HOST) for count in self.in_flight.values()),
+            "hosts": dict(self.in_flight),
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+            "superseded": self.superseded,
+        }
@@ -0,0 +1,292 @@
+import re
+import sys
+
+from PyQt6.QtCore import Qt, QRect, QRectF, QSize
+from PyQt6.QtGui import QColor, QFont, QFontDatabase, QPainter, QPen
+
+PAINTED_FLAG = "--painted-tiles"
+STYLE_PROPERTY = re.compile(r"([\w-]+)\s*:\s*([^;]+)")
+parsed_styles = {}  # {stylesheet: {property: value}}
+
+
+def style_properties(style):
+    if style not in parsed_styles:
+        parsed_styles[style] = {key.strip(): value.strip() for key, value in STYLE_PROPERTY.findall(style)}
+    return parsed_styles[style]
+
+
+def painted_tiles_enabled():
+    return PAINTED_FLAG in sys.argv
+
+
+class PaintedSignal:
+    """
+    Stand in for a pyqtSignal on a painted element, callbacks are called directly when it is emitted
+    """
+
+    def __init__(self):
+        self.callbacks = []
+
+    def connect(self, callback):
+        self.callbacks.append(callback)
+
+    def emit(self):
+        for callback in list(self.callbacks):
+            callback()
+
+
+class PaintedLabel:
+    """
+    Drawn by its RoomDevice instead of being a child widget, it takes the subset of the QLabel API the device
+    controllers use so parse_data can update it unchanged. Only the color, background-color, border, border-radius,
+    font-size and font-weight properties of the stylesheet are honoured, border and border-radius cascade from the
+    tile's stylesheet like they do to child widgets. <pre> text is drawn as plain text in the system's fixed font.
+    """
+
+    DEFAULT_ALIGNMENT = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+
+    def __init__(self, host):
+        self.host = host
+        self.geometry = QRect(0, 0, 100, 30)
+        self.label_text = ""
+        self.alignment = self.DEFAULT_ALIGNMENT
+        self.base_font = QFont()
+        self.pixel_size = None  # From the stylesheet, None keeps the size of the font
+        self.bold = False
+        self.preformatted = False
+        self.font = QFont()
+        self.color = QColor("black")
+        self.background = None
+        self.properties = {}
+        self.visible = True
+        host.painted_elements.append(self)
+
+    def update(self):
+        if self.visible:
+            self.host.update(self.geometry)
+
+    def setFixedSize(self, width, height):
+        self.update()
+        self.geometry.setSize(QSize(width, height))
+        self.update()
+
+    def move(self, x, y):
+        self.update()
+        self.geometry.moveTo(x, y)
+        self.update()
+
+    def width(self):
+        return self.geometry.width()
+
+    def height(self):
+        return self.geometry.height()
+
+    def setFont(self, font):
+        self.base_font = QFont(font)
+        self.build_font()
+
+    def build_font(self):
+        # Like Qt the stylesheet's font properties take precedence over setFont whichever was called first
+        self.font = QFont(self.base_font)
+        if self.preformatted:
+            self.font.setFamily(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont).family())
+        if self.pixel_size is not None:
+            self.font.setPixelSize(self.pixel_size)
+        self.font.setBold(self.bold)
+        self.update()
+
+    def setAlignment(self, alignment):
+        self.alignment = alignment
+        self.update()
+
+    def setText(self, text):
+        preformatted = "<pre>" in text
+        text = text.replace("<pre>", "").replace("</pre>", "")
+        if preformatted != self.preformatted:
+            self.preformatted = preformatted
+            self.build_font()
+        if text == self.label_text:
+            return
+        self.label_text = text
+        self.update()
+
+    def text(self):
+        return self.label_text
+
+    def setStyleSheet(self, style):
+        properties = style_properties(style)
+        self.properties = properties
+        self.color = QColor(properties.get("color", "black"))
+        background = properties.get("background-color")
+        self.background = QColor(background) if background not in (None, "transparent") else None
+        if "font-size" in properties:
+            self.pixel_size = int(properties["font-size"].rstrip("px"))
+        self.bold = properties.get("font-weight") == "bold"
+        self.build_font()
+
+    def setWordWrap(self, wrap):
+        pass  # Text is only broken on its own newlines
+
+    def show(self):
+        self.visible = True
+        self.update()
+
+    def hide(self):
+        self.update()
+        self.visible = False
+
+    def isHidden(self):
+        return not self.visible
+
+    def raise_(self):
+        self.host.painted_elements.remove(self)
+        self.host.painted_elements.append(self)
+
+    def style_property(self, name):
+        if name in self.properties:
+            return self.properties[name]
+        return style_properties(self.host.styleSheet()).get(name)
+
+    def paint_box(self, painter, background):
+        # The border is drawn inside the geometry like a widget's stylesheet border
+        border = (self.style_property("border") or "none").split()
+        width = int(border[0].rstrip("px")) if border[0] != "none" and border[0][0].isdigit() else 0
+        radius = int((self.style_property("border-radius") or "0").rstrip("px"))
+        if width == 0 and background is None:
+            return
+        rect = QRectF(self.geometry).adjusted(width / 2, width / 2, -width / 2, -width / 2)
+        painter.setPen(QPen(QColor(border[-1]), width) if width else Qt.PenStyle.NoPen)
+        painter.setBrush(background if background is not None else Qt.BrushStyle.NoBrush)
+        painter.drawRoundedRect(rect, radius, radius)
+
+    def paint(self, painter):
+        self.paint_box(painter, self.background)
+        painter.setFont(self.font)
+        painter.setPen(self.color)
+        painter.drawText(self.geometry, self.alignment, self.label_text)
+
+
+class PaintedButton(PaintedLabel):
+    DEFAULT_ALIGNMENT = Qt.AlignmentFlag.AlignCenter
+
+    def __init__(self, host):
+        super().__init__(host)
+        self.background = QColor("lightgrey")
+        self.clicked = PaintedSignal()
+        self.checkable = False
+        self.checked = False
+        self.pressed = False
+
+    def setCheckable(self, checkable):
+        self.checkable = checkable
+
+    def isChecked(self):
+        return self.checked
+
+    def setChecked(self, checked):
+        self.checked = checked
+
+    def click(self):
+        if self.checkable:
+            self.checked = not self.checked
+        self.clicked.emit()
+
+    def paint(self, painter):
+        background = self.background if self.background is not None else QColor("lightgrey")
+        if self.pressed:
+            background = background.darker(130)
+        self.paint_box(painter, background)
+        painter.setFont(self.font)
+        painter.setPen(self.color)
+        painter.drawText(self.geometry, self.alignment, self.label_text)
+
+
+def paint_elements(widget):
+    painter = QPainter(widget)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    try:
+        for element in widget.painted_elements:
+            if element.visible:
+                element.paint(painter)
+    finally:
+        painter.end()
+
+
+def element_at(widget, pos):
+    for element in reversed(widget.painted_elements):
+        if element.visible and isinstance(element, PaintedButton) and element.geometry.contains(pos):
+            return element
+    return None
+
+
+def benchmark():
+    """
+    Widget count, RSS and full room repaint time of a room of toggle tiles built from child widgets compared to
+    painted tiles. Each backend is measured in its own process so their memory doesn't overlap.
+    Run with `python -m Utils.PaintedTile --devices 100`
+    """
+    import argparse
+    import os
+    import subprocess
+    import time
+
+    import psutil
+    from PyQt6.QtWidgets import QApplication, QWidget
+
+    parser = argparse.ArgumentParser(description="Compare widget and painted device tiles")
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--repaints", type=int, default=50)
+    parser.add_argument("--backend", choices=["widgets", "painted"])
+    args = parser.parse_args()
+
+    if args.backend is None:
+        for backend in ("widgets", "painted"):
+            subprocess.run([sys.executable, "-m", "Utils.PaintedTile", "--devices", str(args.devices),
+                            "--repaints", str(args.repaints), "--backend", backend], check=True)
+        return
+
+    app = QApplication(sys.argv)
+    from Modules.RoomControlModules.DeviceControllers.ToggleDevice import ToggleDevice
+    from Utils.RoomDevice import RoomDevice
+    RoomDevice.painted_backend = args.backend == "painted"
+
+    class Room(QWidget):
+        def __init__(self):
+            super().__init__()
+            self.font = self.font()
+
+    process = psutil.Process(os.getpid())
+    room = Room()
+    columns = 6
+    room.resize(150 * columns + 10, 80 * (args.devices // columns + 1) + 10)
+    room.show()
+    app.processEvents()
+    rss_before = process.memory_info().rss
+    build_start = time.perf_counter()
+    tiles = []
+    for i in range(args.devices):
+        tile = ToggleDevice(room, f"device_{i:03d}")
+        tile.move(5 + (i % columns) * 150, 5 + (i // columns) * 80)
+        tile.data = {"state": {"on": i % 2 == 0}, "health": {"online": True, "fault": False, "reason": None},
+                     "info": {"power": i}, "auto_state": {"is_auto": False}}
+        tile.state = tile.data["state"]
+        tile.parse_data(tile.data)
+        tile.update_human_name(f"Device {i}")
+        tile.in_viewport = False  # Measure rendering only, not polling
+        tile.show()
+        tiles.append(tile)
+    app.processEvents()
+    build_time = time.perf_counter() - build_start
+    rss = process.memory_info().rss - rss_before
+    widgets = len(room.findChildren(QWidget))
+    start = time.perf_counter()
+    for _ in range(args.repaints):
+        room.repaint()
+    repaint_time = (time.perf_counter() - start) / args.repaints
+    print(f"{args.backend:8}: {args.devices} tiles, {widgets} widgets, RSS +{rss / 1024 / 1024:.1f}MB, "
+          f"built in {build_time * 1000:.0f}ms, full repaint {repaint_time * 1000:.2f}ms")
+    room.close()  # Hide the tiles while the event loop's timers still exist
+
+
+if __name__ == "__main__":
+    benchmark()
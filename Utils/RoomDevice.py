@@ -3,17 +3,32 @@ import random
 import time
 
 from PyQt6.QtCore import QUrl, QTimer, Qt
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
-from PyQt6.QtWidgets import QLabel, QMenu, QInputDialog, QDialog
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
+from PyQt6.QtWidgets import QLabel, QMenu, QInputDialog, QDialog, QPushButton
 from PyQt6.QtWidgets import QLineEdit, QComboBox, QDialogButtonBox, QFormLayout
 from loguru import logger as logging
 
+from Utils.CommandQueue import CommandQueue
+from Utils.DevicePoller import DevicePoller
+from Utils.DeviceStateSnapshot import DeviceStateSnapshot
+from Utils.HostHealth import HostHealth
+from Utils.NameRegistry import NameRegistry
+from Utils.NetworkService import NetworkService
+from Utils.PaintedTile import PaintedLabel, PaintedButton, paint_elements, element_at, painted_tiles_enabled
+from Utils.TaskScheduler import TaskScheduler
 from Utils.UtilMethods import has_internet, get_auth, get_host
 
 
 class RoomDevice(QLabel):
 
     supported_types = []
+    # The payload fields parse_data renders, a payload that leaves all of them unchanged is not rendered again.
+    # None renders every payload
+    rendered_fields = ("state", "health", "info", "auto_state")
+    # Subclasses that only build their children through make_label / make_button can be drawn as a single painted
+    # widget, which is used when the interface is started with --painted-tiles
+    paintable = False
+    painted_backend = painted_tiles_enabled()
 
     @classmethod
     def supports_type(cls, device_type):
@@ -35,81 +50,204 @@ class RoomDevice(QLabel):
         self.not_found = False
 
         self.toggle_button = None
+        self.painted = self.paintable and self.painted_backend
+        self.painted_elements = []
+        self.pressed_element = None
 
-        self.device_label = QLabel(self)
+        self.device_label = self.make_label()
         self.device_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignCenter)
         self.device_label.setFixedSize(self.width(), 22)
         self.device_label.setFont(parent.font)
 
-        self.network_manager = QNetworkAccessManager()
-        self.network_manager.finished.connect(self.handle_response)
-        self.command_manager = QNetworkAccessManager()
-        self.command_manager.finished.connect(self.handle_command)
-        self.schema_manager = QNetworkAccessManager()
-        self.schema_manager.finished.connect(self.handle_schema_update)
+        # Shown while the tile is rendering the saved snapshot rather than live data
+        self.stale_label = self.make_label()
+        self.stale_label.setFont(parent.font)
+        self.stale_label.setFixedSize(60, 14)
+        self.stale_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignRight)
+        self.stale_label.setStyleSheet("color: #705a00; font-size: 10px; border: none; background-color: transparent")
+        self.stale_label.move(self.width() - 64, 4)
+        self.stale_label.hide()
 
-        self.refresh_timer = QTimer(self)
+        self.refresh_timer = TaskScheduler.instance().timer_for(self)
         self.refresh_timer.timeout.connect(self.get_data)
         self.refresh_timer.setSingleShot(True)
 
-        self.name_update_timer = QTimer(self)
-        self.name_update_timer.timeout.connect(lambda: self.parent.make_name_request(self.device))
-        self.name_update_timer.setSingleShot(True)
-
-        self.context_menu = QMenu(self)
-        self.context_menu.addAction("Rename").triggered.connect(self.rename_device)
-        self.context_menu.addAction("Edit Schema").triggered.connect(self.edit_schema)
-        self.context_menu.setStyleSheet(
-            "QMenu { background-color: #222; color: #f0f0f0; }"
-            "QMenu::item { padding: 6px 16px; }"
-            "QMenu::item:selected { background-color: #3a3a3a; }"
-        )
+        # Painted tiles don't add their own actions so their menu is only built when it is first opened
+        self.context_menu = None if self.painted else self.build_context_menu()
 
         self.state = None
-        self.data = None
-        self.has_names = False
+        self.data = None  # The last payload with any unconfirmed commands overlaid
+        self.server_data = None  # The last payload as the server sent it
+        self.generation = 0  # NetworkService generation of the request server_data answered
+        self.command_queue = CommandQueue(self)
+        self.stale = False  # True while data is the last known state from the snapshot
+        self.rendered = None  # The rendered_fields of the last payload passed to parse_data
+        self.renders = 0
+        self.render_skips = 0
+        self.snapshot_checked = False
+        self.in_viewport = True  # Cleared by RoomControlHost while the tile is scrolled out of view
         self.human_name = None  # type: str | None
 
         self.toggling = False
         self.last_toggle_state = None
         self.toggle_time = 0
 
+    def build_context_menu(self):
+        context_menu = QMenu(self)
+        context_menu.addAction("Rename").triggered.connect(self.rename_device)
+        context_menu.addAction("Edit Schema").triggered.connect(self.edit_schema)
+        context_menu.setStyleSheet(
+            "QMenu { background-color: #222; color: #f0f0f0; }"
+            "QMenu::item { padding: 6px 16px; }"
+            "QMenu::item:selected { background-color: #3a3a3a; }"
+        )
+        return context_menu
+
+    def make_label(self):
+        return PaintedLabel(self) if self.painted else QLabel(self)
+
+    def make_button(self):
+        return PaintedButton(self) if self.painted else QPushButton(self)
+
+    def paintEvent(self, a0):
+        super().paintEvent(a0)
+        if self.painted_elements:
+            paint_elements(self)
+
+    def mousePressEvent(self, ev):
+        element = element_at(self, ev.position().toPoint()) if self.painted else None
+        if element is None:
+            super().mousePressEvent(ev)  # Ignored so dragging on the tile still scrolls the room control menu
+            return
+        self.pressed_element = element
+        element.pressed = True
+        element.update()
+
+    def mouseReleaseEvent(self, ev):
+        element = self.pressed_element
+        if element is None:
+            super().mouseReleaseEvent(ev)
+            return
+        self.pressed_element = None
+        element.pressed = False
+        element.update()
+        if element.geometry.contains(ev.position().toPoint()):
+            element.click()
+
     def update_human_name(self, name):
         # print(f"Updating name to {name}")
-        self.has_names = True
         self.human_name = name
         self.device_label.setText(name)
-        if not self.isHidden():
-            self.name_update_timer.start(300000 + random.randint(0, 60000))  # Update the name every 5-6 minutes
-        else:
-            self.name_update_timer.start(900000 + random.randint(0, 120000)) # Update the name every 15-17 minutes
 
     def hideEvent(self, a0):
-        self.refresh_timer.stop()
+        self.stop_polling()
+        NetworkService.instance().cancel(self)  # A reply arriving while hidden would only be replaced on show
+        NameRegistry.instance().unsubscribe(self.device, self.update_human_name)
         super().hideEvent(a0)
 
     def showEvent(self, a0):
-        # Randomize the refresh time to prevent all the devices from refreshing at the same time
-        self.refresh_timer.start(5000 + random.randint(0, 1000))
-        self.get_data()
-        if not self.has_names:
-            self.parent.make_name_request(self.device)
+        if not self.snapshot_checked:
+            self.snapshot_checked = True
+            self.restore_snapshot()
+        if self.in_viewport:
+            self.start_polling()
+        # The registry hands back the cached name straight away and only fetches it again once it has expired
+        NameRegistry.instance().subscribe(self.device, self.update_human_name)
         super().showEvent(a0)
 
+    def restore_snapshot(self):
+        """
+        Render the last known state of the device until the first live payload arrives
+        """
+        if self.data is not None:
+            return
+        snapshot = DeviceStateSnapshot.instance().lookup(self.device)
+        if snapshot is None:
+            return
+        data, saved = snapshot
+        try:
+            self.data = data
+            self.state = data["state"]
+            self.stale = True
+            self.parse_data(data)
+            age = time.time() - saved
+            if age < 3600:
+                self.stale_label.setText(f"cached {max(1, round(age / 60))}m")
+            else:
+                self.stale_label.setText(f"cached {round(age / 3600)}h")
+            self.stale_label.raise_()
+            self.stale_label.show()
+        except Exception as e:
+            logging.error(f"Error restoring snapshot for {self.device}: {e}")
+            logging.exception(e)
+            self.data = None
+            self.state = None
+            self.stale = False
+
+    def start_polling(self):
+        poller = DevicePoller.instance()
+        poller.subscribe(self)
+        if poller.batch_supported:
+            # Let the poller fetch every device shown in this pass with a single request
+            poller.request_poll()
+        else:
+            # Randomize the refresh time to prevent all the devices from refreshing at the same time
+            self.refresh_timer.start(5000 + random.randint(0, 1000))
+            self.get_data()
+
+    def stop_polling(self):
+        self.refresh_timer.stop()
+        DevicePoller.instance().unsubscribe(self)
+
+    def set_in_viewport(self, in_viewport):
+        """
+        Called by RoomControlHost as the tile is scrolled in and out of view, tiles out of view stop polling and are
+        refreshed as soon as they come back
+        """
+        if in_viewport == self.in_viewport:
+            return
+        self.in_viewport = in_viewport
+        if not self.isVisible():
+            return  # showEvent starts polling if the tile is in view when it is shown
+        if in_viewport:
+            self.start_polling()
+        else:
+            self.stop_polling()
+
+    def is_polling(self):
+        return self.in_viewport and self.isVisible()
+
     def get_data(self):
+        health = HostHealth.instance()
+        if not health.available():
+            health.when_available(self.get_data)
+            return
         request = QNetworkRequest(QUrl(f"{get_host()}/get/{self.device}"))
         request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
         request.setTransferTimeout(5000)
-        self.network_manager.get(request)
+        NetworkService.instance().get(request, self.handle_response, coalesce=True)
 
     def send_command(self, command):
-        request = QNetworkRequest(QUrl(f"{get_host()}/set/{self.device}"))
-        # Add a json payload to the post request
-        request.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/json")
-        request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
-        payload = json.dumps(command)
-        self.command_manager.post(request, payload.encode("utf-8"))
-        self.refresh_timer.start(500)
+        """
+        Queue a dict of fields to set, commands sent in quick succession are merged into one request and shown on the
+        tile before the server confirms them
+        """
+        self.command_queue.submit(command)
+        self.render_expected()
+
+    def render_expected(self):
+        """
+        Re-render the last server payload with the values of the commands that haven't been confirmed yet
+        """
+        self.rendered = None  # The widget may have been changed locally, always render
+        if self.server_data is None or self.stale:
+            return
+        self.data = self.command_queue.overlay(self.server_data)
+        self.state = self.data["state"]
+        if self.toggling:
+            return  # The toggle button shows the toggle is in progress until the server reports it
+        self.renders += 1
+        self.parse_data(self.data)
 
     def _get_room_control_host(self):
         if self.parent is None:
@@ -193,7 +331,7 @@ class RoomDevice(QLabel):
             request = QNetworkRequest(QUrl(f"{get_host()}/update_device_schema?interface_name=testing"))
             request.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/json")
             request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
-            self.schema_manager.post(request, json.dumps(payload).encode("utf-8"))
+            NetworkService.instance().post(request, json.dumps(payload).encode("utf-8"), self.handle_schema_update)
         except ValueError:
             logging.error("Invalid priority value entered")
         except Exception as e:
@@ -231,8 +369,7 @@ class RoomDevice(QLabel):
                 return
             request = QNetworkRequest(QUrl(f"{get_host()}/set_name/{self.device}/{new_name}"))
             request.setRawHeader(b"Cookie", bytes("auth=" + get_auth(), 'utf-8'))
-            self.command_manager.get(request)
-            QTimer.singleShot(500, self.parent.widgets_rebuild)
+            NetworkService.instance().get(request, self.handle_rename)
         except Exception as e:
             logging.error(f"Error renaming device: {e}")
             logging.exception(e)
@@ -249,7 +386,7 @@ class RoomDevice(QLabel):
             self.last_toggle_state = self.state["on"]
             self.toggle_time = time.time()
             # Increase the refresh rate so that we can see the change faster
-            self.refresh_timer.start(500)
+            self.request_refresh(500)
         self.send_command(command)
 
     def check_device_type(self, data):
@@ -267,36 +404,109 @@ class RoomDevice(QLabel):
             logging.error(f"Error checking device type: {e}")
             logging.exception(e)
 
+    def request_refresh(self, delay):
+        """
+        Fetch this device's state after delay ms, unless the push stream will deliver the change anyway
+        """
+        poller = DevicePoller.instance()
+        if poller.push_active and self.data is not None and not self.stale:
+            poller.polls_avoided += 1
+            return
+        if not self.in_viewport:
+            return  # Refreshed when it is scrolled back into view
+        self.refresh_timer.start(delay)
+
+    def schedule_refresh(self):
+        if self.toggling:
+            self.request_refresh(1000)
+        elif not DevicePoller.instance().batch_supported:
+            self.request_refresh(4000 + random.randint(0, 1500))
+
+    def apply_delta(self, delta):
+        """
+        Merge a partial state payload pushed by the server into the last full payload and re-render
+        """
+        if self.server_data is None or self.stale:
+            return  # Wait for a full payload from the poller first
+        data = dict(self.server_data)
+        for key, value in delta.items():
+            if isinstance(value, dict) and isinstance(data.get(key), dict):
+                data[key] = {**data[key], **value}
+            else:
+                data[key] = value
+        # Pushed as the state changed, newer than the answer to any request already sent
+        self.handle_data(data, NetworkService.instance().generation)
+
+    def handle_not_found(self):
+        self.not_found = True
+        self.rendered = None
+        self.parse_data(None)
+
+    def handle_data(self, data, generation=None):
+        """
+        Apply a device state payload, either from this widget's own /get request or from the batched DevicePoller.
+        A payload answering a request older than the one the current state came from is dropped.
+        """
+        if generation is not None:
+            if generation < self.generation:
+                NetworkService.instance().superseded += 1
+                return
+            self.generation = generation
+        self.server_data = data
+        if self.stale:
+            self.stale = False
+            self.stale_label.hide()
+        DeviceStateSnapshot.instance().record(self.device, data)
+        self.check_device_type(data)
+        if self.toggling and data["state"]["on"] != self.last_toggle_state:
+            self.toggling = False
+        data = self.command_queue.reconcile(data)
+        self.data = data
+        self.state = data["state"]
+        if self.render_unchanged(data):
+            return
+        self.parse_data(data)
+
+    def render_unchanged(self, data):
+        """
+        True if none of the fields this tile renders have changed since the last payload it rendered
+        """
+        if self.rendered_fields is None or self.toggling:
+            self.rendered = None
+            self.renders += 1
+            return False
+        rendered = tuple(data.get(field) for field in self.rendered_fields)
+        if rendered == self.rendered:
+            self.render_skips += 1
+            return True
+        self.rendered = rendered
+        self.renders += 1
+        return False
+
+    def show_failure(self, response):
+        self.rendered = None  # The failure replaced the rendered state, render the next payload even if it's the same
+        self.handle_failure(response)
+
     def handle_response(self, response):
         try:
             if str(response.error()) != "NetworkError.NoError":
                 logging.error(f"Device data error: {response.error()} : {has_internet()}")
-                self.handle_failure(response)
+                self.show_failure(response)
                 return
             data = response.readAll()
             if data == b'Device not found':
-                self.not_found = True
-                self.parse_data(None)
+                self.handle_not_found()
                 return
             elif 'WOPR Login' in str(data):
                 logging.error("Authentication error: WOPR Login found in response")
-                self.handle_failure(response)
+                self.show_failure(response)
                 return
-            data = json.loads(str(data, 'utf-8'))
-            self.data = data
-            self.state = data["state"]
-            self.check_device_type(data)
-            if self.toggling and self.state["on"] != self.last_toggle_state:
-                self.toggling = False
-            self.parse_data(data)
+            self.handle_data(json.loads(str(data, 'utf-8')), response.property("generation"))
         except Exception as e:
             logging.error(f"Error handling response: {e}")
             logging.exception(e)
         finally:
-            if not self.toggling:
-                self.refresh_timer.start(4000 + random.randint(0, 1500))
-            else:
-                self.refresh_timer.start(1000)
+            self.schedule_refresh()
             response.deleteLater()
 
     def handle_command(self, response):
@@ -304,7 +514,7 @@ class RoomDevice(QLabel):
             # Check if the response code is 302
             response_code = response.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
             if response_code == 302 or response_code == 200:
-                self.get_data()
+                self.request_refresh(0)
             else:
                 logging.error(f"Error handling command response: {response.error()}: {response_code}")
         except Exception as e:
@@ -313,7 +523,23 @@ class RoomDevice(QLabel):
         finally:
             response.deleteLater()
 
+    def handle_rename(self, response):
+        try:
+            response_code = response.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+            if response_code == 302 or response_code == 200:
+                # Refetch only once the server has the new name, the registry updates every tile showing the device
+                NameRegistry.instance().invalidate(self.device)
+            else:
+                logging.error(f"Error renaming {self.device}: {response.error()}: {response_code}")
+        except Exception as e:
+            logging.error(f"Error handling rename response: {e}")
+            logging.exception(e)
+        finally:
+            response.deleteLater()
+
     def contextMenuEvent(self, ev):
+        if self.context_menu is None:
+            self.context_menu = self.build_context_menu()
         self.context_menu.exec(ev.globalPos())
 
     def handle_failure(self, response):
@@ -0,0 +1,167 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from PyQt6.QtCore import QTimer, Qt
+from loguru import logger as logging
+
+from Utils.Singleton import Singleton
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def describe(frame):
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    if "." not in name:  # Module level function, name it after its module
+        name = f"{os.path.splitext(os.path.basename(code.co_filename))[0]}.{name}"
+    return name
+
+
+@Singleton
+class StallWatchdog:
+    """
+    Measures how late a HEARTBEAT_MS timer on the GUI thread fires, a beat more than STALL_MS late is a stall of the
+    event loop. While the heartbeat is overdue a background thread samples the GUI thread's stack every SAMPLE_MS and
+    the stall is attributed to the handler most of the samples were in, as the slot the event loop called (the
+    outermost of the interface's own frames above the one running the event loop) and, if different, the function it
+    was in (the innermost). A sample in none of the interface's own frames is time spent inside Qt.
+    The last HISTORY stalls are kept for the histogram.
+    """
+
+    HEARTBEAT_MS = 100
+    STALL_MS = 150
+    SAMPLE_MS = 20
+    HISTORY = 500
+    BUCKETS_MS = [150, 250, 500, 1000, 2500, 5000]  # Lower bounds
+    WARN_MS = 500
+    DUMP_PATH = "Logs/stalls.json"
+
+    def __init__(self):
+        self.main_thread = threading.main_thread().ident
+        self.last_beat = time.perf_counter()
+        self.samples = []  # (slot, function) taken by the watcher since the last beat
+        self.own_files = {}  # {code filename: True if it's one of the interface's own sources}
+        self.lock = threading.Lock()
+        self.stalls = deque(maxlen=self.HISTORY)  # (time, duration ms, culprit)
+        self.since = time.time()
+        self.heartbeat = QTimer()
+        self.heartbeat.setTimerType(Qt.TimerType.PreciseTimer)
+        self.heartbeat.timeout.connect(self.beat)
+        self.watcher = None
+
+    def start(self):
+        if self.watcher is not None:
+            return
+        self.last_beat = time.perf_counter()
+        self.heartbeat.start(self.HEARTBEAT_MS)
+        self.watcher = threading.Thread(target=self.watch, name="StallWatchdog", daemon=True)
+        self.watcher.start()
+
+    def beat(self):
+        now = time.perf_counter()
+        lag = (now - self.last_beat) * 1000 - self.HEARTBEAT_MS
+        self.last_beat = now
+        with self.lock:
+            samples, self.samples = self.samples, []
+        if lag >= self.STALL_MS:
+            self.record(lag, samples)
+
+    def watch(self):
+        # Sleeps until the heartbeat is overdue, so it only wakes about as often as the heartbeat while nothing stalls
+        while True:
+            overdue_at = self.last_beat + (self.HEARTBEAT_MS + self.STALL_MS / 2) / 1000
+            now = time.perf_counter()
+            if now < overdue_at:
+                time.sleep(overdue_at - now)
+                continue
+            try:
+                sample = self.sample()
+            except Exception as e:
+                logging.error(f"Stall watchdog failed to sample the GUI thread: {e}")
+                return
+            with self.lock:
+                self.samples.append(sample)
+            time.sleep(self.SAMPLE_MS / 1000)
+
+    def sample(self):
+        frame = sys._current_frames().get(self.main_thread)
+        slot = function = None
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename not in self.own_files:
+                path = os.path.abspath(filename)
+                self.own_files[filename] = path.startswith(ROOT) and path != os.path.abspath(__file__)
+            # main.py's module frame is below everything as it's the one that called app.exec()
+            if self.own_files[filename] and not (frame.f_code.co_name == "<module>" and
+                                                 frame.f_globals.get("__name__") == "__main__"):
+                slot = describe(frame)
+                if function is None:
+                    function = slot
+            frame = frame.f_back
+        return slot, function
+
+    def record(self, lag, samples):
+        if len(samples) == 0:
+            culprit = "unsampled"
+        else:
+            (slot, function), _ = Counter(samples).most_common(1)[0]
+            if slot is None:
+                culprit = "Qt (no Python handler running)"
+            elif slot == function:
+                culprit = slot
+            else:
+                culprit = f"{slot} > {function}"
+        self.stalls.append((time.time(), lag, culprit))
+        if lag >= self.WARN_MS:
+            logging.warning(f"Event loop stalled for {lag:.0f}ms in {culprit}")
+        else:
+            logging.debug(f"Event loop stalled for {lag:.0f}ms in {culprit}")
+
+    def histogram(self):
+        """
+        [(lower bound ms, stalls)] of the stalls kept
+        """
+        counts = [0] * len(self.BUCKETS_MS)
+        for _, lag, _ in self.stalls:
+            bucket = len(self.BUCKETS_MS) - 1
+            while bucket > 0 and lag < self.BUCKETS_MS[bucket]:
+                bucket -= 1
+            counts[bucket] += 1
+        return list(zip(self.BUCKETS_MS, counts))
+
+    def culprits(self):
+        """
+        [(culprit, stalls, total ms)] of the stalls kept, most time stalled first
+        """
+        totals = {}
+        for _, lag, culprit in self.stalls:
+            count, total = totals.get(culprit, (0, 0.0))
+            totals[culprit] = (count + 1, total + lag)
+        return sorted(((culprit, count, total) for culprit, (count, total) in totals.items()),
+                      key=lambda item: item[2], reverse=True)
+
+    def reset(self):
+        self.stalls.clear()
+        self.since = time.time()
+
+    def dump(self, path=DUMP_PATH):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "since": self.since,
+                    "dumped": time.time(),
+                    "histogram": {f">={bound}ms": count for bound, count in self.histogram()},
+                    "culprits": [{"culprit": culprit, "stalls": count, "total_ms": round(total)}
+                                 for culprit, count, total in self.culprits()],
+                    "stalls": [{"time": at, "ms": round(lag), "culprit": culprit} for at, lag, culprit in self.stalls],
+                }, f, indent=2)
+            logging.info(f"{len(self.stalls)} event loop stalls written to {path}")
+            return path
+        except OSError as e:
+            logging.error(f"Failed to write event loop stalls: {e}")
+            return None
@@ -0,0 +1,236 @@
+"""
+A minimal stand-in for the RoomController API, used to exercise the interface without a real controller.
+
+Run it with `python -m Utils.StandInServer --port 8080 --devices 40`, point "dev_host" in Config/auth.json at
+http://127.0.0.1:8080 and press D in the interface to switch over to the alternate server.
+Use --no-batch to emulate an older controller that does not have the batched endpoints, and --push-interval to
+control how often the /stream/state event stream pushes a random state change.
+--schema-types includes each device's type in /get_schema and --latency adds a delay to every request, which makes
+the cost of per-device round trips visible when timing how long the room control tiles take to appear
+(e.g. `--devices 200 --latency 50` and look for "All 200 device tiles created" in the interface log).
+"""
+import argparse
+import json
+import queue
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, unquote
+
+DEVICE_TYPES = ["abstract_toggle_device", "LIFXDevice", "MotionDetector"]
+
+
+class StandInState:
+
+    def __init__(self, device_count=40, batch=True, schema_types=False, latency=0):
+        self.batch = batch
+        self.schema_types = schema_types
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.devices = {}
+        self.schema = {}
+        self.request_counts = {}
+        self.streams = []  # [queue.Queue] one per connected /stream/state client
+        for i in range(device_count):
+            name = f"device_{i:03d}"
+            device_type = DEVICE_TYPES[i % len(DEVICE_TYPES)]
+            self.devices[name] = {
+                "type": device_type,
+                "name": f"Stand-In {i}",
+                "state": self.initial_state(device_type),
+                "health": {"online": True, "fault": False, "reason": None},
+                "info": {"power": random.randint(5, 60)} if device_type == "abstract_toggle_device" else None,
+                "auto_state": {"is_auto": False},
+            }
+            self.schema[name] = {
+                "group": f"Group {i // 10}" if i % 7 != 0 else None,
+                "starred": i % 9 == 0,
+                "priority": 0,
+            }
+
+    @staticmethod
+    def initial_state(device_type):
+        if device_type == "LIFXDevice":
+            return {"on": random.choice([True, False]), "brightness": random.randint(0, 255)}
+        if device_type == "MotionDetector":
+            return {"motion_detected": False, "last_motion_time": int(time.time())}
+        return {"on": random.choice([True, False])}
+
+    def get_schema(self):
+        if not self.schema_types:
+            return self.schema
+        return {device: dict(values, type=self.devices[device]["type"]) for device, values in self.schema.items()}
+
+    def count(self, endpoint):
+        if self.latency:
+            time.sleep(self.latency / 1000)
+        with self.lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+    def device_data(self, device):
+        data = self.devices[device]
+        return {"type": data["type"], "state": data["state"], "health": data["health"],
+                "info": data["info"], "auto_state": data["auto_state"], "actions": list(data["state"].keys())}
+
+    def apply_command(self, device, command):
+        with self.lock:
+            state = self.devices[device]["state"]
+            delta = {key: value for key, value in command.items() if key in state}
+            state.update(delta)
+        self.push(device, {"state": delta})
+
+    def push(self, device, delta):
+        with self.lock:
+            streams = list(self.streams)
+        for stream in streams:
+            stream.put({"device": device, "data": delta})
+
+    def random_change(self):
+        device = random.choice(list(self.devices.keys()))
+        with self.lock:
+            state = self.devices[device]["state"]
+            if "on" in state:
+                delta = {"on": not state["on"]}
+            else:
+                delta = {"motion_detected": not state["motion_detected"], "last_motion_time": int(time.time())}
+            state.update(delta)
+        self.push(device, {"state": delta})
+
+    def report(self):
+        with self.lock:
+            counts = dict(self.request_counts)
+            self.request_counts.clear()
+        return counts
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    state = None  # type: StandInState
+
+    def log_message(self, format, *args):
+        pass  # The per-endpoint summary is printed by the reporter thread instead
+
+    def send_body(self, body, status=200, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8") if content_type == "application/json" else body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.split("/") if part]
+        query = parse_qs(url.query)
+        endpoint = parts[0] if parts else ""
+        self.state.count(endpoint)
+        match parts:
+            case ["stream", "state"]:
+                self.stream_state()
+            case ["get_schema"]:
+                self.send_body(self.state.get_schema())
+            case ["get_many"] if self.state.batch:
+                devices = query.get("devices", [""])[0].split(",")
+                self.send_body({device: self.state.device_data(device) if device in self.state.devices else None
+                                for device in devices if device})
+            case ["get_types"] if self.state.batch:
+                devices = query.get("devices", [""])[0].split(",")
+                self.send_body({device: self.state.devices[device]["type"] if device in self.state.devices else None
+                                for device in devices if device})
+            case ["get_names"] if self.state.batch:
+                devices = query.get("devices", [""])[0].split(",")
+                self.send_body({device: self.state.devices[device]["name"] if device in self.state.devices else None
+                                for device in devices if device})
+            case ["set_name", device, name] if device in self.state.devices:
+                with self.state.lock:
+                    self.state.devices[device]["name"] = name
+                self.send_body({"success": True})
+            case ["get", device] if device in self.state.devices:
+                self.send_body(self.state.device_data(device))
+            case ["get_type", device] if device in self.state.devices:
+                self.send_body(self.state.devices[device]["type"], content_type="text/plain")
+            case ["name", device] if device in self.state.devices:
+                self.send_body(self.state.devices[device]["name"], content_type="text/plain")
+            case ["get", _] | ["get_type", _]:
+                self.send_body("Device not found", content_type="text/plain")
+            case _:
+                self.send_body("Not Found", status=404, content_type="text/plain")
+
+    def stream_state(self):
+        stream = queue.Queue()
+        with self.state.lock:
+            self.state.streams.append(stream)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            while True:
+                try:
+                    event = stream.get(timeout=15)
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                except queue.Empty:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self.state.lock:
+                self.state.streams.remove(stream)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.split("/") if part]
+        self.state.count(parts[0] if parts else "")
+        length = int(self.headers.get("Content-Length", 0))
+        payload = self.rfile.read(length) if length else b"{}"
+        match parts:
+            case ["set", device] if device in self.state.devices:
+                command = json.loads(payload)
+                if isinstance(command, str):
+                    command = json.loads(command)
+                self.state.apply_command(device, command)
+                self.send_body({"success": True})
+            case _:
+                self.send_body("Not Found", status=404, content_type="text/plain")
+
+
+def report_loop(state, interval):
+    while True:
+        time.sleep(interval)
+        counts = state.report()
+        total = sum(counts.values())
+        summary = ", ".join(f"/{endpoint}: {count}" for endpoint, count in sorted(counts.items()))
+        print(f"[{time.strftime('%H:%M:%S')}] {total / interval:.2f} req/s ({summary})")
+
+
+def push_loop(state, interval):
+    while True:
+        time.sleep(interval)
+        state.random_change()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in RoomController API for testing the interface")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--devices", type=int, default=40)
+    parser.add_argument("--no-batch", action="store_true", help="Disable the batched endpoints")
+    parser.add_argument("--push-interval", type=float, default=2, help="Seconds between pushed state changes")
+    parser.add_argument("--report-interval", type=float, default=10)
+    parser.add_argument("--schema-types", action="store_true", help="Include each device's type in /get_schema")
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds of delay added to every request")
+    args = parser.parse_args()
+
+    StandInHandler.state = StandInState(args.devices, batch=not args.no_batch, schema_types=args.schema_types,
+                                        latency=args.latency)
+    server = ThreadingHTTPServer((args.host, args.port), StandInHandler)
+    threading.Thread(target=report_loop, args=(StandInHandler.state, args.report_interval), daemon=True).start()
+    threading.Thread(target=push_loop, args=(StandInHandler.state, args.push_interval), daemon=True).start()
+    print(f"Stand-in server listening on http://{args.host}:{args.port} with {args.devices} devices")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
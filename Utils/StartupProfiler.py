@@ -0,0 +1,106 @@
+import importlib.abc
+import sys
+import time
+from contextlib import contextmanager
+
+from loguru import logger as logging
+
+from Utils.Singleton import Singleton
+
+PROFILE_FLAG = "--profile-startup"
+LAZY_FLAG = "--lazy-flyouts"
+
+
+class TimedLoader(importlib.abc.Loader):
+    """
+    Wraps the loader of one of the interface's own modules so the time spent executing it is recorded
+    """
+
+    def __init__(self, loader, profiler):
+        self.loader = loader
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        # Anything else (get_source, get_resource_reader, ...) is answered by the real loader
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self.profiler.measure(module.__name__, "import"):
+            self.loader.exec_module(module)
+
+
+class TimedImportFinder(importlib.abc.MetaPathFinder):
+    PACKAGES = ("Modules", "Utils")
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        if not fullname.startswith(self.PACKAGES):
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = TimedLoader(spec.loader, self.profiler)
+                return spec
+        return None
+
+
+@Singleton
+class StartupProfiler:
+    """
+    Records the wall time spent importing each of the interface's modules and constructing each top level widget,
+    along with the time from launch to the first paint of the main window.
+    Run main.py with --profile-startup to time imports as well and log the full report once the window is painted.
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.enabled = PROFILE_FLAG in sys.argv
+        self.records = []  # [(kind, label, total seconds, self seconds)]
+        self.stack = []  # Child time accumulated for each measurement in progress
+        self.first_paint = None
+        if self.enabled:
+            sys.meta_path.insert(0, TimedImportFinder(self))
+
+    @staticmethod
+    def lazy_flyouts():
+        return LAZY_FLAG in sys.argv
+
+    @contextmanager
+    def measure(self, label, kind="construct"):
+        start = time.perf_counter()
+        self.stack.append(0.0)
+        try:
+            yield
+        finally:
+            total = time.perf_counter() - start
+            children = self.stack.pop()
+            if self.stack:
+                self.stack[-1] += total
+            self.records.append((kind, label, total, total - children))
+
+    def mark_first_paint(self):
+        if self.first_paint is not None:
+            return
+        self.first_paint = time.perf_counter() - self.start_time
+        constructed = sum(record[3] for record in self.records if record[0] == "construct")
+        logging.info(f"First paint {self.first_paint:.2f}s after launch, {constructed:.2f}s constructing modules")
+        if self.enabled:
+            self.report()
+
+    def report(self):
+        logging.info(f"Startup profile ({len(self.records)} entries, first paint at {self.first_paint:.3f}s):")
+        for kind in ("import", "construct"):
+            records = sorted((record for record in self.records if record[0] == kind),
+                             key=lambda record: record[3], reverse=True)
+            logging.info(f"  {kind.title()} total {sum(record[3] for record in records):.3f}s "
+                         f"(total / self, slowest first)")
+            for _, label, total, own in records:
+                logging.info(f"    {total * 1000:8.1f}ms {own * 1000:8.1f}ms  {label}")
@@ -0,0 +1,158 @@
+import heapq
+import math
+import time
+from collections import deque
+
+from PyQt6 import sip
+from PyQt6.QtCore import QTimer
+from loguru import logger as logging
+
+from Utils.Singleton import Singleton
+
+
+class TaskSignal:
+    """
+    Stand in for QTimer.timeout, callbacks are called directly when the task is due
+    """
+
+    def __init__(self):
+        self.callbacks = []
+
+    def connect(self, callback):
+        self.callbacks.append(callback)
+
+    def emit(self):
+        for callback in list(self.callbacks):
+            callback()
+
+
+class ScheduledTask:
+    """
+    A timer run by the TaskScheduler, it takes the subset of the QTimer API the modules use so a QTimer can be swapped
+    for one without changing how it's started and stopped. The task is dropped when its owner is deleted.
+    """
+
+    def __init__(self, scheduler, owner):
+        self.scheduler = scheduler
+        self.owner = owner
+        self.timeout = TaskSignal()
+        self.interval_ms = 0
+        self.single_shot = False
+        self.slot = None  # The wheel slot the task is due in, None while stopped
+
+    def setSingleShot(self, single_shot):
+        self.single_shot = single_shot
+
+    def setInterval(self, interval):
+        self.interval_ms = interval
+
+    def interval(self):
+        return self.interval_ms
+
+    def start(self, interval=None):
+        if interval is not None:
+            self.interval_ms = interval
+        self.scheduler.arm(self, self.interval_ms)
+
+    def stop(self):
+        self.scheduler.disarm(self)
+
+    def isActive(self):
+        return self.slot is not None
+
+    def deleteLater(self):
+        self.stop()
+        self.timeout.callbacks.clear()
+
+    def owner_deleted(self):
+        return self.owner is not None and sip.isdeleted(self.owner)
+
+
+@Singleton
+class TaskScheduler:
+    """
+    Runs the periodic and delayed work of every module from one QTimer instead of each widget owning its own.
+    Due times are rounded up to the next SLOT_MS boundary of a timer wheel so tasks due within the same slot run
+    together in a single wake-up, and the timer only wakes for slots that have something due in them.
+    """
+
+    SLOT_MS = 250
+    STATS_WINDOW = 10  # Seconds of wake-ups averaged by wakeups_per_second
+
+    def __init__(self):
+        self.start_time = time.monotonic()
+        self.wheel = {}  # {slot: {ScheduledTask: None}}, dicts keep the tasks of a slot in the order they were armed
+        self.slots = []  # Heap of the slots in the wheel, may contain slots that have since been emptied
+        self.next_wake = None  # The slot the timer is set for
+        self.wakeups = deque()  # Monotonic time of every wake-up within the last STATS_WINDOW
+        self.tasks_run = 0
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.run_due)
+
+    def timer_for(self, owner=None):
+        """
+        A stopped task that is dropped once owner is deleted, connect its timeout and start it like a QTimer
+        """
+        return ScheduledTask(self, owner)
+
+    def now_ms(self):
+        return (time.monotonic() - self.start_time) * 1000
+
+    def arm(self, task, delay):
+        self.disarm(task)
+        slot = math.ceil((self.now_ms() + max(1, delay)) / self.SLOT_MS)  # Never the slot being run
+        if slot not in self.wheel:
+            self.wheel[slot] = {}
+            heapq.heappush(self.slots, slot)
+        self.wheel[slot][task] = None
+        task.slot = slot
+        if self.next_wake is None or slot < self.next_wake:
+            self.wake_at(slot)
+
+    def disarm(self, task):
+        if task.slot is None:
+            return
+        tasks = self.wheel.get(task.slot)
+        if tasks is not None:
+            tasks.pop(task, None)
+            if len(tasks) == 0:
+                del self.wheel[task.slot]
+        task.slot = None
+
+    def wake_at(self, slot):
+        self.next_wake = slot
+        self.timer.start(max(0, math.ceil(slot * self.SLOT_MS - self.now_ms())))
+
+    def run_due(self):
+        self.next_wake = None
+        now = time.monotonic()
+        self.wakeups.append(now)
+        while self.wakeups[0] < now - self.STATS_WINDOW:
+            self.wakeups.popleft()
+        current = math.floor(self.now_ms() / self.SLOT_MS)
+        while self.slots and self.slots[0] <= current:
+            slot = heapq.heappop(self.slots)
+            for task in list(self.wheel.pop(slot, {})):
+                task.slot = None
+                if task.owner_deleted():
+                    continue
+                if not task.single_shot:
+                    self.arm(task, task.interval_ms)  # Before running so the callback can stop or restart it
+                self.tasks_run += 1
+                try:
+                    task.timeout.emit()
+                except Exception as e:
+                    logging.error(f"Error running scheduled task: {e}")
+                    logging.exception(e)
+        while self.slots and self.slots[0] not in self.wheel:
+            heapq.heappop(self.slots)
+        if self.slots and (self.next_wake is None or self.slots[0] < self.next_wake):
+            self.wake_at(self.slots[0])
+
+    def wakeups_per_second(self):
+        cutoff = time.monotonic() - self.STATS_WINDOW
+        return sum(1 for wakeup in self.wakeups if wakeup >= cutoff) / self.STATS_WINDOW
+
+    def task_count(self):
+        return sum(len(tasks) for tasks in self.wheel.values())
@@ -1,16 +1,19 @@
 from PyQt6.QtCore import QUrl
 import PyQt6.QtNetwork as QN
 from PyQt6.QtGui import QPixmap
-from PyQt6.QtNetwork import QNetworkRequest, QNetworkAccessManager, QNetworkReply
+from PyQt6.QtNetwork import QNetworkRequest, QNetworkReply
 import time
 import re
 from loguru import logger as logging
 
+from Utils.NetworkMetrics import InstrumentedNetworkAccessManager
+
 network_check_timeout = 0
 internet_connected = False
 use_dev_server = False
 use_add_all_schema = False
-network_check_manager = QNetworkAccessManager()
+use_push_mode = False
+network_check_manager = InstrumentedNetworkAccessManager()
 
 
 with open("Config/auth.json", "r") as f:
@@ -28,6 +31,11 @@ def is_using_add_all_schema():
     return use_add_all_schema
 
 
+def is_using_push_mode():
+    global use_push_mode
+    return use_push_mode
+
+
 def allow_unverified_ssl(allow: bool):
     ssl_config = QN.QSslConfiguration.defaultConfiguration()
     ssl_config.setPeerVerifyMode(QN.QSslSocket.PeerVerifyMode.VerifyNone if allow else QN.QSslSocket.PeerVerifyMode.VerifyPeer)
@@ -50,6 +58,11 @@ def toggle_add_all_schema():
     use_add_all_schema = not use_add_all_schema
 
 
+def toggle_push_mode():
+    global use_push_mode
+    use_push_mode = not use_push_mode
+
+
 def get_auth():
     global use_dev_server
     if use_dev_server:
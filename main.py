@@ -5,7 +5,12 @@ import psutil
 
 from loguru import logger as logging
 
-from PyQt6.QtCore import QTimer, QElapsedTimer
+from Utils.StartupProfiler import StartupProfiler
+
+# Start the startup clock (and the import timing with --profile-startup) before any of the modules are imported
+StartupProfiler.instance()
+
+from PyQt6.QtCore import QElapsedTimer
 from PyQt6.QtWidgets import QMainWindow, QApplication
 from PyQt6.QtGui import QFont, QFontDatabase
 
@@ -20,7 +25,13 @@ from Modules.RoomControlModules.RoomControlHost import RoomControlHost
 
 from Modules.RoomSceneModules.RoomSceneHost import RoomSceneHost
 from Modules.SystemControlModules.SystemControlHost import SystemControlHost
-from Utils.UtilMethods import toggle_add_all_schema, toggle_dev_server, is_using_add_all_schema, is_using_dev_server
+from Utils.DevicePoller import DevicePoller
+from Utils.HostHealth import HostHealth
+from Utils.NetworkService import NetworkService
+from Utils.StallWatchdog import StallWatchdog
+from Utils.TaskScheduler import TaskScheduler
+from Utils.UtilMethods import toggle_add_all_schema, toggle_dev_server, is_using_add_all_schema, is_using_dev_server, \
+    toggle_push_mode, is_using_push_mode
 
 
 class RoomInterface(QApplication):
@@ -60,47 +71,56 @@ class MainWindow(QMainWindow):
         # Set the background color to black
         self.setStyleSheet("background-color: black;")
 
-        self.clock = DisplayClock(self)
-        self.weather = CurrentWeather(self)
-        self.forecast = ForecastHost(self)
-        self.room_control = RoomControlHost(self)
-        self.scene_control = RoomSceneHost(self)
-        self.system_control = SystemControlHost(self)
-        self.webcam_layout = WebcamLayout(self)
-        self.radar_host = RadarHost(self)
-        self.menu_bar = MenuBar(self)
+        profiler = StartupProfiler.instance()
+        with profiler.measure("DisplayClock"):
+            self.clock = DisplayClock(self)
+        with profiler.measure("CurrentWeather"):
+            self.weather = CurrentWeather(self)
+        with profiler.measure("ForecastHost"):
+            self.forecast = ForecastHost(self)
+        with profiler.measure("RoomControlHost"):
+            self.room_control = RoomControlHost(self)
+        with profiler.measure("MenuBar"):
+            self.menu_bar = MenuBar(self)
 
         # Move the clock to the upper right corner (dynamic, so it will always be in the upper right corner)
         self.clock.move(self.width() - self.clock.width(), 0)
         self.weather.move(0, 0)
         self.forecast.move(0, 90)  # These moves have fixed upper left corners, so they don't need to be dynamic
         self.room_control.move(0, self.forecast.height() + self.forecast.y() + 10)
-        self.scene_control.move(0, 90)
-        self.system_control.move(0, 90)
-        self.webcam_layout.move(0, 90)
-        self.radar_host.move(0, 90)
-        self.radar_host.hide()
 
         # Move the menu bar to the very bottom of the window
         self.menu_bar.move(0, self.height() - self.menu_bar.height())
 
+        # The hidden flyouts are either built now or, with --lazy-flyouts, the first time their button is pressed
+        self.scene_control = None
+        self.system_control = None
+        self.webcam_layout = None
+        self.radar_host = None
+        if StartupProfiler.lazy_flyouts():
+            system_control, scene_control = self.build_system_control, self.build_scene_control
+            webcam_layout, radar_host = self.build_webcam_layout, self.build_radar_host
+        else:
+            system_control, scene_control = self.build_system_control(), self.build_scene_control()
+            webcam_layout, radar_host = self.build_webcam_layout(), self.build_radar_host()
+
         # Add the menu bar buttons and link them to the appropriate modules
-        self.menu_bar.add_flyout_button("System Control", self.system_control, 90)
-        self.menu_bar.add_flyout_button("Routines", self.scene_control, 120)
+        self.menu_bar.add_flyout_button("System Control", system_control, 90)
+        self.menu_bar.add_flyout_button("Routines", scene_control, 120)
         self.menu_bar.add_flyout_button("Room Control", self.room_control, 90)
-        self.menu_bar.add_flyout_button("Webcams", self.webcam_layout, 120)
-        self.menu_bar.add_flyout_button("Radar", self.radar_host, 75)
-        self.system_control.setFixedSize(self.width(), self.height() - 90 - self.menu_bar.height())
-        self.scene_control.setFixedSize(self.width(), self.room_control.y() - 90)
+        self.menu_bar.add_flyout_button("Webcams", webcam_layout, 120)
+        self.menu_bar.add_flyout_button("Radar", radar_host, 75)
 
         # Allow modules to reset the focus timer on user interaction
         self.room_control.set_activity_timer_callback(self.menu_bar.reset_focus_timer)
-        self.radar_host.set_activity_timer_callback(self.menu_bar.reset_focus_timer)
 
         # Setup debug text timer, so I can see the current CPU and memory usage (validate no memory leaks)
-        self.window_title_update_timer = QTimer()
+        self.window_title_update_timer = TaskScheduler.instance().timer_for()
         self.window_title_update_timer.timeout.connect(self.update_window_title)
 
+        # Watch for anything blocking the event loop long enough to make the interface stutter
+        StallWatchdog.instance().start()
+
         self.process = psutil.Process(os.getpid())
 
         self.show()
@@ -110,6 +130,43 @@ class MainWindow(QMainWindow):
         else:
             self.window_title_update_timer.start(500)
 
+    def build_scene_control(self):
+        with StartupProfiler.instance().measure("RoomSceneHost"):
+            self.scene_control = RoomSceneHost(self)
+        self.scene_control.move(0, 90)
+        self.scene_control.setFixedSize(self.width(), self.room_control.y() - 90)
+        self.scene_control.stackUnder(self.menu_bar)
+        return self.scene_control
+
+    def build_system_control(self):
+        with StartupProfiler.instance().measure("SystemControlHost"):
+            self.system_control = SystemControlHost(self)
+        self.system_control.move(0, 90)
+        self.system_control.setFixedSize(self.width(), self.height() - 90 - self.menu_bar.height())
+        self.system_control.stackUnder(self.menu_bar)
+        return self.system_control
+
+    def build_webcam_layout(self):
+        with StartupProfiler.instance().measure("WebcamLayout"):
+            self.webcam_layout = WebcamLayout(self)
+        self.webcam_layout.move(0, 90)
+        self.webcam_layout.setFixedSize(self.width(), self.height() - 90 - self.menu_bar.height())
+        self.webcam_layout.stackUnder(self.menu_bar)
+        return self.webcam_layout
+
+    def build_radar_host(self):
+        with StartupProfiler.instance().measure("RadarHost"):
+            self.radar_host = RadarHost(self)
+        self.radar_host.move(0, 90)
+        self.radar_host.hide()
+        self.radar_host.stackUnder(self.menu_bar)
+        self.radar_host.set_activity_timer_callback(self.menu_bar.reset_focus_timer)
+        return self.radar_host
+
+    def paintEvent(self, a0) -> None:
+        super().paintEvent(a0)
+        StartupProfiler.instance().mark_first_paint()
+
     def mousePressEvent(self, a0) -> None:
         self.menu_bar.reset_focus_timer()
         super().mousePressEvent(a0)
@@ -125,9 +182,26 @@ class MainWindow(QMainWindow):
             memory_usage = self.process.memory_info().rss
             using_dev_server = " - Alternate Server" if is_using_dev_server() else ""
             using_add_all_schema = " - Schema AddAll" if is_using_add_all_schema() else ""
+            network_stats = NetworkService.instance().stats()
+            polling, tiles = self.room_control.tiles_polling
+            device_status = f" - Polling: {polling}/{tiles}"
+            average_interval = DevicePoller.instance().average_interval()
+            if average_interval is not None:
+                device_status += f" every {average_interval:.1f}s"
+            probe_in = HostHealth.instance().status()
+            if probe_in is not None:
+                device_status += f" - Controller down, probing in {probe_in}s"
+            if is_using_push_mode():
+                pushes_received, polls_avoided = self.room_control.push_stats()
+                device_status += f" - Push: {pushes_received} recv/{polls_avoided} avoided"
             # Add the current memory usage to the window title and the current cpu usage
             self.setWindowTitle(f"RoomInterfaceMk2[PID:{os.getpid()}] - CPU: {cpu_percent}% "
-                                f"- Memory: {round(memory_usage / 1024 / 1024, 2)}MB{using_dev_server}{using_add_all_schema}")
+                                f"- Memory: {round(memory_usage / 1024 / 1024, 2)}MB "
+                                f"- Net: {network_stats['in_flight']} req/{network_stats['active_connections']} conn"
+                                f"/{network_stats['coalesced']} dup/"
+                                f"{network_stats['cancelled'] + network_stats['superseded']} dropped"
+                                f" - Wakeups: {TaskScheduler.instance().wakeups_per_second():.1f}/s"
+                                f"{using_dev_server}{using_add_all_schema}{push_mode}")
         except Exception as e:
             logging.exception(e)
             self.setWindowTitle("RoomInterfaceMk2 - Unable to get process info")
@@ -156,9 +230,11 @@ class MainWindow(QMainWindow):
     def reload_all(self):
         self.room_control.reload_schema()
         self.forecast.refresh_forecast()
-        self.scene_control.reload()
+        if self.scene_control is not None:
+            self.scene_control.reload()
         self.weather.make_request()
-        self.system_control.refresh_interfaces()
+        if self.system_control is not None:
+            self.system_control.refresh_interfaces()
         gc.collect()
 
     def keyReleaseEvent(self, a0) -> None:
@@ -173,6 +249,9 @@ class MainWindow(QMainWindow):
                     self.reload_all()
                 case 82:  # R key
                     self.reload_all()
+                case 80:  # P key
+                    toggle_push_mode()
+                    self.room_control.set_push_mode(is_using_push_mode())
             super().keyReleaseEvent(a0)
         except Exception as e:
             logging.exception(e)
@@ -182,13 +261,16 @@ class MainWindow(QMainWindow):
             self.menu_bar.setFixedSize(self.width(), self.menu_bar.height())
             self.menu_bar.move(0, self.height() - self.menu_bar.height())
             self.clock.move(self.width() - self.clock.width(), 0)
-            self.webcam_layout.setFixedSize(self.width(), self.height() - 90 - self.menu_bar.height())
-            self.webcam_layout.resizeEvent(event)
+            if self.webcam_layout is not None:
+                self.webcam_layout.setFixedSize(self.width(), self.height() - 90 - self.menu_bar.height())
+                self.webcam_layout.resizeEvent(event)
             self.forecast.setFixedSize(self.width(), self.forecast.height())
             self.forecast.layout_widgets()
-            self.system_control.setFixedSize(self.width(), self.height() - 90 - self.menu_bar.height())
+            if self.system_control is not None:
+                self.system_control.setFixedSize(self.width(), self.height() - 90 - self.menu_bar.height())
             self.room_control.resizeEvent(event)
-            self.scene_control.resizeEvent(event)
+            if self.scene_control is not None:
+                self.scene_control.resizeEvent(event)
         except Exception as e:
             logging.exception(e)
 